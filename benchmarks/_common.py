@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""识别基准测试共用的测试音频读取"""
+
+import os
+from typing import List, Tuple
+
+from core.audio import SAMPLE_RATE, decode_pcm
+
+MEDIA_EXTENSIONS = (".mp4", ".mov", ".mp3", ".wav", ".m4a", ".aac", ".flac", ".ogg")
+
+
+def load_clips(args, seconds: Tuple[int, int] = (5, 15)) -> List[Tuple[str, object]]:
+    """
+    读取测试音频，没有指定目录时生成合成音频
+    :param args: 命令行参数，使用 media_dir、count、ffmpeg
+    :param seconds: 合成音频的最短和最长时长(秒)
+    :return: [(名称, 16kHz PCM)]
+    """
+    import numpy as np
+
+    if args.media_dir:
+        paths = sorted(
+            os.path.join(args.media_dir, name) for name in os.listdir(args.media_dir)
+            if name.lower().endswith(MEDIA_EXTENSIONS)
+        )[:args.count]
+        return [(os.path.basename(path), decode_pcm(args.ffmpeg, path)) for path in paths]
+
+    # 合成音频只用于测量耗时，识别结果没有意义
+    shortest, longest = seconds
+    rng = np.random.default_rng(0)
+    clips = []
+    for i in range(args.count):
+        length = shortest + (i * 3) % (longest - shortest + 1)
+        t = np.arange(length * SAMPLE_RATE) / SAMPLE_RATE
+        pcm = 0.1 * np.sin(2 * np.pi * (200 + 40 * i) * t) + 0.02 * rng.standard_normal(len(t))
+        clips.append((f"synthetic-{i}", pcm.astype(np.float32)))
+    return clips
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Whisper 批量识别与逐个识别的吞吐量对比
+
+对同一组短音频分别调用 SpeechRecognizer.recognize(逐个) 和
+SpeechRecognizer.recognize_batch(批量)，输出每秒处理的片段数和加速比。
+模型在计时前预先加载，两种方式都不包含加载时间。
+
+    python benchmarks/asr_batch.py --media-dir samples/ --model base --batch-size 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks._common import load_clips  # noqa: E402
+from config import Config  # noqa: E402
+from core.audio import SAMPLE_RATE  # noqa: E402
+from core.downloader import SpeechRecognizer  # noqa: E402
+
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Whisper批量识别吞吐量对比")
+    parser.add_argument("--media-dir", help="测试音频/视频目录，不指定时使用合成音频")
+    parser.add_argument("--count", type=int, default=16, help="片段数")
+    parser.add_argument("--model", default="base", help="Whisper模型")
+    parser.add_argument("--language", default="zh", help="识别语言")
+    parser.add_argument("--batch-size", type=int, default=8, help="批量大小")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg路径")
+    args = parser.parse_args()
+
+    config = Config()
+    config.speech_recognition_engine = "whisper"
+    config.speech_recognition_config["whisper"].update({"model": args.model, "language": args.language})
+    recognizer = SpeechRecognizer(config)
+
+    clips = load_clips(args, seconds=(15, 30))
+    if not clips:
+        print("没有找到测试音频")
+        return 1
+    audio_seconds = sum(len(pcm) for _, pcm in clips) / SAMPLE_RATE
+    print(f"{len(clips)} 段音频，共 {audio_seconds:.1f} 秒，模型 {args.model}，批量大小 {args.batch_size}")
+
+    # 预先加载模型
+    recognizer.recognize(clips[0][1][:SAMPLE_RATE])
+
+    start = time.perf_counter()
+    sequential = [recognizer.recognize(pcm) for _, pcm in clips]
+    sequential_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = []
+    for i in range(0, len(clips), args.batch_size):
+        batched += recognizer.recognize_batch([pcm for _, pcm in clips[i:i + args.batch_size]])
+    batched_seconds = time.perf_counter() - start
+
+    print(f"逐个识别: {sequential_seconds:.2f} 秒, {len(clips) / sequential_seconds:.2f} 段/秒")
+    print(f"批量识别: {batched_seconds:.2f} 秒, {len(clips) / batched_seconds:.2f} 段/秒")
+    print(f"加速比: {sequential_seconds / batched_seconds:.2f}x")
+
+    different = [name for (name, _), a, b in zip(clips, sequential, batched) if (a or "").strip() != (b or "").strip()]
+    print(f"结果不同的片段: {len(different)}/{len(clips)}")
+    for name in different[:10]:
+        print(f"  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
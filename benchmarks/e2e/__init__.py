@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""端到端吞吐量基准测试
+
+本地模拟视频信息API和CDN，用合成视频驱动完整的下载→音频→识别流水线，
+统计每分钟处理的链接数、各阶段耗时的P50/P95和内存峰值，结果写为JSON便于比较。
+
+    python benchmarks/e2e/run.py --links 60 --output e2e.json
+    python benchmarks/e2e/run.py --links 60 --compare e2e.json
+"""
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""端到端吞吐量基准测试
+
+在子进程中启动模拟的API和CDN，用一个临时工作目录运行 VideoDownloader.download_videos，
+测量每分钟处理的链接数、各阶段耗时(job.timings)的P50/P95和内存峰值，结果写为JSON。
+识别默认使用按音频时长休眠的模拟引擎，只测量下载、解码和调度；
+--recognizer whisper-tiny 使用真实的 Whisper tiny 模型。
+
+    python benchmarks/e2e/run.py --links 60 --output before.json
+    python benchmarks/e2e/run.py --links 60 --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from benchmarks.e2e.media import generate_image, generate_videos  # noqa: E402
+from benchmarks.e2e.server import serve  # noqa: E402
+from benchmarks.e2e.stub_engine import STUB_ENGINE, register_stub_engine  # noqa: E402
+from config import Config  # noqa: E402
+from core.downloader import VideoDownloader  # noqa: E402
+
+FIRST_ID = 7300000000000000000  # 合成视频ID的起始值
+
+
+def build_catalog(args) -> Dict[str, Dict]:
+    """
+    按随机种子生成每个链接的行为，相同参数每次生成相同的目录
+    :return: 视频ID -> 行为设置
+    """
+    rng = random.Random(args.seed)
+    durations = [float(value) for value in args.video_seconds.split(",")]
+    catalog = {}
+    for i in range(args.links):
+        aweme_id = str(FIRST_ID + i)
+        catalog[aweme_id] = {
+            "kind": "images" if rng.random() < args.image_ratio else "video",
+            "seconds": durations[i % len(durations)],
+            "errors": 1 if rng.random() < args.error_ratio else 0,
+            "slow": rng.random() < args.slow_ratio,
+        }
+    return catalog
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def summarize(values: List[float]) -> Dict:
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 0.5), 3),
+        "p95": round(percentile(values, 0.95), 3),
+        "mean": round(sum(values) / len(values), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """本进程和已结束子进程(ffmpeg、识别进程)中最大的内存峰值(MB)"""
+    try:
+        import resource
+    except ImportError:
+        import psutil
+        return {"self": round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)}
+    # Linux 单位为KB，macOS 为字节
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit, 1),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def make_config(args, workspace: str) -> Config:
+    """临时工作目录中的配置，不读取用户的 config.json"""
+    config_file = os.path.join(workspace, "config.json")
+    # 先写入目录设置，加载配置时在工作目录中创建下载目录
+    with open(config_file, "w", encoding="utf-8") as f:
+        json.dump({name: os.path.join(workspace, name.split("_")[0])
+                   for name in ("download_path", "audio_path", "text_path")}, f)
+    config = Config(config_file)
+    config.ffmpeg_path = args.ffmpeg
+    config.download_audio = not args.no_audio
+    config.extract_text = not args.no_text
+    config.max_concurrent_downloads = args.downloads
+    config.audio_workers = args.audio_workers
+    config.asr_workers = args.asr_workers
+    config.api_rate_limit = args.api_rate
+    config.cdn_rate_limit = args.cdn_rate
+    config.metrics_trace_file = os.path.abspath(args.trace) if args.trace else ""
+    if args.recognizer == "stub":
+        register_stub_engine()
+        config.speech_recognition_engine = STUB_ENGINE
+        config.speech_recognition_config[STUB_ENGINE] = {"rtf": args.rtf}
+        # 模拟引擎只在本进程中注册
+        config.asr_processes = 1
+    else:
+        config.speech_recognition_engine = "whisper"
+        config.speech_recognition_config["whisper"].update({"model": "tiny", "backend": "openai"})
+    return config
+
+
+async def run_pipeline(config: Config, api_url: str, urls: List[str], verbose: bool):
+    """
+    运行一次批量处理
+    :return: (全部任务, 总耗时)
+    """
+    # 只替换API地址，限速器按新的主机区分API和CDN
+    downloader_class = type("BenchDownloader", (VideoDownloader,), {"API_BASE_URL": api_url})
+    downloader = downloader_class(config)
+    if verbose:
+        downloader.log_message.connect(lambda message: print(message, file=sys.stderr))
+    jobs = []
+    downloader.job_finished.connect(jobs.append)
+    start = time.perf_counter()
+    try:
+        await downloader.download_videos(urls)
+    finally:
+        wall = time.perf_counter() - start
+        await downloader.close()
+        downloader.shutdown()
+    return jobs, wall
+
+
+def compare(result: Dict, previous_path: str):
+    """输出与之前结果的对比"""
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+
+    def change(new: float, old: float) -> str:
+        return f"{old:.3f} -> {new:.3f} ({(new - old) / old * 100:+.1f}%)" if old else f"{old} -> {new}"
+
+    print(f"与 {previous_path} ({previous.get('revision', '')}) 对比:")
+    print(f"  链接/分钟: {change(result['links_per_minute'], previous['links_per_minute'])}")
+    for name, stage in result["stages"].items():
+        old = previous.get("stages", {}).get(name)
+        if old:
+            print(f"  {name} P50: {change(stage['p50'], old['p50'])}, P95: {change(stage['p95'], old['p95'])}")
+    print(f"  内存峰值: {change(result['peak_rss_mb']['self'], previous['peak_rss_mb']['self'])} MB")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="端到端吞吐量基准测试")
+    parser.add_argument("--links", type=int, default=40, help="链接数")
+    parser.add_argument("--video-seconds", default="8,20,45", help="合成视频时长(秒)，逗号分隔，按顺序循环使用")
+    parser.add_argument("--image-ratio", type=float, default=0.1, help="图片集合的比例")
+    parser.add_argument("--error-ratio", type=float, default=0.1, help="第一次请求返回502的比例")
+    parser.add_argument("--slow-ratio", type=float, default=0.1, help="慢响应的比例")
+    parser.add_argument("--slow-seconds", type=float, default=3.0, help="慢响应的延迟(秒)")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--recognizer", choices=["stub", "whisper-tiny"], default="stub", help="识别引擎")
+    parser.add_argument("--rtf", type=float, default=0.05, help="模拟引擎的识别耗时与音频时长之比")
+    parser.add_argument("--downloads", type=int, default=3, help="同时下载的链接数")
+    parser.add_argument("--audio-workers", type=int, default=2, help="同时运行的音频提取数")
+    parser.add_argument("--asr-workers", type=int, default=1, help="同时运行的识别数")
+    parser.add_argument("--api-rate", type=float, default=2.0, help="API每秒请求数")
+    parser.add_argument("--cdn-rate", type=float, default=10.0, help="CDN每秒请求数")
+    parser.add_argument("--no-audio", action="store_true", help="不保留MP3音频文件")
+    parser.add_argument("--no-text", action="store_true", help="不识别文案")
+    parser.add_argument("--media-dir", default=os.path.join(tempfile.gettempdir(), "douyin_e2e_media"),
+                        help="合成视频的缓存目录，多次运行复用")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg路径")
+    parser.add_argument("--output", help="结果JSON文件")
+    parser.add_argument("--compare", help="与之前的结果JSON对比")
+    parser.add_argument("--trace", help="同时写出各阶段计时区间的JSONL跟踪文件")
+    parser.add_argument("--keep", action="store_true", help="保留临时工作目录")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出下载器日志")
+    args = parser.parse_args()
+
+    catalog = build_catalog(args)
+    videos = {aweme_id: item["seconds"] for aweme_id, item in catalog.items() if item["kind"] == "video"}
+    print(f"准备 {len(videos)} 个合成视频...", file=sys.stderr)
+    paths = asyncio.run(generate_videos(args.ffmpeg, args.media_dir, videos))
+    for aweme_id, path in paths.items():
+        catalog[aweme_id]["size"] = os.path.getsize(path)
+    image = generate_image(args.ffmpeg, args.media_dir)
+
+    # 服务器在单独的进程中运行，不影响被测进程的CPU和内存统计
+    context = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = context.Pipe()
+    server = context.Process(target=serve, args=(catalog, paths, image, args.slow_seconds, child_conn), daemon=True)
+    server.start()
+    api_url, _ = parent_conn.recv()
+
+    workspace = tempfile.mkdtemp(prefix="douyin_e2e_")
+    try:
+        config = make_config(args, workspace)
+        urls = [f"https://www.douyin.com/video/{aweme_id}" for aweme_id in catalog]
+        print(f"处理 {len(urls)} 个链接...", file=sys.stderr)
+        jobs, wall = asyncio.run(run_pipeline(config, api_url, urls, args.verbose))
+        # 在服务器进程结束前统计，子进程的峰值只包含ffmpeg和识别进程
+        peak_rss = peak_rss_mb()
+    finally:
+        parent_conn.send("stop")
+        server_stats = parent_conn.recv() if parent_conn.poll(10) else {}
+        server.join(5)
+        if not args.keep:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    timings: Dict[str, List[float]] = {}
+    for job in jobs:
+        for name, seconds in job.timings.items():
+            timings.setdefault(name, []).append(seconds)
+    statuses: Dict[str, int] = {}
+    for job in jobs:
+        statuses[job.status] = statuses.get(job.status, 0) + 1
+
+    result = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "options": {key: value for key, value in vars(args).items()
+                    if key not in ("output", "compare", "trace", "keep", "verbose", "media_dir", "ffmpeg")},
+        "links": len(catalog),
+        "wall_seconds": round(wall, 3),
+        "links_per_minute": round(len(catalog) / wall * 60, 2),
+        "statuses": statuses,
+        "stages": {name: summarize(values) for name, values in timings.items()},
+        "peak_rss_mb": peak_rss,
+        "server": server_stats,
+        "errors": [job.error.splitlines()[0] for job in jobs if job.error][:10],
+    }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.compare:
+        compare(result, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
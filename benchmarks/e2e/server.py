@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""模拟视频信息API和CDN的本地服务器
+
+API与CDN监听不同的端口，下载器按主机限速时两者分别计算。
+每个视频ID的行为由目录(catalog)决定：
+    kind    "video" 或 "images"(图片集合)
+    errors  返回成功之前先返回几次 502
+    slow    是否延迟 slow_seconds 秒后才返回
+服务器在单独的进程中运行，不占用被测流水线的事件循环和CPU。
+"""
+
+import asyncio
+import re
+from typing import Dict
+
+IMAGE_COUNT = 4  # 每个图片集合的图片数
+
+
+class FakeServer:
+    """模拟 /api/hybrid/video_data 和CDN"""
+
+    def __init__(self, catalog: Dict[str, Dict], videos: Dict[str, str], image: bytes, slow_seconds: float):
+        """
+        :param catalog: 视频ID -> 行为设置
+        :param videos: 视频ID -> 合成视频文件路径
+        :param image: 图片和封面使用的JPEG数据
+        :param slow_seconds: 慢响应的延迟(秒)
+        """
+        self.catalog = catalog
+        self.videos = videos
+        self.image = image
+        self.slow_seconds = slow_seconds
+        self.cdn_url = ""
+        self.attempts: Dict[str, int] = {}
+        self.stats = {"api_requests": 0, "api_errors": 0, "api_slow": 0, "cdn_requests": 0}
+        self._runners = []
+
+    def video_data(self, aweme_id: str) -> Dict:
+        """
+        构造与API相同结构的视频信息
+        :param aweme_id: 视频ID
+        :return: data字段
+        """
+        item = self.catalog[aweme_id]
+        data = {
+            "aweme_id": aweme_id,
+            "desc": f"基准测试{aweme_id}",
+            "author": {"nickname": "bench"},
+        }
+        if item["kind"] == "images":
+            data["images"] = [
+                {"url_list": [f"{self.cdn_url}/image/{aweme_id}/{i}.jpg"]} for i in range(IMAGE_COUNT)
+            ]
+            return data
+        data["video"] = {
+            "play_addr": {"url_list": [f"{self.cdn_url}/video/{aweme_id}.mp4"], "data_size": item["size"]},
+            "cover": {"url_list": [f"{self.cdn_url}/cover/{aweme_id}.jpg"]},
+        }
+        return data
+
+    async def handle_video_data(self, request):
+        from aiohttp import web
+
+        self.stats["api_requests"] += 1
+        match = re.search(r"(\d{6,})", request.query.get("url", ""))
+        aweme_id = match.group(1) if match else ""
+        item = self.catalog.get(aweme_id)
+        if item is None:
+            return web.json_response({"code": 400, "message": "视频不存在"})
+
+        if item.get("slow"):
+            self.stats["api_slow"] += 1
+            await asyncio.sleep(self.slow_seconds)
+        attempt = self.attempts.get(aweme_id, 0)
+        self.attempts[aweme_id] = attempt + 1
+        if attempt < item.get("errors", 0):
+            self.stats["api_errors"] += 1
+            return web.Response(status=502, text="Bad Gateway")
+        return web.json_response({"code": 200, "data": self.video_data(aweme_id)})
+
+    async def handle_video(self, request):
+        from aiohttp import web
+
+        self.stats["cdn_requests"] += 1
+        path = self.videos.get(request.match_info["aweme_id"])
+        if path is None:
+            return web.Response(status=404)
+        # FileResponse 支持Range，分段下载和续传都可以测到
+        return web.FileResponse(path)
+
+    async def handle_image(self, request):
+        from aiohttp import web
+
+        self.stats["cdn_requests"] += 1
+        return web.Response(body=self.image, content_type="image/jpeg")
+
+    async def start(self, host: str = "127.0.0.1"):
+        """
+        启动API和CDN
+        :param host: 监听地址
+        :return: (API地址, CDN地址)
+        """
+        from aiohttp import web
+
+        api = web.Application()
+        api.router.add_get("/api/hybrid/video_data", self.handle_video_data)
+        cdn = web.Application()
+        cdn.router.add_get("/video/{aweme_id}.mp4", self.handle_video)
+        cdn.router.add_get("/image/{aweme_id}/{index}.jpg", self.handle_image)
+        cdn.router.add_get("/cover/{aweme_id}.jpg", self.handle_image)
+
+        urls = []
+        for app in (api, cdn):
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, host, 0)
+            await site.start()
+            self._runners.append(runner)
+            port = site._server.sockets[0].getsockname()[1]
+            urls.append(f"http://{host}:{port}")
+        self.cdn_url = urls[1]
+        return urls[0], urls[1]
+
+    async def stop(self):
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners = []
+
+
+def serve(catalog: Dict[str, Dict], videos: Dict[str, str], image: bytes, slow_seconds: float, conn):
+    """
+    子进程入口：启动服务器，把地址发回父进程，收到停止消息后发回请求统计并退出
+    :param conn: multiprocessing.Pipe 的一端
+    """
+
+    async def main():
+        server = FakeServer(catalog, videos, image, slow_seconds)
+        conn.send(await server.start())
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, conn.recv)
+        await server.stop()
+        conn.send(server.stats)
+
+    asyncio.run(main())
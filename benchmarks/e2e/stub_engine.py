@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""模拟识别耗时的识别引擎，只测量流水线本身的吞吐量"""
+
+import time
+from typing import List, Optional
+
+from core.asr_engines import BOUND_CPU, LOAD_LOW, AsrEngine, EngineSpec, register_engine
+from core.audio import SAMPLE_RATE
+
+STUB_ENGINE = "bench-stub"
+
+
+class StubEngine(AsrEngine):
+    """按音频时长乘以 rtf 休眠后返回固定文本
+
+    休眠期间释放GIL，与真实模型在C扩展中计算时相同，不阻塞其他线程。
+    """
+
+    name = STUB_ENGINE
+
+    def _duration(self, audio) -> float:
+        if isinstance(audio, str):
+            return 10.0
+        return len(audio) / SAMPLE_RATE
+
+    def recognize(self, audio) -> Optional[str]:
+        return self.recognize_batch([audio])[0]
+
+    def recognize_batch(self, audios: List) -> List[Optional[str]]:
+        # 一次休眠全部音频的识别耗时，与逐个识别的总耗时相同
+        seconds = [self._duration(audio) for audio in audios]
+        time.sleep(sum(seconds) * float(self.options.get('rtf', 0.05)))
+        return [f"基准测试文本，音频时长{duration:.1f}秒。" for duration in seconds]
+
+
+def register_stub_engine():
+    """注册模拟引擎，只在本进程内有效，使用时需要关闭多进程识别"""
+    register_engine(EngineSpec(STUB_ENGINE, "基准测试引擎", StubEngine, BOUND_CPU, LOAD_LOW, 1))
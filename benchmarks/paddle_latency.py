@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""PaddleSpeech 预热后的单文件识别延迟
+
+分别测量：第一次识别(包含模型加载)、预热后逐个识别每个文件的延迟、
+一次调用识别全部文件的平均延迟，以及每个文件新建执行器(旧的做法)的延迟。
+
+    python benchmarks/paddle_latency.py --media-dir samples/ --count 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks._common import load_clips  # noqa: E402
+from config import Config  # noqa: E402
+from core.asr_engines import get_engine  # noqa: E402
+from core.audio import SAMPLE_RATE, write_wav  # noqa: E402
+
+
+
+def describe(latencies, audio_seconds) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (f"平均 {statistics.mean(latencies):.3f} 秒, 中位数 {statistics.median(latencies):.3f} 秒, "
+            f"P95 {p95:.3f} 秒, RTF {sum(latencies) / audio_seconds:.3f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="PaddleSpeech预热后的识别延迟")
+    parser.add_argument("--media-dir", help="测试音频/视频目录，不指定时使用合成音频")
+    parser.add_argument("--count", type=int, default=10, help="文件数")
+    parser.add_argument("--model", default="conformer_wenetspeech", help="PaddleSpeech模型")
+    parser.add_argument("--cold-runs", type=int, default=2, help="每个文件新建执行器的对照次数，0为不测")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg路径")
+    args = parser.parse_args()
+
+    config = Config()
+    config.speech_recognition_engine = "paddlespeech"
+    config.speech_recognition_config["paddlespeech"]["model"] = args.model
+    engine = get_engine(config)
+
+    clips = load_clips(args)
+    if not clips:
+        print("没有找到测试音频")
+        return 1
+    audio_seconds = sum(len(pcm) for _, pcm in clips) / SAMPLE_RATE
+    print(f"{len(clips)} 段音频，共 {audio_seconds:.1f} 秒，模型 {args.model}")
+
+    start = time.perf_counter()
+    if engine.recognize(clips[0][1]) is None:
+        print("识别失败，请检查PaddleSpeech是否已安装")
+        return 1
+    print(f"第一次识别(包含模型加载): {time.perf_counter() - start:.2f} 秒")
+
+    latencies = []
+    for _, pcm in clips:
+        start = time.perf_counter()
+        engine.recognize(pcm)
+        latencies.append(time.perf_counter() - start)
+    print(f"预热后逐个识别: {describe(latencies, audio_seconds)}")
+
+    start = time.perf_counter()
+    engine.recognize_batch([pcm for _, pcm in clips])
+    batch_seconds = time.perf_counter() - start
+    print(f"一次识别全部: 共 {batch_seconds:.2f} 秒, 每个文件 {batch_seconds / len(clips):.3f} 秒")
+
+    if args.cold_runs > 0:
+        # 旧的做法：每个文件新建执行器，每次都重新加载模型
+        from paddlespeech.cli.asr.infer import ASRExecutor
+
+        cold = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for index, (_, pcm) in enumerate(clips[:args.cold_runs]):
+                path = os.path.join(temp_dir, f"{index}.wav")
+                write_wav(pcm, path)
+                start = time.perf_counter()
+                ASRExecutor()(audio_file=path, model=args.model, sample_rate=SAMPLE_RATE, force_yes=True)
+                cold.append(time.perf_counter() - start)
+        cold_seconds = sum(len(pcm) for _, pcm in clips[:args.cold_runs]) / SAMPLE_RATE
+        print(f"每个文件新建执行器: {describe(cold, cold_seconds)}")
+        print(f"预热后加速比: {statistics.mean(cold) / statistics.mean(latencies[:len(cold)]):.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
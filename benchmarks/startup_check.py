@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""启动耗时回归检查
+
+冷启动 main.py 若干次，取启动到窗口显示耗时的中位数与阈值比较，
+并检查窗口显示前没有导入应延迟加载的重量级模块。超出时退出码为1。
+
+    python benchmarks/startup_check.py --max-seconds 2.5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.startup import profile_startup  # noqa: E402
+
+# 这些模块必须在窗口显示之后才导入
+DEFERRED_MODULES = ("aiohttp", "requests", "numpy", "torch", "whisper", "faster_whisper", "paddlespeech")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="启动耗时回归检查")
+    parser.add_argument("--max-seconds", type=float, default=3.0, help="启动到窗口显示的最大耗时(秒)")
+    parser.add_argument("--runs", type=int, default=3, help="冷启动次数，取中位数")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if sys.platform.startswith("linux") and not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    script = os.path.join(ROOT, "main.py")
+    failures = []
+
+    # 第一次运行记录导入的模块，其余运行只计时
+    profile = profile_startup(script, importtime=True, env=env)
+    if profile["window_seconds"] is None:
+        print(f"FAIL: 窗口未能显示 (退出码 {profile['returncode']})")
+        return 1
+    imported = {item["module"].split(".")[0] for item in profile["modules"]}
+    early = sorted(imported.intersection(DEFERRED_MODULES))
+    if early:
+        failures.append(f"窗口显示前导入了应延迟加载的模块: {', '.join(early)}")
+
+    timings = []
+    for _ in range(max(1, args.runs)):
+        result = profile_startup(script, importtime=False, env=env)
+        if result["window_seconds"] is None:
+            print(f"FAIL: 窗口未能显示 (退出码 {result['returncode']})")
+            return 1
+        timings.append(result["window_seconds"])
+
+    median = statistics.median(timings)
+    print(f"启动到窗口显示: 中位数 {median:.3f} 秒 ({', '.join(f'{t:.3f}' for t in timings)})，阈值 {args.max_seconds:.3f} 秒")
+    if median > args.max_seconds:
+        failures.append(f"启动耗时 {median:.3f} 秒超过阈值 {args.max_seconds:.3f} 秒")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Whisper 各种实现和设置的速度、内存和识别结果对比
+
+    openai          OpenAI 实现，默认设置
+    openai-cpu      OpenAI 实现，开启 cpu_profile (Linear 层 int8 量化、限制计算线程数)
+    faster-whisper  CTranslate2 转换后的模型
+
+每种设置在单独的子进程中运行，内存和线程设置互不影响；对相同的音频分别测量
+模型加载时间、实时率(RTF，识别耗时/音频时长，越小越快)和进程内存峰值，
+最后以第一种设置为基准逐个比较识别文本。
+
+    python benchmarks/whisper_backends.py --media-dir samples/ --model small \
+        --model-dir models/faster-whisper-small
+    python benchmarks/whisper_backends.py --media-dir samples/ --variants openai,openai-cpu --threads 4
+"""
+
+import argparse
+import difflib
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks._common import load_clips  # noqa: E402
+from config import Config  # noqa: E402
+from core.asr_engines import BACKEND_FASTER, BACKEND_OPENAI, get_engine  # noqa: E402
+from core.audio import SAMPLE_RATE  # noqa: E402
+
+# 对比的设置 -> whisper 引擎配置
+VARIANTS = {
+    "openai": {"backend": BACKEND_OPENAI, "cpu_profile": False},
+    "openai-cpu": {"backend": BACKEND_OPENAI, "cpu_profile": True},
+    BACKEND_FASTER: {"backend": BACKEND_FASTER},
+}
+
+
+
+def peak_memory_mb() -> float:
+    """当前进程的内存峰值(MB)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为KB，macOS 为字节
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def run_variant(args) -> int:
+    """子进程：用一种设置识别全部音频，结果以JSON输出到标准输出的最后一行"""
+    clips = load_clips(args)
+    config = Config()
+    config.speech_recognition_engine = "whisper"
+    config.ffmpeg_path = args.ffmpeg
+    options = config.speech_recognition_config["whisper"]
+    options.update({"model": args.model, "language": args.language, "threads": args.threads})
+    options.update(VARIANTS[args.variant])
+    if args.variant == BACKEND_FASTER:
+        options.update({"model_dir": args.model_dir, "compute_type": args.compute_type})
+    engine = get_engine(config)
+
+    start = time.perf_counter()
+    engine.warm_up()
+    load_seconds = time.perf_counter() - start
+
+    texts = []
+    seconds = 0.0
+    for _, pcm in clips:
+        start = time.perf_counter()
+        texts.append(engine.recognize(pcm))
+        seconds += time.perf_counter() - start
+
+    audio_seconds = sum(len(pcm) for _, pcm in clips) / SAMPLE_RATE
+    print(json.dumps({
+        "variant": args.variant,
+        "load_seconds": load_seconds,
+        "recognize_seconds": seconds,
+        "audio_seconds": audio_seconds,
+        "peak_memory_mb": peak_memory_mb(),
+        "texts": texts,
+    }, ensure_ascii=False))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Whisper各种实现和设置的对比")
+    parser.add_argument("--media-dir", help="测试音频/视频目录，不指定时使用合成音频")
+    parser.add_argument("--count", type=int, default=10, help="文件数")
+    parser.add_argument("--model", default="small", help="Whisper模型")
+    parser.add_argument("--language", default="zh", help="识别语言")
+    parser.add_argument("--model-dir", default="", help="faster-whisper模型目录，不指定时按模型名称下载")
+    parser.add_argument("--compute-type", default="int8", help="faster-whisper的量化方式")
+    parser.add_argument("--threads", type=int, default=0, help="计算线程数，0为自动")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help=f"要对比的设置，逗号分隔: {', '.join(VARIANTS)}")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg路径")
+    parser.add_argument("--variant", choices=list(VARIANTS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        return run_variant(args)
+
+    argv = list(sys.argv[1:])
+    reports = {}
+    for variant in args.variants.split(","):
+        if variant not in VARIANTS:
+            print(f"未知的设置: {variant}")
+            continue
+        process = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *argv, "--variant", variant],
+            stdout=subprocess.PIPE, text=True, encoding="utf-8"
+        )
+        lines = process.stdout.strip().splitlines()
+        if process.returncode != 0 or not lines:
+            print(f"{variant}: 运行失败")
+            continue
+        reports[variant] = json.loads(lines[-1])
+
+    if not reports:
+        return 1
+    print(f"{'设置':<16}{'加载(秒)':>10}{'识别(秒)':>10}{'RTF':>8}{'内存峰值(MB)':>14}")
+    for variant, report in reports.items():
+        rtf = report["recognize_seconds"] / report["audio_seconds"]
+        print(f"{variant:<16}{report['load_seconds']:>10.2f}{report['recognize_seconds']:>10.2f}"
+              f"{rtf:>8.3f}{report['peak_memory_mb']:>14.0f}")
+
+    if len(reports) >= 2:
+        # 以第一种设置为基准比较识别文本
+        names = list(reports)
+        baseline = reports[names[0]]
+        for name in names[1:]:
+            report = reports[name]
+            speedup = baseline["recognize_seconds"] / max(report["recognize_seconds"], 1e-9)
+            ratios = [
+                difflib.SequenceMatcher(None, a or "", b or "").ratio()
+                for a, b in zip(baseline["texts"], report["texts"])
+            ]
+            same = sum(1 for a, b in zip(baseline["texts"], report["texts"]) if (a or "").strip() == (b or "").strip())
+            print(f"{name} 相对 {names[0]}: 加速 {speedup:.1f}x, "
+                  f"文本完全相同 {same}/{len(ratios)}, 平均相似度 {sum(ratios) / max(len(ratios), 1):.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""命令行批量处理，不需要图形界面
+
+从文件或标准输入读取分享链接(每行一个，#开头为注释)，
+每个链接处理结束后输出一行JSON结果，日志和其他诊断输出写到标准错误。
+
+    python cli.py urls.txt -o results.jsonl
+    cat urls.txt | python cli.py > results.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from contextlib import contextmanager
+from typing import IO, Iterable, Iterator, List, Optional
+
+from config import Config
+from core.downloader import VideoDownloader
+
+
+def read_urls(lines: Iterable[str]) -> List[str]:
+    """
+    读取链接列表，忽略空行和注释
+    :param lines: 输入行
+    :return: 链接列表
+    """
+    urls = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            urls.append(line)
+    return urls
+
+
+@contextmanager
+def reserved_stdout() -> Iterator[IO[str]]:
+    """
+    标准输出只留给JSONL结果
+    
+    期间文件描述符1和 sys.stdout 都指向标准错误，识别引擎、模型加载等处的 print、
+    第三方库的输出和识别子进程(继承文件描述符)都不会混入结果；结束后恢复。
+    :return: 指向原标准输出的文件
+    """
+    sys.stdout.flush()
+    try:
+        fd = sys.stdout.fileno()
+        saved = os.dup(fd)
+    except (AttributeError, OSError, ValueError):
+        # 标准输出不是真实文件(如被测试框架替换)时只替换 sys.stdout
+        original = sys.stdout
+        sys.stdout = sys.stderr
+        try:
+            yield original
+        finally:
+            sys.stdout = original
+        return
+    
+    original = sys.stdout
+    result = os.fdopen(os.dup(saved), "w", encoding="utf-8", buffering=1)
+    os.dup2(sys.stderr.fileno(), fd)
+    sys.stdout = sys.stderr
+    try:
+        yield result
+    finally:
+        result.close()
+        sys.stdout = original
+        os.dup2(saved, fd)
+        os.close(saved)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="抖音视频批量下载与文案提取")
+    parser.add_argument("input", nargs="?", default="-", help="链接文件，默认为标准输入")
+    parser.add_argument("-o", "--output", default="-", help="JSONL结果文件，默认为标准输出")
+    parser.add_argument("-c", "--config", default="config.json", help="配置文件")
+    parser.add_argument("--no-audio", action="store_true", help="不保留MP3音频文件")
+    parser.add_argument("--no-text", action="store_true", help="不识别文案")
+    parser.add_argument("--no-cover", action="store_true", help="不下载封面")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出日志")
+    parser.add_argument("--metrics-port", type=int, help="开启本机统计接口(/metrics)的端口")
+    parser.add_argument("--trace", help="各阶段计时区间的JSONL跟踪文件")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> int:
+    """
+    处理所有链接
+    :param args: 命令行参数
+    :return: 退出码，有失败的链接时为1
+    """
+    with reserved_stdout() as stdout:
+        return await _process(args, stdout)
+
+
+async def _process(args: argparse.Namespace, stdout: IO[str]) -> int:
+    """
+    run 的实现，结果写到原标准输出或 --output 文件
+    :param args: 命令行参数
+    :param stdout: 原标准输出
+    :return: 退出码
+    """
+    if args.input == "-":
+        urls = read_urls(sys.stdin)
+    else:
+        with open(args.input, "r", encoding="utf-8") as f:
+            urls = read_urls(f)
+    if not urls:
+        print("没有需要处理的链接", file=sys.stderr)
+        return 0
+
+    config = Config(args.config)
+    if args.no_audio:
+        config.download_audio = False
+    if args.no_text:
+        config.extract_text = False
+    if args.no_cover:
+        config.download_cover = False
+    if args.metrics_port is not None:
+        config.metrics_port = args.metrics_port
+    if args.trace:
+        config.metrics_trace_file = args.trace
+
+    downloader = VideoDownloader(config)
+    if not args.quiet:
+        downloader.log_message.connect(lambda message: print(message, file=sys.stderr, flush=True))
+
+    output = stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    failed = 0
+
+    def write_result(job):
+        nonlocal failed
+        if job.status == job.STATUS_FAILED:
+            failed += 1
+        output.write(json.dumps(job.to_dict(), ensure_ascii=False) + "\n")
+        output.flush()
+
+    downloader.job_finished.connect(write_result)
+    try:
+        await downloader.download_videos(urls)
+    finally:
+        await downloader.close()
+        # 关闭识别进程池并释放模型，不留给解释器退出时处理
+        downloader.shutdown()
+        if output is not stdout:
+            output.close()
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    return asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
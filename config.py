@@ -3,13 +3,18 @@ import json
 from pathlib import Path
 
 class Config:
-    def __init__(self):
+    def __init__(self, config_file="config.json"):
         # 语音识别引擎配置
         self.speech_recognition_engine = "whisper"  # 默认引擎
         self.speech_recognition_config = {
             "whisper": {
                 "model": "base",  # 可选 tiny/base/small/medium/large
-                "language": "zh"
+                "language": "zh",
+                "backend": "openai",  # openai 或 faster-whisper
+                "model_dir": "",  # faster-whisper 转换后的本地模型目录，为空时按模型名称下载
+                "compute_type": "int8",  # faster-whisper 的量化方式
+                "cpu_profile": False,  # OpenAI 实现在CPU上运行时量化 Linear 层并限制计算线程数
+                "threads": 0  # 每个识别的计算线程数，0为按CPU核数和同时识别数自动决定
             },
             "google": {
                 "language": "zh-CN"
@@ -21,19 +26,26 @@ class Config:
             },
             "ali": {
                 "access_key_id": "",
-                "access_key_secret": ""
+                "access_key_secret": "",
+                "app_key": "",  # 智能语音交互项目的Appkey
+                "qps": 2.0,  # 接口每秒请求数
+                "oss_endpoint": "",  # 配置OSS后音频上传到OSS，以文件链接提交识别任务
+                "oss_bucket": ""
             },
             "xunfei": {
                 "app_id": "",
                 "api_key": "",
-                "api_secret": ""
+                "api_secret": "",
+                "language": "zh_cn",
+                "accent": "mandarin",
+                "max_sessions": 4  # 同时进行的识别会话数
             },
             "paddlespeech": {
                 "model": "conformer_wenetspeech"
             }
         }
         
-        self.config_file = "config.json"
+        self.config_file = config_file
         self.load_config()
         
     def load_config(self):
@@ -57,8 +69,30 @@ class Config:
             "use_api": True,                 # 是否使用API获取数据
             "api_timeout": 30,               # API超时时间(秒)
             "max_retries": 3,                # 最大重试次数
+            "metadata_cache_ttl": 604800,    # 视频信息缓存有效期(秒)，0为不缓存
+
+            # 并发与限速设置
+            "max_concurrent_downloads": 3,   # 同时下载的链接数
+            "audio_workers": 2,              # 同时运行的ffmpeg音频提取数
+            "asr_workers": 1,                # 同时运行的语音识别数
+            "asr_processes": 0,              # 识别进程数，0为按CPU和内存自动决定，1为不使用多进程
+            "asr_batch_size": 8,             # 一次批量识别的最多音频数，1为逐个识别
+            "vad_enabled": False,            # 识别前去掉静音和无人声的片段
+            "asr_chunk_seconds": 30,         # 长音频在静音处切分为不超过该时长(秒)的分段并行识别，0为不切分
+            "pipeline_queue_size": 4,        # 流水线每个阶段的队列容量
+            "api_rate_limit": 2.0,           # API服务器每秒请求数
+            "cdn_rate_limit": 10.0,          # 每个CDN主机每秒请求数
+            "http_pool_size": 20,            # HTTP连接池最大连接数
+            "http_per_host_limit": 6,        # 每个主机最大连接数
+            "download_segments": 4,          # 大文件分段并发下载的段数
+            "segment_threshold_mb": 20,      # 超过该大小(MB)的文件才分段下载
+
+            # 运行统计
+            "metrics_port": 0,               # 本机统计接口端口(Prometheus格式，/metrics)，0为不开启
+            "metrics_trace_file": "",        # 各阶段计时区间的JSONL跟踪文件，空为不写入
 
             # 语音识别引擎配置
+            "model_idle_timeout": 600,       # 识别模型空闲多久后释放(秒)
             "speech_recognition_engine": self.speech_recognition_engine,
             "speech_recognition_config": self.speech_recognition_config
         }
@@ -102,6 +136,24 @@ class Config:
             "use_api": self.use_api,
             "api_timeout": self.api_timeout,
             "max_retries": self.max_retries,
+            "metadata_cache_ttl": self.metadata_cache_ttl,
+            "max_concurrent_downloads": self.max_concurrent_downloads,
+            "audio_workers": self.audio_workers,
+            "asr_workers": self.asr_workers,
+            "asr_processes": self.asr_processes,
+            "asr_batch_size": self.asr_batch_size,
+            "vad_enabled": self.vad_enabled,
+            "asr_chunk_seconds": self.asr_chunk_seconds,
+            "pipeline_queue_size": self.pipeline_queue_size,
+            "api_rate_limit": self.api_rate_limit,
+            "cdn_rate_limit": self.cdn_rate_limit,
+            "http_pool_size": self.http_pool_size,
+            "http_per_host_limit": self.http_per_host_limit,
+            "download_segments": self.download_segments,
+            "segment_threshold_mb": self.segment_threshold_mb,
+            "metrics_port": self.metrics_port,
+            "metrics_trace_file": self.metrics_trace_file,
+            "model_idle_timeout": self.model_idle_timeout,
             "speech_recognition_engine": self.speech_recognition_engine,
             "speech_recognition_config": self.speech_recognition_config
         }
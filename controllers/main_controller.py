@@ -1,14 +1,35 @@
 import asyncio
 import sys
+import threading
 import traceback
-from PyQt6.QtCore import QThread, pyqtSignal
+from typing import List, Tuple
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
 from PyQt6.QtWidgets import QApplication, QMessageBox
 
 from config import Config
-from core.downloader import VideoDownloader
+from core.downloader import SpeechRecognizer, VideoDownloader
+from core.lazy import preload
+from core.model_service import get_model_service
 from ui.main_window import MainWindow
 
 
+class DownloaderSignals(QObject):
+    """把下载器的事件转发为Qt信号，事件在工作线程中发出，由Qt排队到界面线程"""
+    
+    log_message = pyqtSignal(str)
+    progress_updated = pyqtSignal(int)
+    progress_detail = pyqtSignal(dict)
+    download_finished = pyqtSignal(bool, str)
+    stage_stats = pyqtSignal(dict)
+    
+    def __init__(self, downloader):
+        super().__init__()
+        downloader.log_message.connect(self.log_message.emit)
+        downloader.progress_updated.connect(self.progress_updated.emit)
+        downloader.progress_detail.connect(self.progress_detail.emit)
+        downloader.download_finished.connect(self.download_finished.emit)
+        downloader.stage_stats.connect(self.stage_stats.emit)
+
 class DownloadThread(QThread):
     error_occurred = pyqtSignal(str)  # 添加错误信号
     
@@ -20,59 +41,95 @@ class DownloadThread(QThread):
     def run(self):
         """在新线程中运行下载任务"""
         try:
-            asyncio.run(self.downloader.download_videos(self.urls))
+            asyncio.run(self._run())
         except Exception as e:
             # 捕获所有异常并发送到主线程
             error_msg = f"下载过程中发生错误: {str(e)}\n{traceback.format_exc()}"
             self.error_occurred.emit(error_msg)
-
-class VideoImportThread(QThread):
-    error_occurred = pyqtSignal(str)  # 添加错误信号
     
-    def __init__(self, downloader, video_path):
-        super().__init__()
-        self.downloader = downloader
-        self.video_path = video_path
-        
-    def run(self):
-        """在新线程中运行视频导入和处理任务"""
+    async def _run(self):
         try:
-            asyncio.run(self.downloader.process_imported_video(self.video_path))
-        except Exception as e:
-            error_msg = f"视频处理过程中发生错误: {str(e)}\n{traceback.format_exc()}"
-            self.error_occurred.emit(error_msg)
+            await self.downloader.download_videos(self.urls)
+        finally:
+            await self.downloader.close()
 
-class AudioImportThread(QThread):
+class ImportThread(QThread):
+    """导入文件处理线程
+    
+    导入的视频和音频进入同一个队列，线程运行期间新导入的文件
+    在当前批次结束后继续处理，不会为每个文件单独启动线程。
+    """
     error_occurred = pyqtSignal(str)  # 添加错误信号
     
-    def __init__(self, downloader, audio_path):
+    def __init__(self, downloader):
         super().__init__()
         self.downloader = downloader
-        self.audio_path = audio_path
+        self._queue: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._closed = False
+    
+    def submit(self, paths: List[str], kind: str) -> bool:
+        """
+        加入导入队列
+        :param paths: 文件列表
+        :param kind: "video" 或 "audio"
+        :return: 是否已加入，线程即将结束时返回False，需要新建线程
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            self._queue.extend((path, kind) for path in paths)
+            return True
+    
+    def _take_batch(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            batch, self._queue = self._queue, []
+            if not batch:
+                self._closed = True
+            return batch
         
     def run(self):
-        """在新线程中运行音频导入和处理任务"""
+        """在新线程中处理导入队列"""
         try:
-            asyncio.run(self.downloader.import_audio(self.audio_path))
+            asyncio.run(self._run())
         except Exception as e:
-            error_msg = f"音频处理过程中发生错误: {str(e)}\n{traceback.format_exc()}"
+            error_msg = f"导入文件处理过程中发生错误: {str(e)}\n{traceback.format_exc()}"
             self.error_occurred.emit(error_msg)
+        finally:
+            with self._lock:
+                self._closed = True
+    
+    async def _run(self):
+        try:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    break
+                await self.downloader.import_media(batch)
+        finally:
+            await self.downloader.close()
 
 class MainController:
     def __init__(self):
-        self.app = QApplication(sys.argv)
+        # main.py 已创建 QApplication 时直接复用
+        self.app = QApplication.instance() or QApplication(sys.argv)
         self.config = Config()  # 先创建配置
         self.window = MainWindow()
         self.window.config = self.config  # 传递配置给窗口
         self.downloader = VideoDownloader(self.config)
+        self.signals = DownloaderSignals(self.downloader)
+        self.import_thread = None
         
         # 连接信号
         self.window.start_processing.connect(self.start_processing)
         self.window.process_imported_video.connect(self.process_imported_video)
         self.window.process_imported_audio.connect(self.process_imported_audio)
-        self.downloader.log_message.connect(self.window.log)
-        self.downloader.progress_updated.connect(self.window.update_progress)
-        self.downloader.download_finished.connect(self.processing_finished)
+        self.window.settings_changed.connect(self.settings_changed)
+        self.signals.log_message.connect(self.window.log)
+        self.signals.progress_updated.connect(self.window.update_progress)
+        self.signals.progress_detail.connect(self.window.update_progress_detail)
+        self.signals.stage_stats.connect(self.window.update_stage_stats)
+        self.signals.download_finished.connect(self.processing_finished)
         
     def start_processing(self, urls):
         """开始处理视频"""
@@ -93,24 +150,32 @@ class MainController:
         self.download_thread.error_occurred.connect(self.handle_error)
         self.download_thread.start()
         
-    def process_imported_video(self, video_path):
+    def process_imported_video(self, video_paths):
         """处理导入的视频"""
-        self.window.log(f"处理导入的视频: {video_path}")
+        self.window.log(f"处理导入的视频: {len(video_paths)} 个")
+        self._submit_import(video_paths, "video")
         
-        # 创建新线程处理视频导入
-        self.video_import_thread = VideoImportThread(self.downloader, video_path)
-        self.video_import_thread.error_occurred.connect(self.handle_error)
-        self.video_import_thread.start()
-        
-    def process_imported_audio(self, audio_path):
+    def process_imported_audio(self, audio_paths):
         """处理导入的音频"""
-        self.window.log(f"处理导入的音频: {audio_path}")
-        
-        # 创建新线程处理音频导入
-        self.audio_import_thread = AudioImportThread(self.downloader, audio_path)
-        self.audio_import_thread.error_occurred.connect(self.handle_error)
-        self.audio_import_thread.start()
+        self.window.log(f"处理导入的音频: {len(audio_paths)} 个")
+        self._submit_import(audio_paths, "audio")
+    
+    def _submit_import(self, paths, kind):
+        """加入导入队列，没有正在运行的导入线程时启动一个"""
+        if self.import_thread is not None and self.import_thread.submit(paths, kind):
+            return
+        self.import_thread = ImportThread(self.downloader)
+        self.import_thread.submit(paths, kind)
+        self.import_thread.error_occurred.connect(self.handle_error)
+        self.import_thread.start()
     
+    def settings_changed(self):
+        """设置变更后释放与当前识别设置不符的模型，相同设置的模型继续复用"""
+        model_service = get_model_service()
+        model_service.configure(self.config.model_idle_timeout)
+        model_service.retain([SpeechRecognizer.model_key(self.config)])
+        self.preload_engine()
+        
     def handle_error(self, error_message):
         """处理线程中的错误"""
         # 记录错误日志
@@ -149,7 +214,21 @@ class MainController:
         else:
             self.window.log("处理失败，请检查日志或尝试其他链接")
         
-    def run(self):
-        """运行应用"""
+    def preload_engine(self):
+        """窗口显示后在后台导入识别引擎，第一次识别时不再等待导入torch等模块"""
+        modules = SpeechRecognizer.preload_modules(self.config)
+        if modules:
+            preload(modules)
+        
+    def run(self, preload_engine: bool = True):
+        """
+        运行应用
+        :param preload_engine: 窗口显示后是否在后台预加载识别引擎，启动分析时关闭，
+                               避免后台导入计入启动耗时和导入检查
+        """
         self.window.show()
-        return self.app.exec() 
\ No newline at end of file
+        if preload_engine:
+            self.preload_engine()
+        result = self.app.exec()
+        self.downloader.shutdown()
+        return result 
\ No newline at end of file
@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from core.audio import SAMPLE_RATE
+from core.scheduler import TokenBucket
+
+
+class AliyunError(Exception):
+    """阿里云接口返回错误或识别任务失败"""
+
+
+class TaskPoller:
+    """识别任务结果的轮询器
+
+    一个事件循环中只有一个轮询协程，所有未完成的任务共用。
+    每个任务有自己的下次查询时间，查询间隔按退避系数逐渐增大，
+    轮询协程每次只查询已到期的任务，没有到期任务时休眠到最近的到期时间。
+    """
+
+    def __init__(self, asr: "AliyunAsr"):
+        self.asr = asr
+        # TaskId -> [结果Future, 下次查询时间, 当前间隔, 截止时间]
+        self._tasks: Dict[str, list] = {}
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+
+    def add(self, task_id: str) -> asyncio.Future:
+        """
+        加入轮询
+        :param task_id: 任务ID
+        :return: 识别结果的Future
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        now = loop.time()
+        self._tasks[task_id] = [
+            future, now + self.asr.POLL_INITIAL, self.asr.POLL_INITIAL, now + self.asr.TASK_TIMEOUT
+        ]
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.ensure_future(self._run())
+        self._wakeup.set()
+        return future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._tasks:
+            now = loop.time()
+            due = [task_id for task_id, item in self._tasks.items() if item[1] <= now]
+            if not due:
+                self._wakeup.clear()
+                next_time = min(item[1] for item in self._tasks.values())
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), next_time - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # 到期的任务并发查询，总速率由客户端的令牌桶限制
+            await asyncio.gather(*(self._poll(task_id) for task_id in due))
+
+    async def _poll(self, task_id: str):
+        item = self._tasks.get(task_id)
+        if item is None:
+            return
+        future = item[0]
+        try:
+            text = await self.asr.query_task(task_id)
+        except Exception as e:
+            self._tasks.pop(task_id, None)
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        now = asyncio.get_running_loop().time()
+        if text is not None:
+            self._tasks.pop(task_id, None)
+            if not future.done():
+                future.set_result(text)
+        elif now >= item[3]:
+            self._tasks.pop(task_id, None)
+            if not future.done():
+                future.set_exception(AliyunError(f"识别任务超时: {task_id}"))
+        else:
+            item[2] = min(item[2] * self.asr.POLL_BACKOFF, self.asr.POLL_MAX)
+            item[1] = now + item[2]
+
+
+class AliyunAsr:
+    """阿里云录音文件识别客户端
+
+    Token在过期前一直复用；多个文件同时提交识别任务，
+    任务结果由同一个轮询协程按退避间隔查询；
+    所有接口请求共用一个令牌桶，不超过配置的每秒请求数。
+    SDK的请求是阻塞的，只在线程池中执行单次请求，等待和轮询都在事件循环中进行。
+
+    配置了OSS时，音频压缩到临时文件后从文件上传到OSS，以签名链接(file_link)提交任务，
+    任务结束后删除上传的文件，音频不经过内存；
+    没有配置OSS时只能把压缩后的音频base64编码放在请求中提交。
+    """
+
+    REGION = "cn-shanghai"
+    META_DOMAIN = "nls-meta.cn-shanghai.aliyuncs.com"
+    FILETRANS_DOMAIN = "nls-filetrans.cn-shanghai.aliyuncs.com"
+    TOKEN_MARGIN = 300        # Token在过期前多少秒重新获取
+    POLL_INITIAL = 2.0        # 提交后第一次查询的等待时间(秒)
+    POLL_BACKOFF = 1.5        # 查询间隔的增长系数
+    POLL_MAX = 10.0           # 最大查询间隔(秒)
+    TASK_TIMEOUT = 3600       # 单个任务的最长等待时间(秒)
+    AUDIO_BITRATE = "32k"     # 上传前压缩音频的码率
+    OSS_PREFIX = "douyin-asr/"  # 上传到OSS的对象名前缀
+
+    def __init__(self, access_key_id: str, access_key_secret: str, app_key: str,
+                 qps: float = 2.0, ffmpeg_path: str = "ffmpeg", oss_endpoint: str = "", oss_bucket: str = ""):
+        """
+        :param access_key_id: AccessKey ID
+        :param access_key_secret: AccessKey Secret
+        :param app_key: 智能语音交互项目的Appkey
+        :param qps: 每秒最多请求数，<=0 表示不限制
+        :param ffmpeg_path: ffmpeg路径，用于压缩上传的音频
+        :param oss_endpoint: OSS地域节点，如 oss-cn-shanghai.aliyuncs.com，为空时不使用OSS
+        :param oss_bucket: OSS存储空间名称
+        """
+        from aliyunsdkcore.client import AcsClient
+
+        self._bucket = None
+        if oss_endpoint and oss_bucket:
+            import oss2
+
+            self._bucket = oss2.Bucket(oss2.Auth(access_key_id, access_key_secret), oss_endpoint, oss_bucket)
+
+        self.app_key = app_key
+        self.ffmpeg_path = ffmpeg_path
+        # 容量为1，不允许突发，任意一秒内的请求数都不超过qps
+        self.bucket = TokenBucket(qps, capacity=1)
+        self._client = AcsClient(access_key_id, access_key_secret, self.REGION)
+        self._token: Optional[Tuple[str, float]] = None
+        self._token_locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+        self._pollers: Dict[asyncio.AbstractEventLoop, TaskPoller] = {}
+
+    async def _call(self, request) -> Dict:
+        """
+        限速后在线程池中发送一次请求
+        :param request: CommonRequest
+        :return: 响应JSON
+        """
+        await self.bucket.acquire()
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(None, self._client.do_action_with_exception, request)
+        return json.loads(response.decode("utf-8"))
+
+    def _cached_token(self) -> Optional[str]:
+        if self._token and self._token[1] - self.TOKEN_MARGIN > time.time():
+            return self._token[0]
+        return None
+
+    async def token(self) -> str:
+        """
+        获取Token，未过期时复用
+        :return: Token
+        """
+        token = self._cached_token()
+        if token:
+            return token
+        from aliyunsdkcore.request import CommonRequest
+
+        request = CommonRequest()
+        request.set_domain(self.META_DOMAIN)
+        request.set_version("2019-02-28")
+        request.set_action_name("CreateToken")
+        request.set_method("POST")
+        # 同一事件循环中的多个任务同时发现过期时只请求一次
+        loop = asyncio.get_running_loop()
+        lock = self._token_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            token = self._cached_token()
+            if token:
+                return token
+            result = await self._call(request)
+            token_info = result.get("Token") or {}
+            if not token_info.get("Id"):
+                raise AliyunError(f"获取Token失败: {result}")
+            self._token = (token_info["Id"], float(token_info.get("ExpireTime", time.time() + 3600)))
+            return self._token[0]
+
+    async def _encode(self, audio, target: str = "pipe:1") -> bytes:
+        """
+        把音频压缩为16kHz单声道MP3，上传内容只有原文件的一小部分
+        :param audio: 音频/视频文件路径或16kHz float32 PCM
+        :param target: 输出文件，默认输出到内存
+        :return: MP3数据，输出到文件时为空
+        """
+        output = ["-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-b:a", self.AUDIO_BITRATE, "-f", "mp3", "-y", target]
+        if isinstance(audio, str):
+            cmd = [self.ffmpeg_path, "-nostdin", "-i", audio] + output
+            data = None
+        else:
+            cmd = [self.ffmpeg_path, "-f", "f32le", "-ar", str(SAMPLE_RATE), "-ac", "1", "-i", "pipe:0"] + output
+            import numpy as np
+            data = memoryview(np.ascontiguousarray(audio, dtype=np.float32)).cast("B")
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE if data is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate(data)
+        if process.returncode != 0:
+            raise AliyunError(f"音频压缩失败: {stderr.decode('utf-8', errors='ignore')[-300:]}")
+        return stdout
+
+    async def _upload(self, audio) -> str:
+        """
+        压缩音频并从临时文件上传到OSS
+        :param audio: 音频/视频文件路径或16kHz float32 PCM
+        :return: OSS对象名
+        """
+        fd, path = tempfile.mkstemp(suffix=".mp3")
+        os.close(fd)
+        try:
+            await self._encode(audio, path)
+            key = f"{self.OSS_PREFIX}{uuid.uuid4().hex}.mp3"
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._bucket.put_object_from_file, key, path)
+            return key
+        finally:
+            os.remove(path)
+
+    async def _delete_upload(self, key: str):
+        """删除上传的音频，失败时只打印错误"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._bucket.delete_object, key)
+        except Exception as e:
+            print(f"删除OSS文件失败: {key}: {str(e)}")
+
+    async def submit(self, audio, object_key: Optional[str] = None) -> str:
+        """
+        提交识别任务
+        :param audio: 音频/视频文件路径或16kHz float32 PCM
+        :param object_key: 已上传到OSS的对象名，提供时以文件链接提交，不读取音频
+        :return: TaskId
+        """
+        from aliyunsdkcore.request import CommonRequest
+
+        task = {
+            "appkey": self.app_key,
+            "first_channel_only": True,
+            "version": "4.0",
+            "enable_inverse_text_normalization": True,
+            "enable_punctuation_prediction": True,
+            "enable_words": False,
+            "enable_sample_rate_adaptive": True,
+            "speech_noise_threshold": 0.5,
+            "format": "mp3",
+            "sample_rate": SAMPLE_RATE,
+        }
+        if object_key:
+            task["token"] = await self.token()
+            # 签名链接在任务最长等待时间内有效
+            task["file_link"] = self._bucket.sign_url("GET", object_key, self.TASK_TIMEOUT)
+        else:
+            token, content = await asyncio.gather(self.token(), self._encode(audio))
+            task["token"] = token
+            task["file_link"] = ""
+            task["audio"] = base64.b64encode(content).decode("utf-8")
+            del content
+
+        request = CommonRequest()
+        request.set_domain(self.FILETRANS_DOMAIN)
+        request.set_version("2018-08-17")
+        request.set_action_name("SubmitTask")
+        request.set_method("POST")
+        request.add_body_params("Task", json.dumps(task))
+        request.add_body_params("Type", "asr")
+        result = await self._call(request)
+
+        task_id = result.get("TaskId")
+        if not task_id:
+            raise AliyunError(f"提交识别任务失败: {result}")
+        return task_id
+
+    async def query_task(self, task_id: str) -> Optional[str]:
+        """
+        查询一次任务结果
+        :param task_id: TaskId
+        :return: 识别文本，任务未完成时为None，没有有效语音时为空字符串
+        """
+        from aliyunsdkcore.request import CommonRequest
+
+        request = CommonRequest()
+        request.set_domain(self.FILETRANS_DOMAIN)
+        request.set_version("2018-08-17")
+        request.set_action_name("GetTaskResult")
+        request.set_method("GET")
+        request.add_query_param("TaskId", task_id)
+        result = await self._call(request)
+
+        status = result.get("StatusText")
+        if status in ("RUNNING", "QUEUEING"):
+            return None
+        if status == "SUCCESS_WITH_NO_VALID_FRAGMENT":
+            # 音频中没有有效语音
+            return ""
+        if status != "SUCCESS":
+            raise AliyunError(f"识别任务失败: {result}")
+        sentences = result.get("Result") or {}
+        if isinstance(sentences, str):
+            sentences = json.loads(sentences)
+        return " ".join(s.get("Text", "") for s in sentences.get("Sentences", []))
+
+    def _poller(self) -> TaskPoller:
+        """当前事件循环的轮询器"""
+        loop = asyncio.get_running_loop()
+        poller = self._pollers.get(loop)
+        if poller is None:
+            # 清理已关闭事件循环遗留的状态
+            for other_loop in [l for l in self._pollers if l.is_closed()]:
+                self._pollers.pop(other_loop, None)
+                self._token_locks.pop(other_loop, None)
+            poller = TaskPoller(self)
+            self._pollers[loop] = poller
+        return poller
+
+    async def recognize(self, audio) -> str:
+        """
+        识别一个音频：提交任务后等待轮询结果
+        :param audio: 音频/视频文件路径或16kHz float32 PCM
+        :return: 识别文本，没有有效语音时为空字符串
+        """
+        if self._bucket is None:
+            task_id = await self.submit(audio)
+            return await self._poller().add(task_id)
+        object_key = await self._upload(audio)
+        try:
+            task_id = await self.submit(audio, object_key)
+            return await self._poller().add(task_id)
+        finally:
+            await self._delete_upload(object_key)
+
+    async def recognize_many(self, audios: List) -> List[Optional[str]]:
+        """
+        同时提交多个音频，结果由同一个轮询协程查询
+        :param audios: 音频/视频文件路径或16kHz float32 PCM
+        :return: 识别文本，与输入顺序一致，失败的为None
+        """
+        results = await asyncio.gather(*(self.recognize(audio) for audio in audios), return_exceptions=True)
+        texts = []
+        for result in results:
+            if isinstance(result, BaseException):
+                print(f"阿里云语音识别出错: {str(result)}")
+                texts.append(None)
+            else:
+                texts.append(result)
+        return texts
+
+
+# 按账号复用客户端，Token在多次识别之间共享
+_clients: Dict[Tuple, AliyunAsr] = {}
+_clients_lock = threading.Lock()
+
+
+def get_aliyun_asr(access_key_id: str, access_key_secret: str, app_key: str,
+                   qps: float = 2.0, ffmpeg_path: str = "ffmpeg", oss_endpoint: str = "",
+                   oss_bucket: str = "") -> AliyunAsr:
+    """
+    获取客户端，相同账号和设置复用同一个实例
+    :return: 客户端
+    """
+    key = (access_key_id, access_key_secret, app_key, qps, ffmpeg_path, oss_endpoint, oss_bucket)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = AliyunAsr(access_key_id, access_key_secret, app_key, qps, ffmpeg_path, oss_endpoint, oss_bucket)
+            _clients[key] = client
+        return client
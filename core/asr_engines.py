@@ -0,0 +1,628 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import traceback
+from typing import Dict, List, Optional, Tuple, Type
+
+from core.audio import SAMPLE_RATE, decode_pcm, write_wav
+from core.model_service import get_model_service
+
+BOUND_CPU = "cpu"            # 本地模型，占用CPU/GPU和内存
+BOUND_NETWORK = "network"    # 云端接口，主要等待网络
+
+LOAD_HIGH = "high"           # 需要加载模型，耗时数秒并常驻内存
+LOAD_LOW = "low"             # 只创建客户端
+
+BACKEND_OPENAI = "openai"                # OpenAI Whisper (PyTorch)
+BACKEND_FASTER = "faster-whisper"        # faster-whisper (CTranslate2)
+
+
+class AsrEngine:
+    """识别引擎基类
+
+    引擎实例按设置缓存，模型、执行器和客户端在第一次识别时才创建。
+    同步方法在线程池或识别进程中调用，异步方法在事件循环中调用；
+    本地引擎的异步方法默认在线程池中执行同步方法，云端引擎则相反。
+    """
+
+    name = ""
+    default_model = ""
+
+    def __init__(self, config):
+        """
+        :param config: 配置对象
+        """
+        self.config = config
+        self.options: Dict = config.speech_recognition_config.get(self.name, {})
+        self.ffmpeg_path = config.ffmpeg_path
+        self.model_service = get_model_service()
+
+    @classmethod
+    def model_id(cls, options: Dict) -> str:
+        """
+        引擎配置对应的模型标识，设置不同但加载同一个模型时相同
+        :param options: 引擎配置
+        :return: 模型标识
+        """
+        return options.get('model', cls.default_model)
+
+    @classmethod
+    def modules_for(cls, options: Dict) -> Optional[Tuple[str, ...]]:
+        """
+        引擎配置需要预先导入的模块，与注册信息不同时返回
+        :param options: 引擎配置
+        :return: 模块名，None 表示使用注册信息中的模块
+        """
+        return None
+
+    def recognize(self, audio) -> Optional[str]:
+        """
+        识别一个音频
+        :param audio: 音频文件路径或16kHz单声道float32 PCM
+        :return: 识别文本，没有人声时为空字符串，失败时为None
+        """
+        raise NotImplementedError
+
+    def recognize_batch(self, audios: List) -> List[Optional[str]]:
+        """
+        识别多个音频
+        :param audios: 音频文件路径或PCM数组
+        :return: 识别文本，与输入顺序一致
+        """
+        return [self.recognize(audio) for audio in audios]
+
+    def warm_up(self):
+        """提前加载模型，识别进程启动时调用，第一次识别不再等待加载"""
+
+    async def recognize_async(self, audio) -> Optional[str]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.recognize, audio)
+
+    async def recognize_batch_async(self, audios: List) -> List[Optional[str]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.recognize_batch, audios)
+
+
+class WhisperEngine(AsrEngine):
+    """Whisper
+
+    backend 为 openai 时使用 OpenAI 的 PyTorch 实现；
+    为 faster-whisper 时使用 CTranslate2 转换后的模型(默认 int8 量化)，
+    模型从 model_dir 指定的本地目录加载，只用CPU时速度快得多、内存也更少。
+    两种实现都按相同的方式拼接分段文本，识别结果可以互相替换。
+
+    OpenAI 实现开启 cpu_profile 后，在CPU上加载模型时把 Linear 层动态量化为 int8，
+    并按同时识别的数量限制每个识别的计算线程数，避免多个识别争抢CPU。
+    """
+
+    name = "whisper"
+    default_model = "base"
+
+    @classmethod
+    def model_id(cls, options: Dict) -> str:
+        model = options.get('model', cls.default_model)
+        if options.get('backend', BACKEND_OPENAI) == BACKEND_FASTER:
+            # 不同目录、不同量化方式的模型输出不完全相同，分别缓存
+            return f"{BACKEND_FASTER}:{options.get('model_dir') or model}:{options.get('compute_type', 'int8')}"
+        if options.get('cpu_profile', False):
+            # 量化后的识别结果与原模型略有不同
+            return f"{model}-int8"
+        return model
+
+    @classmethod
+    def modules_for(cls, options: Dict) -> Optional[Tuple[str, ...]]:
+        if options.get('backend', BACKEND_OPENAI) == BACKEND_FASTER:
+            return ("faster_whisper",)
+        return None
+
+    @property
+    def model_name(self) -> str:
+        return self.options.get('model', self.default_model)
+
+    @property
+    def language(self) -> str:
+        return self.options.get('language', 'zh')
+
+    @property
+    def backend(self) -> str:
+        return self.options.get('backend', BACKEND_OPENAI)
+
+    @property
+    def model_key(self) -> Tuple[str, str, str]:
+        return "whisper", self.model_id(self.options), self.language
+
+    def cpu_threads(self) -> int:
+        """
+        每个识别的计算线程数：配置的 threads，
+        识别进程中为进程池设置的线程数，否则按同时识别的数量平分CPU核数
+        :return: 线程数
+        """
+        threads = int(self.options.get('threads', 0))
+        if threads > 0:
+            return threads
+        env_threads = os.environ.get("OMP_NUM_THREADS", "")
+        if env_threads.isdigit() and int(env_threads) > 0:
+            return int(env_threads)
+        return max(1, (os.cpu_count() or 1) // max(1, self.config.asr_workers))
+
+    def _tune_for_cpu(self, model):
+        """
+        CPU推理设置，只在加载模型时执行一次
+        :param model: 已加载到CPU的模型
+        :return: Linear 层量化为 int8 的模型
+        """
+        import torch
+
+        threads = self.cpu_threads()
+        # 线程数对整个进程生效，之后开始识别的线程都使用这个设置
+        torch.set_num_threads(threads)
+        # whisper 的 Linear 是 nn.Linear 的子类，只在 fp16 时转换权重类型，
+        # 动态量化只替换 nn.Linear 本身，先还原为 nn.Linear
+        for module in model.modules():
+            if isinstance(module, torch.nn.Linear):
+                module.__class__ = torch.nn.Linear
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        print(f"Whisper模型已量化为int8，计算线程数: {threads}")
+        return model
+
+    def _load(self):
+        if self.backend == BACKEND_FASTER:
+            from faster_whisper import WhisperModel
+
+            # model_dir 为空时按模型名称从 Hugging Face 下载
+            return WhisperModel(
+                self.options.get('model_dir') or self.model_name,
+                device=self.options.get('device', 'cpu'),
+                compute_type=self.options.get('compute_type', 'int8'),
+                cpu_threads=self.cpu_threads()
+            )
+        import whisper
+        model = whisper.load_model(self.model_name)
+        if self.options.get('cpu_profile', False) and model.device.type == "cpu":
+            model = self._tune_for_cpu(model)
+        return model
+
+    def _import_backend(self, warn: bool = True) -> bool:
+        """
+        确认当前实现的库已安装
+        :param warn: 未安装时是否提示
+        :return: 是否已安装
+        """
+        try:
+            if self.backend == BACKEND_FASTER:
+                import faster_whisper  # noqa: F401
+            else:
+                import whisper  # noqa: F401
+            return True
+        except ImportError:
+            if not warn:
+                return False
+            if self.backend == BACKEND_FASTER:
+                print("Warning: faster-whisper库未安装，请使用pip install faster-whisper安装")
+            else:
+                print("Warning: Whisper库未安装，请使用pip install openai-whisper安装")
+            return False
+
+    def warm_up(self):
+        if not self._import_backend(warn=False):
+            return
+        with self.model_service.use(self.model_key, self._load):
+            pass
+
+    def _transcribe(self, model, audio) -> str:
+        """
+        用已加载的模型识别一个音频
+        :param model: 模型
+        :param audio: 音频文件路径或16kHz单声道float32 PCM
+        :return: 识别文本
+        """
+        if self.backend == BACKEND_FASTER:
+            # 默认贪心解码并在质量差时升温重试，与 OpenAI 实现的 transcribe 默认行为一致
+            segments, _ = model.transcribe(
+                audio, language=self.language, beam_size=int(self.options.get('beam_size', 1))
+            )
+            # transcribe 返回生成器，遍历时才真正解码
+            return "".join(segment.text for segment in segments)
+        import torch
+        with torch.inference_mode():
+            return model.transcribe(
+                audio, language=self.language, fp16=model.device.type == "cuda"
+            ).get('text', '')
+
+    def recognize(self, audio) -> Optional[str]:
+        if not self._import_backend():
+            return None
+        try:
+            print(f"使用Whisper模型 {self.model_id(self.options)} 识别音频...")
+
+            # 从模型服务获取模型，已加载时直接复用
+            with self.model_service.use(self.model_key, self._load) as model:
+                print(f"使用设备: {getattr(model, 'device', 'cpu')}")
+                text = self._transcribe(model, audio)
+
+            print(f"Whisper识别完成，文本长度: {len(text)} 字符")
+            return text
+        except Exception as e:
+            print(f"Whisper识别出错: {str(e)}")
+            print(traceback.format_exc())
+            return None
+
+    def recognize_batch(self, audios: List) -> List[Optional[str]]:
+        """
+        把不超过30秒的音频补齐到30秒窗口后一次送入编码器和解码器，
+        超过30秒的音频逐个识别
+        """
+        if len(audios) <= 1 or self.backend == BACKEND_FASTER:
+            # CTranslate2 模型本身已经很快，逐个识别
+            return [self.recognize(audio) for audio in audios]
+        if not self._import_backend():
+            return [None] * len(audios)
+
+        try:
+            return self._recognize_batch(audios)
+        except Exception as e:
+            print(f"Whisper批量识别出错，改为逐个识别: {str(e)}")
+            print(traceback.format_exc())
+            return [self.recognize(audio) for audio in audios]
+
+    def _recognize_batch(self, audios: List) -> List[Optional[str]]:
+        import torch
+        import whisper
+
+        language = self.language
+        key = self.model_key
+
+        # 文件路径先解码为PCM
+        pcms = [audio if not isinstance(audio, str) else whisper.load_audio(audio) for audio in audios]
+        results: List[Optional[str]] = [None] * len(pcms)
+        short = [i for i, pcm in enumerate(pcms) if len(pcm) <= whisper.audio.N_SAMPLES]
+
+        with self.model_service.use(key, self._load) as model:
+            if short:
+                print(f"Whisper批量识别 {len(short)} 段音频...")
+                n_mels = getattr(model.dims, "n_mels", 80)
+                mel = torch.stack([
+                    whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(pcms[i])), n_mels)
+                    for i in short
+                ]).to(model.device)
+                options = whisper.DecodingOptions(
+                    language=language,
+                    without_timestamps=True,
+                    fp16=model.device.type == "cuda"
+                )
+                with torch.inference_mode():
+                    decoded = whisper.decode(model, mel, options)
+
+                for i, result in zip(short, decoded):
+                    # 与 transcribe 相同的判断：无语音时为空，质量差时逐个识别(带温度回退)
+                    if result.no_speech_prob > 0.6 and result.avg_logprob < -1.0:
+                        results[i] = ""
+                    elif result.compression_ratio > 2.4 or result.avg_logprob < -1.0:
+                        results[i] = self._transcribe(model, pcms[i])
+                    else:
+                        results[i] = result.text
+
+            for i, pcm in enumerate(pcms):
+                if len(pcm) > whisper.audio.N_SAMPLES:
+                    results[i] = self._transcribe(model, pcm)
+
+        print(f"Whisper批量识别完成: {len(pcms)} 段")
+        return results
+
+
+class PaddleSpeechEngine(AsrEngine):
+    """PaddleSpeech
+
+    执行器由模型服务缓存，模型只在第一次识别时加载，之后的识别直接复用。
+    执行器保存了每次识别的中间状态，同一时间只能处理一个音频。
+    """
+
+    name = "paddlespeech"
+    default_model = "conformer_wenetspeech"
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._lock = threading.Lock()
+
+    @property
+    def model_name(self) -> str:
+        return self.options.get('model', self.default_model)
+
+    @property
+    def language(self) -> str:
+        return self.options.get('language', 'zh')
+
+    def warm_up(self):
+        """识别一秒静音，提前加载模型"""
+        import numpy as np
+        self.recognize(np.zeros(SAMPLE_RATE, dtype=np.float32))
+
+    def recognize(self, audio) -> Optional[str]:
+        return self.recognize_batch([audio])[0]
+
+    def recognize_batch(self, audios: List) -> List[Optional[str]]:
+        """一次识别多个音频文件或PCM数组，共用同一个已加载的执行器"""
+        try:
+            # 确认PaddleSpeech已安装
+            from paddlespeech.cli.asr.infer import ASRExecutor
+        except ImportError:
+            print("PaddleSpeech未安装，请按照官方文档安装: https://github.com/PaddlePaddle/PaddleSpeech")
+            return [None] * len(audios)
+
+        print(f"使用PaddleSpeech模型 {self.model_name} 识别 {len(audios)} 段音频...")
+        results: List[Optional[str]] = []
+        temp_dir = None
+        # 与 EngineSpec.model_key 一致，设置变更时不会被当作过期模型释放
+        key = ("paddlespeech", self.model_name, self.language)
+        try:
+            with self._lock, self.model_service.use(key, ASRExecutor) as asr:
+                for index, audio in enumerate(audios):
+                    try:
+                        # PaddleSpeech只接受文件路径，PCM数组先写为临时WAV
+                        if not isinstance(audio, str):
+                            if temp_dir is None:
+                                temp_dir = tempfile.mkdtemp(prefix="paddlespeech_")
+                            path = os.path.join(temp_dir, f"{index}.wav")
+                            write_wav(audio, path)
+                            audio = path
+                        results.append(asr(
+                            audio_file=audio, model=self.model_name, lang=self.language,
+                            sample_rate=SAMPLE_RATE, force_yes=True
+                        ))
+                    except (Exception, SystemExit) as e:
+                        # 音频检查不通过时PaddleSpeech会调用sys.exit
+                        print(f"PaddleSpeech识别出错: {str(e)}")
+                        results.append(None)
+        except Exception as e:
+            print(f"PaddleSpeech识别出错: {str(e)}")
+            results += [None] * (len(audios) - len(results))
+        finally:
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        return results
+
+
+class CloudEngine(AsrEngine):
+    """云端引擎：在事件循环中等待网络，同步调用时临时运行一个事件循环
+
+    异步调用可以传入共享的aiohttp会话(HttpClient连接池)，不传时由引擎临时创建。
+    """
+
+    def recognize(self, audio) -> Optional[str]:
+        return asyncio.run(self.recognize_async(audio))
+
+    def recognize_batch(self, audios: List) -> List[Optional[str]]:
+        return asyncio.run(self.recognize_batch_async(audios))
+
+    async def recognize_async(self, audio, session=None) -> Optional[str]:
+        raise NotImplementedError
+
+    async def recognize_batch_async(self, audios: List, session=None) -> List[Optional[str]]:
+        return list(await asyncio.gather(*(self.recognize_async(audio, session) for audio in audios)))
+
+
+class XunfeiEngine(CloudEngine):
+    """讯飞语音听写(流式版)"""
+
+    name = "xunfei"
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            from core.xunfei_asr import XunfeiAsr
+
+            app_id = self.options.get('app_id', '')
+            api_key = self.options.get('api_key', '')
+            api_secret = self.options.get('api_secret', '')
+            if not app_id or not api_key or not api_secret:
+                print("讯飞语音识别API配置不完整")
+                return None
+            self._client = XunfeiAsr(
+                app_id, api_key, api_secret,
+                language=self.options.get('language', 'zh_cn'),
+                accent=self.options.get('accent', 'mandarin'),
+                max_sessions=self.options.get('max_sessions', 4)
+            )
+        return self._client
+
+    async def recognize_async(self, audio, session=None) -> Optional[str]:
+        try:
+            client = self._get_client()
+            if client is None:
+                return None
+            # 讯飞接口只接受16kHz 16bit PCM，文件先解码
+            if isinstance(audio, str):
+                loop = asyncio.get_running_loop()
+                audio = await loop.run_in_executor(None, decode_pcm, self.ffmpeg_path, audio)
+            print("使用讯飞语音识别...")
+            return await client.recognize(audio, session)
+        except ImportError:
+            print("讯飞语音识别需要安装aiohttp库，请使用pip install aiohttp安装")
+            return None
+        except Exception as e:
+            print(f"讯飞语音识别出错: {str(e)}")
+            print(traceback.format_exc())
+            return None
+
+
+class AliyunEngine(CloudEngine):
+    """阿里云录音文件识别"""
+
+    name = "ali"
+
+    def _get_client(self):
+        from core.aliyun_asr import get_aliyun_asr
+
+        access_key_id = self.options.get('access_key_id', '')
+        access_key_secret = self.options.get('access_key_secret', '')
+        # 旧配置没有单独的appkey，沿用access_key_id
+        app_key = self.options.get('app_key', '') or access_key_id
+        if not access_key_id or not access_key_secret:
+            print("阿里云语音识别API配置不完整")
+            return None
+        return get_aliyun_asr(
+            access_key_id, access_key_secret, app_key,
+            qps=self.options.get('qps', 2.0),
+            ffmpeg_path=self.ffmpeg_path,
+            oss_endpoint=self.options.get('oss_endpoint', ''),
+            oss_bucket=self.options.get('oss_bucket', '')
+        )
+
+    async def recognize_async(self, audio, session=None) -> Optional[str]:
+        return (await self.recognize_batch_async([audio], session))[0]
+
+    async def recognize_batch_async(self, audios: List, session=None) -> List[Optional[str]]:
+        """多个音频同时提交，共用一个结果轮询(通过SDK请求，不使用aiohttp会话)"""
+        try:
+            client = self._get_client()
+            if client is None:
+                return [None] * len(audios)
+            print(f"使用阿里云语音识别 {len(audios)} 段音频...")
+            return await client.recognize_many(audios)
+        except ImportError as e:
+            if e.name == "oss2":
+                print("阿里云语音识别使用OSS上传需要安装oss2，请使用pip install oss2安装")
+            else:
+                print("阿里云语音识别需要安装aliyun-python-sdk-core，请使用pip install aliyun-python-sdk-core安装")
+            return [None] * len(audios)
+        except Exception as e:
+            print(f"阿里云语音识别出错: {str(e)}")
+            return [None] * len(audios)
+
+
+class EngineSpec:
+    """识别引擎的注册信息"""
+
+    def __init__(self, name: str, label: str, engine_class: Type[AsrEngine], bound: str, load_cost: str,
+                 max_concurrency: int, modules: Tuple[str, ...] = (), aliases: Tuple[str, ...] = (),
+                 credentials: Tuple[Tuple[str, str], ...] = ()):
+        """
+        :param name: 引擎名，也是 speech_recognition_config 中的键
+        :param label: 界面显示名称
+        :param engine_class: 引擎类
+        :param bound: BOUND_CPU 或 BOUND_NETWORK
+        :param load_cost: LOAD_HIGH 或 LOAD_LOW
+        :param max_concurrency: 默认最大并发数；本地引擎为每个识别进程的并发数，可在引擎配置中用 max_concurrency 覆盖
+        :param modules: 第一次识别前需要导入的重量级模块，界面启动后在后台预先导入
+        :param aliases: 配置中可能出现的其他名称
+        :param credentials: 需要在设置中填写的 (配置键, 显示名称)
+        """
+        self.name = name
+        self.label = label
+        self.engine_class = engine_class
+        self.bound = bound
+        self.load_cost = load_cost
+        self.max_concurrency = max_concurrency
+        self.modules = modules
+        self.aliases = aliases
+        self.credentials = credentials
+
+    @property
+    def is_network(self) -> bool:
+        return self.bound == BOUND_NETWORK
+
+    def concurrency(self, config) -> int:
+        """
+        最大并发数
+        :param config: 配置对象
+        :return: 并发数
+        """
+        options = config.speech_recognition_config.get(self.name, {})
+        return max(1, int(options.get('max_concurrency', self.max_concurrency)))
+
+    def model_key(self, config) -> Tuple[str, str, str]:
+        """
+        识别设置对应的模型键 (引擎, 模型, 语言)，用于模型缓存、进程池和识别结果缓存
+        :param config: 配置对象
+        :return: 模型键
+        """
+        options = config.speech_recognition_config.get(self.name, {})
+        return self.name, self.engine_class.model_id(options), options.get('language', 'zh')
+
+    def preload_modules(self, config) -> Tuple[str, ...]:
+        """
+        当前设置需要预先导入的模块
+        :param config: 配置对象
+        :return: 模块名
+        """
+        options = config.speech_recognition_config.get(self.name, {})
+        modules = self.engine_class.modules_for(options)
+        return self.modules if modules is None else modules
+
+
+DEFAULT_ENGINE = "whisper"
+
+# 按界面中的显示顺序排列
+ENGINES: Dict[str, EngineSpec] = {}
+
+
+def register_engine(spec: EngineSpec):
+    """
+    注册识别引擎
+    :param spec: 引擎信息
+    """
+    ENGINES[spec.name] = spec
+
+
+register_engine(EngineSpec(
+    "whisper", "Whisper (OpenAI)", WhisperEngine, BOUND_CPU, LOAD_HIGH, 1,
+    modules=("torch", "whisper")
+))
+register_engine(EngineSpec(
+    "paddlespeech", "PaddleSpeech", PaddleSpeechEngine, BOUND_CPU, LOAD_HIGH, 1,
+    modules=("paddlespeech.cli.asr.infer",)
+))
+register_engine(EngineSpec(
+    "xunfei", "讯飞语音听写", XunfeiEngine, BOUND_NETWORK, LOAD_LOW, 4,
+    modules=("aiohttp",), aliases=("讯飞",),
+    credentials=(("app_id", "APPID"), ("api_key", "APIKey"), ("api_secret", "APISecret"))
+))
+register_engine(EngineSpec(
+    "ali", "阿里云录音文件识别", AliyunEngine, BOUND_NETWORK, LOAD_LOW, 16,
+    modules=("aliyunsdkcore.client",), aliases=("aliyun", "阿里云"),
+    credentials=(("access_key_id", "AccessKey ID"), ("access_key_secret", "AccessKey Secret"), ("app_key", "Appkey"),
+                 ("oss_endpoint", "OSS Endpoint(可选)"), ("oss_bucket", "OSS Bucket(可选)"))
+))
+
+
+def resolve_engine(name: str) -> EngineSpec:
+    """
+    按名称、显示名称或别名查找引擎，找不到时使用Whisper
+    :param name: 配置中的引擎名
+    :return: 引擎信息
+    """
+    for spec in ENGINES.values():
+        if name == spec.name or name == spec.label or name in spec.aliases:
+            return spec
+    return ENGINES[DEFAULT_ENGINE]
+
+
+# 引擎实例按 (引擎, 引擎配置) 缓存，设置不变时复用已创建的客户端
+_engines: Dict[Tuple, AsrEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(config) -> AsrEngine:
+    """
+    获取当前设置的引擎实例，第一次使用时创建
+    :param config: 配置对象
+    :return: 引擎
+    """
+    spec = resolve_engine(config.speech_recognition_engine)
+    options = config.speech_recognition_config.get(spec.name, {})
+    key = (spec.name, json.dumps(options, sort_keys=True), config.ffmpeg_path)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = spec.engine_class(config)
+            _engines[key] = engine
+        return engine
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Hashable, List, Optional, Tuple
+
+from core.asr_engines import BACKEND_FASTER
+
+# 各模型常驻内存的估算值(MB)，用于按可用内存决定进程数
+MODEL_MEMORY_MB = {
+    ("whisper", "tiny"): 1000,
+    ("whisper", "base"): 1000,
+    ("whisper", "small"): 2000,
+    ("whisper", "medium"): 5000,
+    ("whisper", "large"): 10000,
+    ("paddlespeech", "conformer_wenetspeech"): 2000,
+}
+# faster-whisper int8 模型的常驻内存估算值(MB)，按模型大小
+INT8_WHISPER_MEMORY_MB = {"tiny": 300, "base": 400, "small": 800, "medium": 1800, "large": 3500}
+WHISPER_SIZES = ("large", "medium", "small", "base", "tiny")
+DEFAULT_MODEL_MEMORY_MB = 2000
+MEMORY_BUDGET = 0.7          # 最多使用可用内存的比例
+MIN_THREADS_PER_WORKER = 2   # 每个识别进程至少分到的CPU核数
+
+
+def available_memory_mb() -> Optional[int]:
+    """
+    当前可用物理内存
+    :return: MB，无法获取时为None
+    """
+    try:
+        import psutil
+        return psutil.virtual_memory().available // (1024 * 1024)
+    except ImportError:
+        pass
+
+    if os.path.exists("/proc/meminfo"):
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+
+    if sys.platform == "win32":
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys // (1024 * 1024)
+    return None
+
+
+def model_memory_mb(model_key: Tuple[str, str, str]) -> int:
+    """
+    模型常驻内存的估算值
+    
+    Whisper 的模型标识可能带有后端、目录和量化方式(见 WhisperEngine.model_id)，
+    先还原为 tiny/base/small/medium/large 再查表。
+    :param model_key: (引擎, 模型, 语言)
+    :return: MB
+    """
+    engine, model = model_key[0], str(model_key[1])
+    if engine != "whisper":
+        return MODEL_MEMORY_MB.get((engine, model), DEFAULT_MODEL_MEMORY_MB)
+    
+    int8 = False
+    name = model
+    if model.startswith(f"{BACKEND_FASTER}:"):
+        # faster-whisper:模型名或目录:计算类型
+        name, _, compute_type = model[len(BACKEND_FASTER) + 1:].rpartition(":")
+        int8 = compute_type.startswith("int8")
+    elif model.endswith("-int8"):
+        # CPU方案先加载完整模型再量化，内存峰值与原模型相同
+        name = model[:-len("-int8")]
+    name = os.path.basename(name.replace("\\", "/").rstrip("/")).lower()
+    size = next((size for size in WHISPER_SIZES if size in name), None)
+    if size is None:
+        return DEFAULT_MODEL_MEMORY_MB
+    return INT8_WHISPER_MEMORY_MB[size] if int8 else MODEL_MEMORY_MB[("whisper", size)]
+
+
+def pool_size(model_key: Tuple[str, str, str], processes: int = 0) -> int:
+    """
+    识别进程数
+    :param model_key: (引擎, 模型, 语言)
+    :param processes: 配置的进程数，<=0 时按CPU核数和可用内存自动决定
+    :return: 进程数，1表示在本进程中识别
+    """
+    if processes > 0:
+        return processes
+
+    by_cpu = max(1, (os.cpu_count() or 1) // MIN_THREADS_PER_WORKER)
+    memory = available_memory_mb()
+    if memory is None:
+        return min(by_cpu, 2)
+    model_memory = model_memory_mb(model_key)
+    by_memory = int(memory * MEMORY_BUDGET // model_memory)
+    return max(1, min(by_cpu, by_memory))
+
+
+# 工作进程内的识别器，每个进程只加载一次模型
+_recognizer = None
+
+
+def _init_worker(config, threads: int):
+    """工作进程初始化：限制计算线程数，避免多个进程争抢CPU"""
+    # 直接覆盖从父进程继承的设置，否则每个进程都按继承的线程数计算
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+
+    global _recognizer
+    from core.asr_engines import get_engine
+    from core.downloader import SpeechRecognizer
+    from core.model_service import get_model_service
+    # 工作进程只服务一个模型，不单独释放；整个进程池空闲时由主进程关闭(见 AsrPool.close_idle)
+    get_model_service().configure(0)
+    _recognizer = SpeechRecognizer(config)
+    # 进程启动时就加载模型，保持常驻，之后的识别不再等待加载
+    try:
+        get_engine(config).warm_up()
+    except Exception as e:
+        # 预热失败不影响进程启动，第一次识别时会再次加载
+        print(f"识别进程预热失败: {str(e)}")
+
+
+def _recognize(audio):
+    return _recognizer.recognize(audio)
+
+
+def _recognize_batch(audios):
+    return _recognizer.recognize_batch(audios)
+
+
+class AsrPool:
+    """多进程语音识别池
+
+    每个工作进程常驻一个模型，识别任务按进程数并行执行，
+    不受主进程GIL的限制。使用 spawn 启动，避免在已有Qt和线程的进程中fork。
+    整个进程池空闲超过 model_idle_timeout 秒后关闭所有工作进程，释放各进程中的模型，
+    下次识别时重新启动。
+    """
+
+    def __init__(self, config, size: int, key: Hashable):
+        """
+        :param config: 配置对象(复制到工作进程)
+        :param size: 进程数
+        :param key: 创建时的识别设置，设置变化后需要重建进程池
+        """
+        self.config = config
+        self.size = size
+        self.key = key
+        self.broken = False
+        self._threads = max(1, (os.cpu_count() or 1) // size)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_use = 0
+        self._last_used = time.monotonic()
+        self._janitor: Optional[threading.Thread] = None
+        self._closed = False   # 已调用 shutdown，检查线程退出
+
+    @property
+    def idle_timeout(self) -> float:
+        """空闲多久后关闭工作进程(秒)，<=0 表示不关闭，与模型的空闲释放时间相同"""
+        return self.config.model_idle_timeout
+
+    def _acquire(self) -> ProcessPoolExecutor:
+        """取得进程池并标记为使用中，已因空闲关闭时重新创建"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.config, self._threads)
+                )
+                self._closed = False
+                self._start_janitor()
+            self._in_use += 1
+            return self._executor
+
+    def _release(self):
+        with self._lock:
+            self._in_use -= 1
+            self._last_used = time.monotonic()
+
+    async def _run(self, func, arg):
+        executor = self._acquire()
+        loop = asyncio.get_event_loop()
+        try:
+            return await loop.run_in_executor(executor, func, arg)
+        except BrokenProcessPool:
+            # 工作进程异常退出(如内存不足)，下次使用时重建
+            self.broken = True
+            raise
+        finally:
+            self._release()
+
+    async def recognize(self, audio):
+        """
+        在工作进程中识别
+        :param audio: 音频文件路径或16kHz PCM数组
+        :return: 识别文本
+        """
+        return await self._run(_recognize, audio)
+
+    async def recognize_batch(self, audios: List) -> List[Optional[str]]:
+        """
+        在同一个工作进程中批量识别
+        :param audios: 音频文件路径或16kHz PCM数组
+        :return: 识别文本，与输入顺序一致
+        """
+        return await self._run(_recognize_batch, audios)
+
+    def close_idle(self) -> bool:
+        """
+        空闲超时后关闭工作进程
+        :return: 是否已关闭
+        """
+        with self._lock:
+            idle_timeout = self.idle_timeout
+            if self._executor is None or self._in_use or idle_timeout <= 0:
+                return False
+            if time.monotonic() - self._last_used < idle_timeout:
+                return False
+            executor, self._executor = self._executor, None
+        executor.shutdown(wait=False)
+        print(f"识别进程空闲超过 {idle_timeout:g} 秒，已关闭 {self.size} 个识别进程")
+        return True
+
+    def shutdown(self):
+        """关闭进程池，不等待正在执行的任务"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._closed = True
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _start_janitor(self):
+        """启动后台检查线程(只启动一次)"""
+        if self._janitor is not None and self._janitor.is_alive():
+            return
+        self._janitor = threading.Thread(target=self._janitor_loop, name="asr-pool-janitor", daemon=True)
+        self._janitor.start()
+
+    def _janitor_loop(self):
+        while True:
+            idle_timeout = self.idle_timeout
+            time.sleep(min(max(idle_timeout / 2, 1), 60) if idle_timeout > 0 else 60)
+            with self._lock:
+                if self._closed:
+                    self._janitor = None
+                    return
+            self.close_idle()
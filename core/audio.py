@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import subprocess
+import wave
+from typing import List
+
+# 语音识别统一使用 16kHz 单声道 float32 PCM
+SAMPLE_RATE = 16000
+
+
+def pcm_output_args(sample_format: str = "f32le") -> List[str]:
+    """
+    ffmpeg 输出参数：16kHz 单声道原始PCM写到标准输出
+    :param sample_format: 采样格式，f32le(float32) 或 s16le(int16)
+    :return: 参数列表
+    """
+    return [
+        "-ac", "1",
+        "-ar", str(SAMPLE_RATE),
+        "-f", sample_format,
+        "pipe:1"
+    ]
+
+
+def pcm_from_bytes(data: bytes):
+    """
+    将 ffmpeg 输出的 f32le 字节转换为 NumPy 数组
+    :param data: 原始PCM字节
+    :return: float32 数组
+    """
+    import numpy as np
+    return np.frombuffer(data, dtype=np.float32).copy()
+
+
+def decode_pcm(ffmpeg_path: str, media_path: str, sample_format: str = "f32le"):
+    """
+    同步解码音频/视频为 16kHz 单声道PCM (在线程池或子进程中调用)
+    :param ffmpeg_path: ffmpeg路径
+    :param media_path: 媒体文件路径
+    :param sample_format: 采样格式，f32le 返回 float32 数组，s16le 返回原始字节
+    :return: PCM数组或字节
+    """
+    cmd = [ffmpeg_path, "-nostdin", "-i", media_path, "-vn", "-sn", "-dn"] + pcm_output_args(sample_format)
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        error = result.stderr.decode("utf-8", errors="ignore")
+        raise RuntimeError(f"ffmpeg解码失败: {error[-500:]}")
+    if sample_format == "f32le":
+        return pcm_from_bytes(result.stdout)
+    return result.stdout
+
+
+def write_wav(pcm, path: str):
+    """
+    将 float32 PCM 写为 16bit WAV 文件，供只接受文件路径的识别引擎使用
+    :param pcm: float32 数组
+    :param path: WAV文件路径
+    """
+    import numpy as np
+    samples = (np.clip(pcm, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(samples.tobytes())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from difflib import SequenceMatcher
+from typing import List, Tuple
+
+from core.audio import SAMPLE_RATE
+from core.vad import FRAME_SIZE, energy_threshold
+
+MIN_CHUNK_RATIO = 0.5     # 在分段时长的后半段寻找静音切分点
+SILENCE_FRAMES = 15       # 切分点前后至少连续静音的帧数(0.3秒)
+CHUNK_OVERLAP = 2.0       # 找不到静音时相邻分段重叠的时长(秒)
+OVERLAP_CHARS = 40        # 在前后文本的多少个字符内查找重叠部分
+MIN_OVERLAP_CHARS = 3     # 重叠部分的最少字符数，太短时可能是巧合
+MAX_EDGE_CHARS = 8        # 重叠部分距离前一段结尾、后一段开头的最多字符数(切分处的字常被识别错)
+
+
+def _energy_db(pcm):
+    """每帧能量(dB)，分块计算，不复制整段音频"""
+    import numpy as np
+
+    count = len(pcm) // FRAME_SIZE
+    frames = pcm[:count * FRAME_SIZE].reshape(count, FRAME_SIZE)
+    energy = np.empty(count)
+    block = 50000
+    for start in range(0, count, block):
+        part = frames[start:start + block].astype(np.float32)
+        energy[start:start + len(part)] = 10 * np.log10(np.mean(part ** 2, axis=1) + 1e-10)
+    return energy
+
+
+def plan_chunks(pcm, max_seconds: float, overlap: float = CHUNK_OVERLAP) -> List[Tuple[int, int]]:
+    """
+    把长音频切分为不超过 max_seconds 的分段，优先在静音处切分；
+    一段语音内找不到静音时硬切，并与下一段重叠 overlap 秒
+    :param pcm: 16kHz 单声道 float32 PCM
+    :param max_seconds: 每段的最大时长(秒)
+    :param overlap: 硬切时的重叠时长(秒)
+    :return: 分段列表 [(起始采样点, 结束采样点)]，起点早于上一段终点表示与上一段重叠
+    """
+    import numpy as np
+
+    total = len(pcm)
+    max_samples = int(max_seconds * SAMPLE_RATE)
+    if total <= max_samples or total < FRAME_SIZE * SILENCE_FRAMES:
+        return [(0, total)]
+
+    # 前后连续 SILENCE_FRAMES 帧都低于阈值才算静音，切分点不会紧贴语音
+    energy = _energy_db(pcm)
+    quiet = (energy < energy_threshold(energy)).astype(np.int32)
+    silent = np.convolve(quiet, np.ones(SILENCE_FRAMES, dtype=np.int32), mode="same") >= SILENCE_FRAMES
+    overlap_samples = min(int(overlap * SAMPLE_RATE), max_samples // 2)
+
+    chunks: List[Tuple[int, int]] = []
+    start = 0
+    while total - start > max_samples:
+        low = (start + int(max_samples * MIN_CHUNK_RATIO)) // FRAME_SIZE
+        high = (start + max_samples) // FRAME_SIZE
+        candidates = np.flatnonzero(silent[low:high])
+        if len(candidates):
+            # 取最靠后的静音帧，分段尽量长
+            cut = (low + int(candidates[-1])) * FRAME_SIZE + FRAME_SIZE // 2
+            chunks.append((start, cut))
+            start = cut
+        else:
+            cut = start + max_samples
+            chunks.append((start, cut))
+            start = cut - overlap_samples
+    chunks.append((start, total))
+    return chunks
+
+
+def _join(left: str, right: str) -> str:
+    """拼接两段文本，英文等单词之间补空格"""
+    right = right.strip()
+    if not left:
+        return right
+    if not right:
+        return left
+    if left[-1].isascii() and left[-1].isalnum() and right[0].isascii() and right[0].isalnum():
+        return f"{left} {right}"
+    return left + right
+
+
+def _merge_overlap(left: str, right: str) -> str:
+    """拼接重叠分段的文本，去掉两段都识别出的重叠部分"""
+    right = right.strip()
+    tail = left[-OVERLAP_CHARS:]
+    head = right[:OVERLAP_CHARS]
+    match = SequenceMatcher(None, tail, head, autojunk=False).find_longest_match(0, len(tail), 0, len(head))
+    # 重叠部分必须在前一段的结尾和后一段的开头，文中其他位置的相同字句不算
+    if (match.size < MIN_OVERLAP_CHARS or match.b > MAX_EDGE_CHARS
+            or len(tail) - match.a - match.size > MAX_EDGE_CHARS):
+        return _join(left, right)
+    return _join(left[:len(left) - len(tail) + match.a + match.size], right[match.b + match.size:])
+
+
+def stitch_texts(chunks: List[Tuple[int, int]], texts: List[str]) -> str:
+    """
+    按顺序拼接各分段的识别结果
+    :param chunks: plan_chunks 的返回值
+    :param texts: 各分段的识别文本
+    :return: 完整文本
+    """
+    result = ""
+    previous_end = 0
+    for (start, end), text in zip(chunks, texts):
+        text = text or ""
+        result = _merge_overlap(result, text) if start < previous_end else _join(result, text)
+        previous_end = end
+    return result
@@ -2,413 +2,166 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
-import hashlib
-import json
+import filecmp
 import os
 import random
 import re
+import shutil
 import subprocess
+import threading
 import time
 import traceback
-from typing import Dict, List, Optional, Set, Tuple
-from urllib.parse import urlparse, parse_qs, urlencode, quote
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, urlencode, quote
 
-import aiohttp
-import requests
-from PyQt6.QtCore import QObject, pyqtSignal
+from core.asr_engines import EngineSpec, get_engine, resolve_engine
+from core.asr_pool import AsrPool, pool_size
+from core.audio import SAMPLE_RATE, pcm_output_args, pcm_from_bytes
+from core.chunking import plan_chunks, stitch_texts
+from core.events import Event
+from core.http_client import HttpClient
+from core.link_resolver import ShortLinkResolver, extract_aweme_id
+from core.metadata_cache import MetadataCache
+from core.metrics import current_jobs, get_metrics
+from core.model_service import get_model_service
+from core.pipeline import Pipeline, PipelineJob, Stage
+from core.progress import ProgressTracker
+from core.record_store import RecordStore
+from core.scheduler import HostRateLimiter
+from core.transcript_cache import TranscriptCache
+from core.vad import trim_to_speech
 
 
 class SpeechRecognizer:
-    # 引擎名称映射 - 只保留 Whisper 和 PaddleSpeech
-    ENGINE_MAP = {
-        "whisper": "whisper",
-        "Whisper (OpenAI)": "whisper",
-        "paddlespeech": "paddlespeech",
-        "PaddleSpeech": "paddlespeech"
-    }
+    """语音识别入口，按配置选择已注册的识别引擎(见 core.asr_engines)"""
     
     def __init__(self, config):
         """初始化语音识别器"""
         self.config = config
         
-        # 获取选择的引擎，如果不在映射中，默认使用 whisper
-        engine_name = config.speech_recognition_engine
-        self.engine = self.ENGINE_MAP.get(engine_name, "whisper")
+        # 获取选择的引擎，未注册的名称使用 whisper
+        self.spec = resolve_engine(config.speech_recognition_engine)
+        self.engine = self.spec.name
         print(f"选择的语音识别引擎: {self.engine}")
         
-        # whisper模型
-        self.whisper_model = None
-        self.engine_config = config.speech_recognition_config
-        
-        # 获取各引擎配置 - 只保留需要的配置
-        self.whisper_config = self.engine_config.get('whisper', {})
-        self.paddle_config = self.engine_config.get('paddlespeech', {})
-        
-        # 获取 ffmpeg 路径
-        self.ffmpeg_path = config.ffmpeg_path
+    @classmethod
+    def model_key(cls, config) -> Tuple[str, str, str]:
+        """
+        当前设置对应的模型键 (引擎, 模型, 语言)
+        :param config: 配置对象
+        :return: 模型键
+        """
+        return resolve_engine(config.speech_recognition_engine).model_key(config)
+    
+    @classmethod
+    def preload_modules(cls, config) -> Tuple[str, ...]:
+        """
+        当前引擎需要预先导入的模块
+        :param config: 配置对象
+        :return: 模块名
+        """
+        if not config.extract_text:
+            return ()
+        return resolve_engine(config.speech_recognition_engine).preload_modules(config)
         
     def recognize(self, audio_path):
-        """识别音频文件，返回识别结果"""
+        """识别音频，返回识别结果
+        
+        audio_path 可以是音频文件路径，也可以是 16kHz 单声道 float32 PCM 数组
+        """
         try:
             print(f"使用引擎: {self.engine} 识别音频")
-            
-            # 严格检查当前选择的引擎并调用对应方法
-            if self.engine == "whisper":
-                try:
-                    import whisper
-                    return self._whisper_recognize(audio_path)
-                except ImportError:
-                    print("Warning: Whisper库未安装，请使用pip install openai-whisper安装")
-                    return None
-            elif self.engine == "paddlespeech":
-                return self._paddlespeech_recognize(audio_path)
-            else:
-                print(f"不支持的语音识别引擎: {self.engine}，将使用whisper引擎")
-                try:
-                    import whisper
-                    return self._whisper_recognize(audio_path)
-                except ImportError:
-                    print("Warning: Whisper库未安装，请使用pip install openai-whisper安装")
-                    return None
-                
+            return get_engine(self.config).recognize(audio_path)
         except Exception as e:
             print(f"语音识别出错: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-            return None
-            
-    def _whisper_recognize(self, audio_path):
-        """使用Whisper识别音频"""
-        try:
-            import whisper
-            
-            model_name = self.whisper_config.get('model', 'base')
-            language = self.whisper_config.get('language', 'zh')
-            
-            print(f"使用Whisper模型 {model_name} 识别音频...")
-            
-            # 检查是否已有加载好的模型
-            if self.whisper_model:
-                print("使用已加载的Whisper模型")
-                model = self.whisper_model
-            else:
-                # 加载模型
-                print(f"加载Whisper {model_name} 模型...")
-                model = whisper.load_model(model_name)
-                self.whisper_model = model
-                
-            # 输出设备信息
-            import torch
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            print(f"使用设备: {device}")
-            
-            # 识别音频
-            result = model.transcribe(audio_path, language=language)
-            text = result.get('text', '')
-            
-            print(f"Whisper识别完成，文本长度: {len(text)} 字符")
-            return text
-        except Exception as e:
-            print(f"Whisper识别出错: {str(e)}")
-            import traceback
             print(traceback.format_exc())
             return None
             
-    def _paddlespeech_recognize(self, audio_path):
-        """使用PaddleSpeech识别音频"""
-        try:
-            # 确认PaddleSpeech已安装
-            from paddlespeech.cli.asr.infer import ASRExecutor
-            
-            model = self.paddle_config.get('model', 'conformer_wenetspeech')
-            
-            # 初始化ASR执行器
-            asr = ASRExecutor()
-            
-            # 识别音频
-            print(f"使用PaddleSpeech模型 {model} 识别音频...")
-            result = asr(audio_file=audio_path, model=model)
-            return result
-        except ImportError:
-            print("PaddleSpeech未安装，请按照官方文档安装: https://github.com/PaddlePaddle/PaddleSpeech")
-            return None
-        except Exception as e:
-            print(f"PaddleSpeech识别出错: {str(e)}")
-            return None
-            
-    def _xunfei_recognize(self, audio_path):
-        """使用讯飞语音识别API识别音频"""
+    def recognize_batch(self, audios: List) -> List[Optional[str]]:
+        """批量识别多个音频，返回与输入顺序一致的识别结果
+        
+        Whisper引擎把不超过30秒的音频补齐到30秒窗口后一次送入编码器和解码器，
+        阿里云引擎同时提交所有音频，其他引擎逐个识别。
+        """
         try:
-            import websocket
-            import hmac
-            import base64
-            import hashlib
-            import json
-            import time
-            from urllib.parse import urlencode
-            import ssl
-            from wsgiref.handlers import format_date_time
-            from datetime import datetime
-            from time import mktime
-            
-            # 获取API配置
-            app_id = self.xunfei_config.get('app_id', '')
-            api_key = self.xunfei_config.get('api_key', '')
-            api_secret = self.xunfei_config.get('api_secret', '')
-            
-            if not app_id or not api_key or not api_secret:
-                print("讯飞语音识别API配置不完整")
-                return None
-            
-            # 讯飞API参数和URL
-            url = 'wss://iat-api.xfyun.cn/v2/iat'
-            host = "iat-api.xfyun.cn"
-            
-            # 读取音频文件
-            with open(audio_path, 'rb') as f:
-                file_content = f.read()
-            
-            # 讯飞需要进行Base64编码
-            base64_audio = base64.b64encode(file_content).decode('utf-8')
-            
-            # 生成认证需要的数据
-            class XunfeiRecognizer:
-                def __init__(self):
-                    self.result = ""
-                
-                def create_url(self):
-                    now = datetime.now()
-                    date = format_date_time(mktime(now.timetuple()))
-                    
-                    # 拼接字符串
-                    signature_origin = f"host: {host}\ndate: {date}\nGET /v2/iat HTTP/1.1"
-                    
-                    # 进行hmac-sha256签名
-                    signature_sha = hmac.new(api_secret.encode('utf-8'), signature_origin.encode('utf-8'),
-                                          digestmod=hashlib.sha256).digest()
-                    
-                    # 加密签名
-                    signature_sha_base64 = base64.b64encode(signature_sha).decode('utf-8')
-                    
-                    # 构建authorization
-                    authorization_origin = f'api_key="{api_key}", algorithm="hmac-sha256", headers="host date request-line", signature="{signature_sha_base64}"'
-                    
-                    # 再次进行base64编码
-                    authorization = base64.b64encode(authorization_origin.encode('utf-8')).decode('utf-8')
-                    
-                    # 拼接鉴权参数
-                    v = {
-                        "authorization": authorization,
-                        "date": date,
-                        "host": host
-                    }
-                    # 拼接URL
-                    return url + '?' + urlencode(v)
-                
-                def on_message(self, ws, message):
-                    # 处理返回的消息
-                    data = json.loads(message)
-                    code = data["code"]
-                    if code != 0:
-                        print(f"讯飞语音识别出错，错误码: {code}, 错误信息: {data}")
-                        ws.close()
-                        return
-                        
-                    if data["data"]["status"] == 2:  # 识别结束
-                        self.result += "".join([x["text"] for x in data["data"]["result"]["ws"]])
-                        ws.close()
-                
-                def on_error(self, ws, error):
-                    print(f"讯飞语音识别出错: {error}")
-                    ws.close()
-                
-                def on_close(self, ws, close_status_code, close_msg):
-                    pass
-                
-                def on_open(self, ws):
-                    """发送音频数据"""
-                    # 构建请求参数
-                    data = {
-                        "common": {
-                            "app_id": app_id
-                        },
-                        "business": {
-                            "language": "zh_cn",
-                            "domain": "iat",
-                            "accent": "mandarin",
-                            "dwa": "wpgs",
-                            "vad_eos": 10000  # 静默检测阈值
-                        },
-                        "data": {
-                            "status": 0,
-                            "format": "audio/L16;rate=16000",
-                            "encoding": "raw",
-                            "audio": base64_audio
-                        }
-                    }
-                    ws.send(json.dumps(data))
-                    # 发送结束标志
-                    data["data"]["status"] = 2
-                    data["data"]["audio"] = ""
-                    ws.send(json.dumps(data))
-            
-            # 进行识别
-            print("使用讯飞语音识别...")
-            recognizer = XunfeiRecognizer()
-            websocket.enableTrace(False)
-            ws_url = recognizer.create_url()
-            ws = websocket.WebSocketApp(ws_url,
-                                      on_message=recognizer.on_message,
-                                      on_error=recognizer.on_error,
-                                      on_close=recognizer.on_close)
-            ws.on_open = recognizer.on_open
-            ws.run_forever(sslopt={"cert_reqs": ssl.CERT_NONE})
-            
-            return recognizer.result
-            
-        except ImportError:
-            print("讯飞语音识别需要安装websocket-client库，请使用pip install websocket-client安装")
-            return None
+            return get_engine(self.config).recognize_batch(audios)
         except Exception as e:
-            print(f"讯飞语音识别出错: {str(e)}")
-            import traceback
+            print(f"批量识别出错: {str(e)}")
             print(traceback.format_exc())
-            return None
-    
-    def _ali_recognize(self, audio_path):
-        """使用阿里云语音识别API识别音频"""
-        try:
-            import json
-            import os
-            from aliyunsdkcore.client import AcsClient
-            from aliyunsdkcore.request import CommonRequest
-            import base64
-            
-            # 获取API配置
-            access_key_id = self.ali_config.get('access_key_id', '')
-            access_key_secret = self.ali_config.get('access_key_secret', '')
-            
-            if not access_key_id or not access_key_secret:
-                print("阿里云语音识别API配置不完整")
-                return None
-                
-            # 创建ACS客户端
-            client = AcsClient(access_key_id, access_key_secret, 'cn-shanghai')
-            
-            # 准备请求
-            request = CommonRequest()
-            request.set_domain('nls-meta.cn-shanghai.aliyuncs.com')
-            request.set_version('2019-02-28')
-            request.set_action_name('CreateToken')
-            
-            # 获取Token
-            response = client.do_action_with_exception(request)
-            token_json = json.loads(response.decode('utf-8'))
-            token = token_json.get('Token', {}).get('Id')
-            
-            if not token:
-                print("获取阿里云语音识别Token失败")
-                return None
-                
-            # 读取音频文件
-            with open(audio_path, 'rb') as f:
-                audio_content = f.read()
-                
-            # 进行Base64编码
-            audio_base64 = base64.b64encode(audio_content).decode('utf-8')
-            
-            # 构建识别请求
-            rec_request = CommonRequest()
-            rec_request.set_domain('nls-filetrans.cn-shanghai.aliyuncs.com')
-            rec_request.set_version('2018-08-17')
-            rec_request.set_action_name('SubmitTask')
-            rec_request.set_method('POST')
-            
-            # 设置任务参数
-            task_params = {
-                'appkey': access_key_id,
-                'token': token,
-                'file_link': '',  # 不使用文件链接
-                'first_channel_only': True,
-                'version': '4.0',
-                'enable_inverse_text_normalization': True,
-                'enable_punctuation_prediction': True,
-                'enable_words': False,
-                'enable_sample_rate_adaptive': True,
-                'speech_noise_threshold': 0.5,
-                'format': os.path.splitext(audio_path)[1][1:],  # 文件格式
-                'sample_rate': 16000,
-                'audio': audio_base64
-            }
-            
-            rec_request.add_body_params('Task', json.dumps(task_params))
-            rec_request.add_body_params('Type', 'asr')
-            
-            # 发送请求
-            print("使用阿里云语音识别...")
-            response = client.do_action_with_exception(rec_request)
-            result = json.loads(response.decode('utf-8'))
-            
-            if result.get('StatusCode') == 'REQUEST_EMPTY_BODY':
-                print("阿里云语音识别API返回错误: 请求体为空")
-                return None
-                
-            task_id = result.get('TaskId')
-            if not task_id:
-                print(f"阿里云语音识别API返回错误: {result}")
-                return None
-                
-            # 查询识别结果
-            get_result_request = CommonRequest()
-            get_result_request.set_domain('nls-filetrans.cn-shanghai.aliyuncs.com')
-            get_result_request.set_version('2018-08-17')
-            get_result_request.set_action_name('GetTaskResult')
-            get_result_request.set_method('GET')
-            get_result_request.add_query_param('TaskId', task_id)
-            
-            # 等待并获取识别结果
-            for _ in range(30):  # 最多等待30次
-                time.sleep(3)  # 每3秒查询一次结果
-                result_response = client.do_action_with_exception(get_result_request)
-                get_result = json.loads(result_response.decode('utf-8'))
-                
-                status = get_result.get('StatusText')
-                if status == 'RUNNING':
-                    print("阿里云语音识别中...")
-                    continue
-                elif status == 'SUCCESS':
-                    # 提取结果
-                    result = get_result.get('Result')
-                    sentences = json.loads(result).get('Sentences', [])
-                    text = ' '.join([s.get('Text', '') for s in sentences])
-                    return text
-                else:
-                    print(f"阿里云语音识别任务失败: {get_result}")
-                    return None
-                    
-            print("阿里云语音识别超时")
-            return None
-        except ImportError:
-            print("阿里云语音识别需要安装aliyun-python-sdk-core，请使用pip install aliyun-python-sdk-core安装")
-            return None
-        except Exception as e:
-            print(f"阿里云语音识别出错: {str(e)}")
-            return None
+            return [None] * len(audios)
+
+class UrlExpiredError(Exception):
+    """CDN签名地址已过期 (HTTP 403/410)"""
+
+
+class TransientHttpError(ConnectionError):
+    """服务器暂时不可用 (HTTP 429/5xx)，稍后重试"""
+
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        """
+        :param status: HTTP状态码
+        :param retry_after: 服务器要求的等待时间(秒)，来自Retry-After响应头
+        """
+        super().__init__(f"HTTP状态码 {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class BatchRun:
+    """一次批量处理(下载或导入)的进度和队列日志状态
+
+    界面中的下载线程和导入线程可能同时在各自的事件循环中使用同一个下载器，
+    两批任务的序号都从0开始，因此每次运行使用独立的状态，互不覆盖。
+    """
+
+    def __init__(self, on_progress: Callable[["BatchRun", Dict], None]):
+        """
+        :param on_progress: 合并后的进度回调，参数：本批次、ProgressTracker.snapshot() 的返回值
+        """
+        self.last_percent = -1
+        self.last_stats_log = (0.0, "")   # (时间, 队列状态)
+        self.progress = ProgressTracker(lambda snapshot: on_progress(self, snapshot))
+
 
-class VideoDownloader(QObject):
-    """抖音视频下载器，使用API接口获取视频数据"""
+# 当前协程所属的批次，开始运行时在运行的任务中设置，流水线的工作协程继承
+current_run: ContextVar[Optional[BatchRun]] = ContextVar("current_run", default=None)
+
+
+class VideoDownloader:
+    """抖音视频下载器，使用API接口获取视频数据
     
-    # 定义信号
-    log_message = pyqtSignal(str)  # 日志信号
-    progress_updated = pyqtSignal(int)  # 进度信号
-    download_finished = pyqtSignal(bool, str)  # 下载完成信号，参数：是否成功、文件路径
+    不依赖Qt，通过事件报告进度，图形界面和命令行共用。
+    """
     
     # API接口地址
     API_BASE_URL = "http://47.83.189.189:1001"
     FETCH_VIDEO_API = "/api/hybrid/video_data"  # 更新为新的API端点
     
+    # 单个任务的处理结果
+    STATUS_SUCCESS = PipelineJob.STATUS_SUCCESS
+    STATUS_FAILED = PipelineJob.STATUS_FAILED
+    STATUS_SKIPPED = PipelineJob.STATUS_SKIPPED
+    
+    STATS_LOG_INTERVAL = 5  # 队列状态写入日志的最短间隔(秒)
+    
+    # CDN签名地址过期时返回的状态码
+    URL_EXPIRED_STATUSES = (403, 410)
+    
+    # 下载重试的退避时间(秒)：第n次重试等待 RETRY_BACKOFF * 2^n，不超过 RETRY_BACKOFF_MAX
+    RETRY_BACKOFF = 1.0
+    RETRY_BACKOFF_MAX = 30.0
+    
     def __init__(self, config):
-        super().__init__()
+        # 事件
+        self.log_message = Event()        # 日志，参数：消息
+        self.progress_updated = Event()   # 进度，参数：百分比
+        self.progress_detail = Event()    # 总体进度详情，参数：ProgressTracker.snapshot() 的字典
+        self.download_finished = Event()  # 下载完成，参数：是否成功、文件路径
+        self.stage_stats = Event()        # 流水线各阶段队列状态，参数：状态字典
+        self.job_finished = Event()       # 单个任务结束，参数：PipelineJob
+        
         self.config = config
         self.download_path = config.download_path
         self.audio_path = config.audio_path
@@ -416,19 +169,153 @@ class VideoDownloader(QObject):
         self.download_audio = config.download_audio
         self.download_cover = config.download_cover
         self.headers = config.headers.copy()
-        self.timeout = 30  # 请求超时时间
+        
+        # 共享的HTTP连接池，元数据请求和文件下载共用
+        self.http = HttpClient(config)
+        
+        # 按主机限速：API服务器与CDN分别使用各自的令牌桶
+        self.rate_limiter = HostRateLimiter(
+            urlparse(self.API_BASE_URL).netloc,
+            config.api_rate_limit,
+            config.cdn_rate_limit
+        )
         
         # 确保下载目录存在
         os.makedirs(self.download_path, exist_ok=True)
         os.makedirs(self.audio_path, exist_ok=True)
         os.makedirs(self.text_path, exist_ok=True)
         
-        # 创建下载记录文件
-        self.download_records_file = os.path.join(os.path.dirname(self.download_path), "downloaded.json")
-        self.downloaded_ids = self._load_download_records()
+        # 下载记录，首次运行时导入旧版的 downloaded.json
+        self.records = RecordStore(
+            os.path.join(os.path.dirname(self.download_path), "cache", "records.db"),
+            legacy_json=os.path.join(os.path.dirname(self.download_path), "downloaded.json")
+        )
         
         # 更新User-Agent
         self._update_user_agent()
+        
+        # 模型空闲释放时间
+        get_model_service().configure(config.model_idle_timeout)
+        
+        # 运行统计：开启统计接口或跟踪文件时记录各阶段的计时区间
+        self.metrics = get_metrics()
+        self.metrics.configure(config.metrics_port, config.metrics_trace_file)
+        
+        # 不在批量处理中时(如单独调用下载函数)使用的进度，只统计字节数
+        self._idle_run = BatchRun(self._on_progress)
+        
+        # 短链接解析器，解析结果缓存在下载记录旁边
+        self.link_resolver = ShortLinkResolver(
+            self.http,
+            self.rate_limiter,
+            self.headers,
+            os.path.join(os.path.dirname(self.download_path), "short_links.json"),
+            self.log_message.emit
+        )
+        
+        # 视频元数据缓存，重复处理同一视频时不再请求API
+        self.metadata_cache = MetadataCache(
+            os.path.join(os.path.dirname(self.download_path), "cache", "metadata"),
+            config.metadata_cache_ttl
+        )
+        
+        # 多进程识别池，第一次识别时按设置创建
+        self._asr_pool: Optional[AsrPool] = None
+        self._asr_pool_key = None
+        self._engine_limits: Dict[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]] = {}
+        # 不使用进程池时本地引擎在本进程的线程中识别，按引擎的并发上限共用线程池
+        self._engine_executors: Dict[Tuple[str, int], ThreadPoolExecutor] = {}
+        self._engine_executors_lock = threading.Lock()
+        
+        # 识别结果按媒体内容指纹缓存，同一内容不会重复识别
+        self.transcript_cache = TranscriptCache(
+            os.path.join(os.path.dirname(self.download_path), "cache", "transcripts.db")
+        )
+    
+    async def close(self):
+        """释放当前事件循环中的网络连接，在每次 asyncio.run 结束前调用"""
+        self.link_resolver.save()
+        self.records.flush()
+        await self.http.close()
+    
+    @property
+    def progress(self) -> ProgressTracker:
+        """当前批次的总体进度，下载分块等高频更新合并后再发送"""
+        return (current_run.get() or self._idle_run).progress
+    
+    def shutdown(self):
+        """程序退出时关闭识别进程池和识别线程池"""
+        if self._asr_pool is not None:
+            self._asr_pool.shutdown()
+            self._asr_pool = None
+        with self._engine_executors_lock:
+            executors, self._engine_executors = list(self._engine_executors.values()), {}
+        for executor in executors:
+            executor.shutdown(wait=False)
+    
+    def _get_asr_pool(self) -> Optional[AsrPool]:
+        """
+        获取识别进程池，识别设置变化或进程异常退出后重建
+        :return: 进程池，只需要一个识别进程或使用云端引擎时为None(在本进程中识别)
+        """
+        if resolve_engine(self.config.speech_recognition_engine).is_network:
+            # 云端引擎只等待网络，不需要识别进程
+            return None
+        key = (self.config.asr_processes, SpeechRecognizer.model_key(self.config))
+        pool = self._asr_pool
+        if key == self._asr_pool_key and (pool is None or not pool.broken):
+            return pool
+        
+        if pool is not None:
+            pool.shutdown()
+            self._asr_pool = None
+        self._asr_pool_key = key
+        size = pool_size(key[1], self.config.asr_processes)
+        if size > 1:
+            self._asr_pool = AsrPool(self.config, size, key)
+            self.log_message.emit(f"语音识别使用 {size} 个进程")
+        return self._asr_pool
+    
+    def _asr_concurrency(self) -> int:
+        """识别阶段的并发数：云端引擎按引擎的并发上限，本地引擎使用进程池时与进程数相同"""
+        spec = resolve_engine(self.config.speech_recognition_engine)
+        if spec.is_network:
+            return spec.concurrency(self.config)
+        pool = self._get_asr_pool() if self.config.extract_text else None
+        return pool.size if pool else self.config.asr_workers
+    
+    def _engine_limit(self, spec: EngineSpec) -> asyncio.Semaphore:
+        """
+        引擎的并发限制，同一事件循环中所有识别共用
+        :param spec: 引擎信息
+        :return: 信号量
+        """
+        loop = asyncio.get_event_loop()
+        limits = self._engine_limits.get(loop)
+        if limits is None:
+            # 清理已关闭事件循环遗留的信号量
+            for other_loop in [l for l in self._engine_limits if l.is_closed()]:
+                self._engine_limits.pop(other_loop, None)
+            limits = self._engine_limits[loop] = {}
+        if spec.name not in limits:
+            limits[spec.name] = asyncio.Semaphore(spec.concurrency(self.config))
+        return limits[spec.name]
+    
+    def _engine_executor(self, spec: EngineSpec) -> ThreadPoolExecutor:
+        """
+        本地引擎在本进程中识别时使用的线程池，线程数为引擎的并发上限。
+        下载和导入线程各自的事件循环共用同一个线程池，同一个模型不会被超过上限的线程同时使用
+        :param spec: 引擎信息
+        :return: 线程池
+        """
+        key = (spec.name, spec.concurrency(self.config))
+        with self._engine_executors_lock:
+            executor = self._engine_executors.get(key)
+            if executor is None:
+                executor = self._engine_executors[key] = ThreadPoolExecutor(
+                    max_workers=key[1], thread_name_prefix=f"asr-{spec.name}"
+                )
+            return executor
     
     def _update_user_agent(self):
         """随机更新User-Agent"""
@@ -463,16 +350,8 @@ class VideoDownloader(QObject):
             url = match.group(0).strip()
             self.log_message.emit(f"提取到链接: {url}")
             
-            # 处理短链接
-            if "v.douyin.com" in url:
-                self.log_message.emit(f"处理短链接...")
-                redirect_url = self._get_redirect_url(url)
-                if redirect_url:
-                    url = redirect_url
-                    self.log_message.emit(f"短链接重定向到: {url}")
-            
-            # 提取视频ID
-            video_id = self._extract_video_id(url)
+            # 提取视频ID (短链接会先解析重定向)
+            video_id = await self._extract_video_id(url)
             if not video_id:
                 self.log_message.emit(f"无法从链接中提取视频ID: {url}")
                 return None
@@ -487,77 +366,27 @@ class VideoDownloader(QObject):
             self.log_message.emit(traceback.format_exc())
             return None
     
-    def _get_redirect_url(self, url: str) -> str:
-        """获取短链接的重定向URL
-        
-        Args:
-            url: 短链接URL
-            
-        Returns:
-            str: 重定向后的URL
+    async def _extract_video_id(self, url: str) -> Optional[str]:
         """
-        try:
-            # 添加随机延迟，避免频繁请求
-            time.sleep(random.uniform(0.5, 1.5))
-            
-            response = requests.head(
-                url, 
-                headers=self.headers,
-                allow_redirects=True,
-                timeout=self.timeout
-            )
-            
-            return response.url
-        except Exception as e:
-            self.log_message.emit(f"获取重定向URL时出错: {str(e)}")
-            return None
-    
-    def _extract_video_id(self, url: str) -> str:
-        """
-        从URL中提取视频ID
+        从URL中提取视频ID，短链接通过解析器获取(优先使用缓存)
         :param url: 视频URL或分享内容
         :return: 视频ID或None
         """
         try:
-            # 首先尝试从文本中提取抖音短链接
+            video_id = extract_aweme_id(url)
+            if video_id:
+                return video_id
+            
+            # 尝试从文本中提取抖音短链接并解析重定向
             short_url = self._extract_douyin_short_url(url)
             if short_url:
-                # 如果找到短链接，获取重定向后的URL
-                url = self._get_redirect_url(short_url)
-                self.log_message.emit(f"重定向到: {url}")
-            
-            # 方法1：直接从路径中提取
-            path_patterns = [
-                r'/video/(\d+)',
-                r'/share/video/(\d+)'
-            ]
-            
-            for pattern in path_patterns:
-                match = re.search(pattern, url)
-                if match:
-                    return match.group(1)
-            
-            # 方法2：从查询字符串中提取
-            query_patterns = [
-                r'video_id=(\d+)',
-                r'item_ids=(\d+)'
-            ]
-            
-            for pattern in query_patterns:
-                match = re.search(pattern, url)
-                if match:
-                    return match.group(1)
-            
-            # 方法3：解析URL获取查询参数
-            parsed_url = urlparse(url)
-            query_params = parse_qs(parsed_url.query)
-            
-            id_params = ['aweme_id', 'item_ids', 'id']
-            for param in id_params:
-                if param in query_params:
-                    return query_params[param][0]
-            
-            return None
+                with self.metrics.span("resolve_short_link") as span:
+                    video_id = await self.link_resolver.resolve(short_url.rstrip('/') + '/')
+                    if not video_id:
+                        span.set(outcome="failed")
+                if video_id:
+                    self.log_message.emit(f"短链接解析到视频ID: {video_id}")
+            return video_id
         except Exception as e:
             self.log_message.emit(f"提取视频ID时出错: {str(e)}")
             return None
@@ -592,13 +421,32 @@ class VideoDownloader(QObject):
             self.log_message.emit(f"提取短链接时出错: {str(e)}")
             return ""
     
-    async def _fetch_video_info(self, aweme_id: str) -> Dict:
+    async def _fetch_video_info(self, aweme_id: str, refresh: bool = False) -> Dict:
         """
-        从API获取视频信息
+        从API获取视频信息，视频ID命中元数据缓存时直接返回缓存
         :param aweme_id: 视频ID或分享URL
+        :param refresh: 是否跳过缓存重新请求(用于刷新过期的下载地址)
         :return: 视频信息字典
         """
+        with self.metrics.span("fetch_video_info", refresh=refresh) as span:
+            video_data = await self._request_video_info(aweme_id, refresh, span)
+            if not video_data:
+                span.set(outcome="failed")
+            return video_data
+    
+    async def _request_video_info(self, aweme_id: str, refresh: bool, span) -> Dict:
+        """
+        _fetch_video_info 的实现
+        :param span: 计时区间，记录是否命中缓存和请求次数
+        """
         try:
+            if not refresh and aweme_id.isdigit():
+                cached = self.metadata_cache.get(aweme_id)
+                if cached:
+                    self.log_message.emit(f"使用缓存的视频信息: {aweme_id}")
+                    span.set(outcome="cache")
+                    return cached
+            
             # 首先尝试从文本中提取抖音短链接
             short_url = self._extract_douyin_short_url(aweme_id)
             
@@ -624,7 +472,6 @@ class VideoDownloader(QObject):
                 api_url = f"{self.API_BASE_URL}{self.FETCH_VIDEO_API}?url={encoded_url}&minimal=false"
             
             # 发送HTTP请求
-            timeout = aiohttp.ClientTimeout(total=30)  # 设置30秒超时
             headers = {
                 "User-Agent": self.headers['User-Agent']
             }
@@ -634,38 +481,43 @@ class VideoDownloader(QObject):
             
             # 尝试多次请求，增加稳定性
             for attempt in range(3):  # 最多尝试3次
+                span.set(attempts=attempt + 1)
                 try:
-                    async with aiohttp.ClientSession(timeout=timeout) as session:
-                        async with session.get(api_url, headers=headers) as response:
-                            if response.status != 200:
-                                error_text = await response.text()
-                                self.log_message.emit(f"API请求失败 (尝试 {attempt+1}/3): {response.status}, {error_text}")
-                                if attempt < 2:  # 如果不是最后一次尝试，则继续
-                                    await asyncio.sleep(1)  # 等待一秒后重试
-                                    continue
-                                return {}
-                            
-                            # 解析JSON响应
-                            result = await response.json()
-                            
-                            # 检查API响应 - 修改此处，API成功返回code=200
-                            if result.get("code") != 200:
-                                error_msg = result.get("message", "未知错误")
-                                self.log_message.emit(f"API返回错误: {error_msg}")
-                                if attempt < 2:  # 如果不是最后一次尝试，则继续
-                                    await asyncio.sleep(1)  # 等待一秒后重试
-                                    continue
-                                return {}
-                            
-                            if "data" not in result:
-                                self.log_message.emit("API返回数据格式错误，缺少data字段")
-                                if attempt < 2:  # 如果不是最后一次尝试，则继续
-                                    await asyncio.sleep(1)  # 等待一秒后重试
-                                    continue
-                                return {}
-                            
-                            self.log_message.emit(f"成功获取视频信息")
-                            return result["data"]
+                    await self.rate_limiter.acquire(api_url)
+                    session = await self.http.session()
+                    async with session.get(api_url, headers=headers, timeout=self.http.api_timeout) as response:
+                        if response.status != 200:
+                            span.set(status=response.status)
+                            error_text = await response.text()
+                            self.log_message.emit(f"API请求失败 (尝试 {attempt+1}/3): {response.status}, {error_text}")
+                            if attempt < 2:  # 如果不是最后一次尝试，则继续
+                                await asyncio.sleep(1)  # 等待一秒后重试
+                                continue
+                            return {}
+                        
+                        # 解析JSON响应
+                        result = await response.json()
+                        
+                        # 检查API响应 - 修改此处，API成功返回code=200
+                        if result.get("code") != 200:
+                            error_msg = result.get("message", "未知错误")
+                            self.log_message.emit(f"API返回错误: {error_msg}")
+                            if attempt < 2:  # 如果不是最后一次尝试，则继续
+                                await asyncio.sleep(1)  # 等待一秒后重试
+                                continue
+                            return {}
+                        
+                        if "data" not in result:
+                            self.log_message.emit("API返回数据格式错误，缺少data字段")
+                            if attempt < 2:  # 如果不是最后一次尝试，则继续
+                                await asyncio.sleep(1)  # 等待一秒后重试
+                                continue
+                            return {}
+                        
+                        self.log_message.emit(f"成功获取视频信息")
+                        if refresh:
+                            return self.metadata_cache.refresh_urls(result["data"])
+                        return self.metadata_cache.put(result["data"])
                 except Exception as e:
                     self.log_message.emit(f"请求异常 (尝试 {attempt+1}/3): {str(e)}")
                     if attempt < 2:  # 如果不是最后一次尝试，则继续
@@ -684,81 +536,399 @@ class VideoDownloader(QObject):
         :param share_url: 视频分享URL或ID
         :return: 是否成功
         """
-        try:
-            # 解析分享URL获取视频ID
-            self.log_message.emit(f"开始处理: {share_url}")
-            
-            # 尝试从文本中提取链接
-            short_url = self._extract_douyin_short_url(share_url)
-            if short_url:
-                self.log_message.emit(f"从分享文本中提取到链接: {short_url}")
-                share_url = short_url
-            
-            # 获取视频数据
-            video_data = await self._fetch_video_info(share_url)
-            
-            if not video_data:
-                self.log_message.emit("无法获取视频数据，下载失败")
-                self.download_finished.emit(False, "")
-                return False
-                
-            # 从返回的数据中提取aweme_id
-            aweme_id = video_data.get("aweme_id")
-            if not aweme_id:
-                self.log_message.emit("无法获取视频ID，下载失败")
-                self.download_finished.emit(False, "")
+        jobs = [PipelineJob(0, share_url)]
+        self._start_progress(jobs)
+        await self._build_pipeline().run(jobs)
+        self.progress.finish()
+        return jobs[0].status != self.STATUS_FAILED
+    
+    def _build_pipeline(self, on_job_finished: Optional[Callable[[PipelineJob], None]] = None) -> Pipeline:
+        """
+        构建 下载 → 音频提取 → 语音识别 三阶段流水线
+        :param on_job_finished: 每个任务结束后的额外回调
+        :return: 流水线
+        """
+        def job_finished(job: PipelineJob):
+            self._on_job_finished(job)
+            if on_job_finished:
+                on_job_finished(job)
+        
+        return Pipeline(
+            [
+                Stage("download", "下载", self._stage_download, self.config.max_concurrent_downloads),
+                Stage("audio", "音频", self._stage_audio, self.config.audio_workers),
+                self._asr_stage(),
+            ],
+            queue_size=self.config.pipeline_queue_size,
+            on_job_finished=job_finished,
+            on_stats=self._on_stage_stats,
+            on_stage_finished=lambda stage, job: self.progress.stage_done(job.index, stage.name)
+        )
+    
+    def _asr_stage(self) -> Stage:
+        """语音识别阶段：本地引擎批量大小大于1时，一次识别队列中已排队的多个音频"""
+        batch_size = self.config.asr_batch_size
+        if batch_size > 1 and not resolve_engine(self.config.speech_recognition_engine).is_network:
+            return Stage("asr", "识别", self._stage_asr_batch, self._asr_concurrency(), batch_size=batch_size)
+        return Stage("asr", "识别", self._stage_asr, self._asr_concurrency())
+    
+    def _on_job_finished(self, job: PipelineJob):
+        """
+        任务结束：每个任务只发送一次完成信号
+        :param job: 已结束的任务
+        """
+        if job.status == self.STATUS_FAILED and job.error:
+            self.log_message.emit(job.error)
+        self.metrics.inc("jobs_total", status=job.status)
+        self.progress.job_done(job.index)
+        self.job_finished.emit(job)
+        self.download_finished.emit(job.status != self.STATUS_FAILED, job.output_path)
+    
+    def _on_stage_stats(self, stats: Dict[str, Dict]):
+        """
+        转发队列状态到界面，状态变化时定期写入日志
+        :param stats: 各阶段状态
+        """
+        self.stage_stats.emit(stats)
+        # 没有新数据时也定期刷新速率和剩余时间
+        self.progress.poll()
+        for name, item in stats.items():
+            for field in ("queued", "active", "blocked"):
+                self.metrics.gauge(f"stage_{field}", item[field], stage=name)
+        
+        run = current_run.get() or self._idle_run
+        summary = Pipeline.format_stats(stats)
+        last_time, last_summary = run.last_stats_log
+        now = time.time()
+        if summary != last_summary and now - last_time >= self.STATS_LOG_INTERVAL:
+            run.last_stats_log = (now, summary)
+            self.log_message.emit(f"队列状态 - {summary}")
+    
+    def _start_progress(self, jobs: List[PipelineJob]):
+        """
+        开始统计一批任务的总体进度，本次运行之后的进度都记入新的批次
+        :param jobs: 任务列表
+        """
+        run = BatchRun(self._on_progress)
+        current_run.set(run)
+        run.progress.start({job.index: self._stage_plan(job) for job in jobs})
+    
+    def _stage_plan(self, job: PipelineJob) -> List[str]:
+        """
+        任务计划经过的阶段，提前结束的任务在结束时补齐
+        :param job: 任务
+        :return: 阶段名列表
+        """
+        extract_text = self.config.extract_text if job.extract_text is None else job.extract_text
+        if job.video_path:
+            # 导入的文件从音频提取阶段开始
+            return ["audio", "asr"] if extract_text else ["audio"]
+        stages = ["download"]
+        if self.config.download_audio or extract_text:
+            stages.append("audio")
+        if extract_text:
+            stages.append("asr")
+        return stages
+    
+    def _on_progress(self, run: BatchRun, snapshot: Dict):
+        """
+        转发合并后的进度，百分比变化时才发送 progress_updated
+        :param run: 进度所属的批次
+        :param snapshot: ProgressTracker.snapshot() 的返回值
+        """
+        if snapshot["percent"] != run.last_percent:
+            run.last_percent = snapshot["percent"]
+            self.progress_updated.emit(snapshot["percent"])
+        self.progress_detail.emit(snapshot)
+    
+    @staticmethod
+    def _progress_job() -> Optional[int]:
+        """当前协程处理的任务序号，不在流水线中或同时处理多个任务时为None"""
+        jobs = current_jobs.get()
+        return jobs[0].index if len(jobs) == 1 else None
+    
+    async def _stage_download(self, job: PipelineJob) -> bool:
+        """
+        下载阶段：获取视频信息并下载视频/图片集合
+        :param job: 任务
+        :return: 是否进入音频提取阶段
+        """
+        # 解析分享URL获取视频ID
+        share_url = job.source
+        self.log_message.emit(f"开始处理第 {job.index+1} 个链接: {share_url}")
+        
+        # 尝试从文本中提取链接
+        short_url = self._extract_douyin_short_url(share_url)
+        if short_url:
+            self.log_message.emit(f"从分享文本中提取到链接: {short_url}")
+            share_url = short_url
+        
+        # 先在本地解析出视频ID，解析失败时把链接交给API处理
+        video_id = await self._extract_video_id(share_url)
+        
+        # 获取视频数据
+        video_data = await self._fetch_video_info(video_id or share_url)
+        
+        if not video_data:
+            return job.fail("无法获取视频数据，下载失败")
+            
+        # 从返回的数据中提取aweme_id
+        aweme_id = video_data.get("aweme_id")
+        if not aweme_id:
+            return job.fail("无法获取视频ID，下载失败")
+        job.aweme_id = aweme_id
+        
+        # 获取视频描述作为文件名
+        desc = video_data.get("desc", "未命名")
+        author_nickname = video_data.get("author", {}).get("nickname", "未知作者")
+        filename = f"{author_nickname}-{desc}"
+        
+        # 检查是否已下载
+        record = self.records.get(aweme_id)
+        if record:
+            existing_file = self._find_downloaded_file(aweme_id, record, video_data, filename)
+            if existing_file:
+                self.log_message.emit(f"视频已下载，跳过: {existing_file}")
+                job.status = self.STATUS_SKIPPED
+                job.video_path = existing_file
+                # 视频已存在但音频或文案还没有生成时，继续后续阶段
+                return self._needs_downstream(self.records.get(aweme_id))
+            else:
+                self.log_message.emit(f"视频记录存在但文件未找到，将重新下载")
+        
+        # 处理图片集合：没有音频，到此结束
+        if video_data.get("images"):
+            self.log_message.emit("检测到图片集合，开始下载图片...")
+            job.video_path = await self._download_image_collection(video_data, filename)
+            return False if job.video_path else job.fail("图片集合下载失败")
+        
+        # 处理视频
+        self.log_message.emit("开始下载视频...")
+        job.video_path = await self._download_video_file(video_data, filename)
+        if not job.video_path:
+            return job.fail("视频下载失败")
+        return bool(self.config.download_audio or self.config.extract_text)
+    
+    def _needs_downstream(self, record: Dict) -> bool:
+        """
+        已下载的视频是否还需要提取音频或识别文案
+        :param record: 下载记录
+        :return: 是否进入音频提取阶段
+        """
+        if record.get("kind") == "images":
+            return False
+        
+        def missing(path: Optional[str]) -> bool:
+            return not path or not os.path.exists(path)
+        
+        return bool(
+            (self.config.download_audio and missing(record.get("audio_path")))
+            or (self.config.extract_text and missing(record.get("text_path")))
+        )
+    
+    async def _stage_audio(self, job: PipelineJob) -> bool:
+        """
+        音频提取阶段
+        
+        需要识别文案时，由同一个ffmpeg进程输出16kHz PCM直接交给识别引擎，
+        只有开启"提取音频"时才额外写出MP3文件。
+        :param job: 任务
+        :return: 是否进入语音识别阶段
+        """
+        if not os.path.exists(job.video_path):
+            return job.fail(f"文件不存在: {job.video_path}")
+        
+        keep_audio = self.config.download_audio if job.keep_audio is None else job.keep_audio
+        extract_text = self.config.extract_text if job.extract_text is None else job.extract_text
+        
+        if extract_text and await self._known_no_speech(job.video_path):
+            # 之前已检测到没有人声(语音活动检测或识别引擎)，不再解码识别，需要时只提取MP3
+            self.log_message.emit(f"之前未检测到人声，跳过识别: {os.path.basename(job.video_path)}")
+            if not keep_audio:
                 return False
-            
-            # 检查是否已下载
-            if self._is_downloaded(aweme_id):
-                existing_file = self._find_downloaded_file(aweme_id)
-                if existing_file:
-                    self.log_message.emit(f"视频已下载，跳过: {existing_file}")
-                    self.download_finished.emit(True, existing_file)
-                    return True
+            extract_text = False
+        
+        if not extract_text:
+            with self.metrics.span("extract_audio") as span:
+                audio_file = await self._extract_audio(job.video_path, job.aweme_id)
+                if audio_file:
+                    span.set(bytes=os.path.getsize(audio_file))
                 else:
-                    self.log_message.emit(f"视频记录存在但文件未找到，将重新下载")
-            
-            # 获取视频描述作为文件名
-            desc = video_data.get("desc", "未命名")
-            author_nickname = video_data.get("author", {}).get("nickname", "未知作者")
-            
-            # 处理图片集合
-            if video_data.get("images"):
-                self.log_message.emit("检测到图片集合，开始下载图片...")
-                return await self._download_image_collection(video_data, f"{author_nickname}-{desc}")
-                
-            # 处理视频
-            self.log_message.emit("开始下载视频...")
-            filename = f"{author_nickname}-{desc}"
-            return await self._download_video_file(video_data, filename)
-            
-        except Exception as e:
-            import traceback
-            error_traceback = traceback.format_exc()
-            self.log_message.emit(f"下载视频时出错: {str(e)}\n{error_traceback}")
-            self.download_finished.emit(False, "")
+                    span.set(outcome="failed")
+            if not audio_file:
+                # 音频提取失败不影响视频下载的结果
+                return job.fail("音频提取失败") if self._is_import(job) else False
+            job.audio_path = audio_file
+            self._add_download_record(job.aweme_id, audio_path=audio_file, stage="audio")
+            return False
+        
+        # 同一内容已识别过且不需要音频文件时，不再解码
+        if not keep_audio and await self._reuse_transcript(job.video_path, job.video_path):
+            job.text_path = self._text_path_for(job.video_path)
+            self._add_download_record(job.aweme_id, text_path=job.text_path, stage="asr")
             return False
+        
+        with self.metrics.span("decode_audio", keep_audio=bool(keep_audio)) as span:
+            audio_file, pcm = await self._decode_audio(job.video_path, keep_audio=bool(keep_audio))
+            if pcm is not None:
+                span.set(audio_seconds=round(len(pcm) / SAMPLE_RATE, 2))
+            else:
+                span.set(outcome="failed")
+        if pcm is None:
+            return job.fail("音频解码失败") if self._is_import(job) else False
+        job.audio_path = audio_file or ""
+        self._add_download_record(job.aweme_id, audio_path=audio_file, stage="audio")
+        
+        if self.config.vad_enabled:
+            pcm = await self._trim_to_speech(job, pcm)
+            if pcm is None:
+                # 没有人声，不进行识别
+                return False
+        job.pcm = pcm
+        return True
     
-    async def _download_image_collection(self, video_data: Dict, collection_name: str) -> bool:
+    async def _trim_to_speech(self, job: PipelineJob, pcm):
+        """
+        语音活动检测：只把有人声的部分交给识别引擎
+        :param job: 任务
+        :param pcm: 解码后的PCM
+        :return: 拼接后的语音PCM，没有检测到语音时为None
+        """
+        loop = asyncio.get_event_loop()
+        voiced = await loop.run_in_executor(None, trim_to_speech, pcm)
+        if not voiced.has_speech:
+            self.log_message.emit(f"未检测到人声，跳过识别: {os.path.basename(job.video_path)}")
+            await self._record_no_speech(job.video_path)
+            return None
+        if voiced.speech_seconds < voiced.total_seconds:
+            self.log_message.emit(
+                f"人声 {voiced.speech_seconds:.1f} 秒 / 共 {voiced.total_seconds:.1f} 秒，"
+                f"{len(voiced.regions)} 段: {os.path.basename(job.video_path)}"
+            )
+        return voiced.pcm
+    
+    async def _stage_asr(self, job: PipelineJob) -> bool:
+        """
+        语音识别阶段
+        :param job: 任务
+        :return: 最后一个阶段，总是返回False
+        """
+        # 文案文件以视频文件名命名(与音频文件同名)
+        name_source = job.audio_path or job.video_path
+        try:
+            result = await self.speech_recognition(name_source, job.aweme_id, pcm=job.pcm, source_path=job.video_path)
+            if result:
+                job.text_path = self._text_path_for(name_source)
+                self._add_download_record(job.aweme_id, text_path=job.text_path, stage="asr")
+            elif result is False and self._is_import(job):
+                # 没有人声(None)不算失败
+                return job.fail("语音识别失败")
+        finally:
+            # 识别结束后释放PCM占用的内存
+            job.pcm = None
+        return False
+    
+    async def _stage_asr_batch(self, jobs: List[PipelineJob]) -> List[bool]:
+        """
+        语音识别阶段(批量)：一次识别队列中已排队的多个音频
+        :param jobs: 任务列表
+        :return: 最后一个阶段，总是返回False
+        """
+        # 长音频不参与批量，在批量识别之后逐个切分识别
+        long_jobs = [job for job in jobs if job.pcm is not None and self._is_long_audio(job.pcm)]
+        short_jobs = [job for job in jobs if job not in long_jobs]
+        if len(short_jobs) > 1:
+            await self._recognize_jobs_batch(short_jobs)
+        else:
+            for job in short_jobs:
+                await self._stage_asr(job)
+        for job in long_jobs:
+            # 分段识别按单个任务更新进度
+            token = current_jobs.set((job,))
+            try:
+                await self._stage_asr(job)
+            finally:
+                current_jobs.reset(token)
+        return [False] * len(jobs)
+    
+    async def _recognize_jobs_batch(self, jobs: List[PipelineJob]):
+        """
+        批量识别多个任务的音频，保存识别结果
+        :param jobs: 任务列表
+        """
+        try:
+            pending = []
+            for job in jobs:
+                name_source = job.audio_path or job.video_path
+                if await self._reuse_transcript(name_source, job.video_path):
+                    job.text_path = self._text_path_for(name_source)
+                    self._add_download_record(job.aweme_id, text_path=job.text_path, stage="asr")
+                else:
+                    pending.append(job)
+            if not pending:
+                return
+            
+            self.log_message.emit(f"批量识别 {len(pending)} 段音频...")
+            audios = [job.pcm if job.pcm is not None else (job.audio_path or job.video_path) for job in pending]
+            try:
+                with self.metrics.span("recognize", engine=self.config.speech_recognition_engine,
+                                       batch=len(audios)) as span:
+                    span.set(audio_seconds=round(
+                        sum(len(audio) for audio in audios if not isinstance(audio, str)) / SAMPLE_RATE, 2
+                    ))
+                    texts = await self._recognize_batch(audios)
+                    failed = sum(1 for text in texts if text is None)
+                    if failed:
+                        span.set(outcome="failed", failed=failed)
+            except Exception as e:
+                self.log_message.emit(f"语音识别时出错: {str(e)}")
+                self.log_message.emit(traceback.format_exc())
+                texts = [None] * len(pending)
+        finally:
+            # 识别结束后释放PCM占用的内存
+            for job in jobs:
+                job.pcm = None
+        
+        for job, text in zip(pending, texts):
+            if text:
+                job.text_path = await self._save_transcript(job.audio_path or job.video_path, job.video_path, text)
+                self._add_download_record(job.aweme_id, text_path=job.text_path, stage="asr")
+            elif text == "":
+                self.log_message.emit(f"未识别到人声，没有文案: {os.path.basename(job.video_path)}")
+                await self._record_no_speech(job.video_path)
+            else:
+                self.log_message.emit(f"文案识别失败: 未能识别出文字 ({job.source})")
+                if self._is_import(job):
+                    job.fail("语音识别失败")
+    
+    @staticmethod
+    def _is_import(job: PipelineJob) -> bool:
+        """
+        是否为导入的本地文件：导入任务没有aweme_id，音频或识别失败即任务失败，
+        而下载任务的视频已经下载成功，后续阶段失败不影响结果
+        """
+        return job.aweme_id is None
+    
+    async def _download_image_collection(self, video_data: Dict, collection_name: str) -> str:
         """
         下载图片集合
         :param video_data: 视频数据
         :param collection_name: 集合名称
-        :return: 是否成功
+        :return: 图片文件夹路径，失败返回空字符串
         """
         try:
             # 从API返回中提取图片列表
             images = video_data.get("images", [])
             if not images:
                 self.log_message.emit("图片集合数据无效")
-                return False
+                return ""
             
             # 创建文件夹
             folder_path = os.path.join(self.config.download_path, collection_name)
             os.makedirs(folder_path, exist_ok=True)
             
             self.log_message.emit(f"开始下载图片集合: {collection_name}, 共{len(images)}张图片")
+            self.progress.set_file_count(self._progress_job(), len(images))
             
             # 下载每张图片
             success_count = 0
@@ -775,81 +945,51 @@ class VideoDownloader(QObject):
                 # 下载图片
                 img_filename = f"{i+1:03d}.jpg"
                 img_path = os.path.join(folder_path, img_filename)
+                refresh_url = self._url_refresher(video_data.get("aweme_id"), lambda data, i=i: self._select_image_url(data, i))
                 
-                if await self._download_file(image_url, img_path):
+                if await self._download_file(image_url, img_path, refresh_url=refresh_url):
                     success_count += 1
                     self.log_message.emit(f"图片 {i+1}/{len(images)} 下载成功")
                 else:
                     self.log_message.emit(f"图片 {i+1}/{len(images)} 下载失败")
-                
-                # 更新进度
-                progress = int((i + 1) / len(images) * 100)
-                self.progress_updated.emit(progress)
-                
-                # 适当延迟，避免请求过快
-                await asyncio.sleep(0.3)
             
-            # 添加到下载记录
-            aweme_id = video_data.get("aweme_id")
-            if aweme_id:
-                self._add_download_record(aweme_id)
-                
             self.log_message.emit(f"图片集合下载完成: {success_count}/{len(images)}张")
+            if success_count == 0:
+                return ""
             
-            # 发送下载完成信号
-            self.download_finished.emit(True, folder_path)
-            return success_count > 0
+            # 添加到下载记录
+            self._add_download_record(video_data.get("aweme_id"), kind="images", video_path=folder_path,
+                                      stage="download")
+            return folder_path
             
         except Exception as e:
             import traceback
             error_traceback = traceback.format_exc()
             self.log_message.emit(f"下载图片集合时出错: {str(e)}\n{error_traceback}")
-            self.download_finished.emit(False, "")
-            return False
+            return ""
     
-    async def _download_video_file(self, video_data: Dict, filename: str) -> bool:
+    async def _download_video_file(self, video_data: Dict, filename: str) -> str:
         """
         下载视频文件
         :param video_data: 视频数据
         :param filename: 文件名
-        :return: 是否成功
+        :return: 视频文件路径，失败返回空字符串
         """
         try:
             # 从API返回中提取视频下载地址
             if "video" not in video_data or not video_data["video"]:
                 self.log_message.emit("视频数据中没有video字段")
-                return False
+                return ""
                 
             video = video_data["video"]
+            aweme_id = video_data.get("aweme_id")
             
             # 优先使用无水印的高清版本
-            video_url = None
-            
-            # 尝试获取play_addr_h264中的高清地址
-            if "play_addr_h264" in video and video["play_addr_h264"]:
-                url_list = video["play_addr_h264"].get("url_list", [])
-                if url_list:
-                    # 选择第一个可用的URL
-                    video_url = url_list[0]
-                    self.log_message.emit(f"使用H264高清地址: {video_url[:100]}...")
-            
-            # 如果没有找到高清地址，尝试使用play_addr
-            if not video_url and "play_addr" in video and video["play_addr"]:
-                url_list = video["play_addr"].get("url_list", [])
-                if url_list:
-                    video_url = url_list[0]
-                    self.log_message.emit(f"使用标准清晰度地址: {video_url[:100]}...")
-            
-            # 如果还是没有，尝试使用download_addr
-            if not video_url and "download_addr" in video and video["download_addr"]:
-                url_list = video["download_addr"].get("url_list", [])
-                if url_list:
-                    video_url = url_list[0]
-                    self.log_message.emit(f"使用下载地址: {video_url[:100]}...")
-            
+            video_url, label = self._select_video_url(video_data)
             if not video_url:
                 self.log_message.emit("无法获取视频下载地址")
-                return False
+                return ""
+            self.log_message.emit(f"使用{label}: {video_url[:100]}...")
             
             # 准备文件路径 - 添加.mp4扩展名
             safe_filename = self._generate_safe_filename(filename)
@@ -863,61 +1003,108 @@ class VideoDownloader(QObject):
                 self.log_message.emit(f"视频大小: {self._format_size(video_size)}")
             
             # 执行下载
-            success = await self._download_file(video_url, filepath)
+            success = await self._download_file(
+                video_url, filepath, int(video_size) if video_size else None,
+                refresh_url=self._url_refresher(aweme_id, lambda data: self._select_video_url(data)[0])
+            )
             if not success:
                 self.log_message.emit("视频下载失败")
-                return False
+                return ""
             
             self.log_message.emit(f"视频下载成功: {filepath}")
             
             # 添加到下载记录
-            aweme_id = video_data.get("aweme_id")
-            if aweme_id:
-                self._add_download_record(aweme_id)
+            self._add_download_record(aweme_id, kind="video", video_path=filepath,
+                                      video_size=os.path.getsize(filepath), stage="download")
             
             # 下载封面
             if self.config.download_cover:
                 try:
-                    cover_url = None
-                    # 尝试获取静态封面
-                    if "cover" in video and video["cover"]:
-                        url_list = video["cover"].get("url_list", [])
-                        if url_list:
-                            cover_url = url_list[0]
-                    
-                    # 尝试获取动态封面
-                    if not cover_url and "dynamic_cover" in video and video["dynamic_cover"]:
-                        url_list = video["dynamic_cover"].get("url_list", [])
-                        if url_list:
-                            cover_url = url_list[0]
-                    
+                    cover_url = self._select_cover_url(video_data)
                     if cover_url:
                         cover_path = f"{os.path.splitext(filepath)[0]}_cover.jpg"
-                        await self._download_file(cover_url, cover_path)
+                        await self._download_file(
+                            cover_url, cover_path,
+                            refresh_url=self._url_refresher(aweme_id, self._select_cover_url)
+                        )
                         self.log_message.emit(f"封面下载成功: {cover_path}")
                 except Exception as e:
                     self.log_message.emit(f"下载封面时出错: {str(e)}")
             
-            # 提取音频
-            if self.config.download_audio:
-                audio_file = await self._extract_audio(filepath, aweme_id)
-                if audio_file:
-                    self.log_message.emit(f"音频提取成功: {audio_file}")
-                    
-                    # 如果配置了提取文案，尝试识别音频
-                    if self.config.extract_text:
-                        await self.speech_recognition(audio_file, aweme_id)
-                
-            # 发送下载完成信号
-            self.download_finished.emit(True, filepath)
-            return True
+            return filepath
             
         except Exception as e:
             import traceback
             error_traceback = traceback.format_exc()
             self.log_message.emit(f"处理视频下载时出错: {str(e)}\n{error_traceback}")
-            self.download_finished.emit(False, "")
-            return False
+            return ""
+    
+    @staticmethod
+    def _select_video_url(video_data: Dict) -> Tuple[Optional[str], str]:
+        """
+        按优先级选择视频下载地址: H264高清 > 标准清晰度 > 下载地址
+        :param video_data: 视频数据
+        :return: (视频地址, 地址说明)，没有可用地址时地址为None
+        """
+        video = video_data.get("video") or {}
+        candidates = [
+            ("play_addr_h264", "H264高清地址"),
+            ("play_addr", "标准清晰度地址"),
+            ("download_addr", "下载地址"),
+        ]
+        for field, label in candidates:
+            url_list = (video.get(field) or {}).get("url_list", [])
+            if url_list:
+                # 选择第一个可用的URL
+                return url_list[0], label
+        return None, ""
+    
+    @staticmethod
+    def _select_cover_url(video_data: Dict) -> Optional[str]:
+        """
+        选择封面地址: 优先静态封面，其次动态封面
+        :param video_data: 视频数据
+        :return: 封面地址或None
+        """
+        video = video_data.get("video") or {}
+        for field in ("cover", "dynamic_cover"):
+            url_list = (video.get(field) or {}).get("url_list", [])
+            if url_list:
+                return url_list[0]
+        return None
+    
+    @staticmethod
+    def _select_image_url(video_data: Dict, index: int) -> Optional[str]:
+        """
+        选择图片集合中第index张图片的地址
+        :param video_data: 视频数据
+        :param index: 图片序号
+        :return: 图片地址或None
+        """
+        images = video_data.get("images") or []
+        if index < len(images):
+            url_list = (images[index] or {}).get("url_list", [])
+            if url_list:
+                return url_list[0]
+        return None
+    
+    def _url_refresher(self, aweme_id: Optional[str],
+                       select: Callable[[Dict], Optional[str]]) -> Optional[Callable[[], Awaitable[Optional[str]]]]:
+        """
+        生成刷新下载地址的回调：签名地址过期时重新请求API，只更新缓存中的地址字段
+        :param aweme_id: 视频ID
+        :param select: 从视频数据中选出对应地址的函数
+        :return: 异步回调，返回新的地址；没有视频ID时返回None
+        """
+        if not aweme_id:
+            return None
+        
+        async def refresh() -> Optional[str]:
+            self.log_message.emit(f"下载地址已过期，重新获取: {aweme_id}")
+            video_data = await self._fetch_video_info(aweme_id, refresh=True)
+            return select(video_data) if video_data else None
+        
+        return refresh
     
     async def download_videos(self, urls: List[str]) -> None:
         """
@@ -930,36 +1117,20 @@ class VideoDownloader(QObject):
             
             # 设置初始状态
             total = len(urls)
-            processed = 0
-            successful = 0
-            failed = 0
-            skipped = 0
-            
-            self.log_message.emit(f"开始处理 {total} 个视频链接...")
-            
-            # 遍历链接列表
-            for i, url in enumerate(urls):
-                # 更新进度
-                progress = int((processed / total) * 100)
-                self.progress_updated.emit(progress)
-                
-                # 添加延迟，避免请求过快
-                if i > 0:
-                    delay = random.uniform(1, 3)
-                    self.log_message.emit(f"等待 {delay:.1f} 秒后处理下一个链接...")
-                    await asyncio.sleep(delay)
-                
-                self.log_message.emit(f"处理第 {i+1}/{total} 个链接: {url}")
-                
-                try:
-                    success = await self.download_video(url)
-                    if success:
-                        successful += 1
-                    else:
-                        failed += 1
-                except Exception as e:
-                    failed += 1
-                    self.log_message.emit(f"处理链接时出错: {str(e)}")
+            
+            self.log_message.emit(
+                f"开始处理 {total} 个视频链接 (下载并发: {self.config.max_concurrent_downloads}, "
+                f"音频并发: {self.config.audio_workers}, 识别并发: {self._asr_concurrency()})..."
+            )
+            
+            # 流水线执行，结果按任务收集后统一统计
+            jobs = [PipelineJob(i, url) for i, url in enumerate(urls)]
+            self._start_progress(jobs)
+            await self._build_pipeline().run(jobs)
+            statuses = [job.status for job in jobs]
+            successful = statuses.count(self.STATUS_SUCCESS)
+            failed = statuses.count(self.STATUS_FAILED)
+            skipped = statuses.count(self.STATUS_SKIPPED)
             
             # 计算耗时
             end_time = time.time()
@@ -974,7 +1145,7 @@ class VideoDownloader(QObject):
             self.log_message.emit("=" * 50)
             
             # 设置进度为100%
-            self.progress_updated.emit(100)
+            self.progress.finish()
             
             # 发送下载完成信号
             self.download_finished.emit(True, "")
@@ -985,129 +1156,354 @@ class VideoDownloader(QObject):
             self.log_message.emit(traceback.format_exc())
             self.download_finished.emit(False, "")
 
-    async def _download_file(self, url: str, filepath: str) -> bool:
+    async def _download_file(self, url: str, filepath: str, expected_size: Optional[int] = None,
+                             refresh_url: Optional[Callable[[], Awaitable[Optional[str]]]] = None) -> bool:
         """
-        下载文件到指定路径
+        下载文件到指定路径，支持断点续传
+        
+        数据先写入 .part 文件，中断后再次下载时通过HTTP Range续传；
+        已知文件较大时(expected_size)拆分为多个区间并发下载。
+        只有大小校验通过的完整文件才会重命名为目标文件。
         :param url: 文件URL
         :param filepath: 保存路径
+        :param expected_size: 预期文件大小(来自API的data_size)，未知时为None
+        :param refresh_url: 签名地址过期(403/410)时获取新地址的回调，最多调用一次
         :return: 是否成功
         """
+        with self.metrics.span("download_file", kind=os.path.splitext(filepath)[1].lstrip(".")) as span:
+            success = await self._download_to(url, filepath, expected_size, refresh_url, span)
+            if not success:
+                span.set(outcome="failed")
+            return success
+    
+    async def _download_to(self, url: str, filepath: str, expected_size: Optional[int],
+                           refresh_url: Optional[Callable[[], Awaitable[Optional[str]]]], span) -> bool:
+        """
+        _download_file 的实现
+        :param span: 计时区间，记录下载的字节数、尝试次数和地址刷新
+        """
         try:
             # 创建目录
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
             
+            # 下载进度按临时文件统计
+            part_path = f"{filepath}.part"
+            job_index = self._progress_job()
+            
             # 如果文件已存在，跳过下载
             if os.path.exists(filepath):
                 self.log_message.emit(f"文件已存在: {filepath}")
+                span.set(outcome="exists")
+                self.progress.file_done(job_index, part_path)
                 return True
             
-            # 设置超时
-            timeout = aiohttp.ClientTimeout(total=60)
-            
             # 下载文件
             self.log_message.emit(f"开始下载: {url[:100]}...")
+            self.progress.file_size(job_index, part_path, expected_size)
+            segments = self._plan_segments(expected_size)
+            attempts = max(1, int(self.config.max_retries))
             
-            # 使用aiohttp下载
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status != 200:
-                        self.log_message.emit(f"下载失败，HTTP状态码: {response.status}")
-                        return False
+            for attempt in range(attempts):
+                span.set(attempts=attempt + 1)
+                try:
+                    if segments:
+                        completed = await self._download_segmented(url, part_path, segments, expected_size)
+                        if not completed:
+                            # 服务器不支持区间请求或大小不符，改为单连接下载
+                            self.log_message.emit("分段下载不可用，改为单连接下载")
+                            self._remove_segment_parts(part_path, len(segments))
+                            segments = []
+                            completed = await self._download_stream(url, part_path)
+                    else:
+                        completed = await self._download_stream(url, part_path)
                     
-                    # 获取文件大小
-                    total_size = int(response.headers.get('content-length', 0))
-                    if total_size:
-                        self.log_message.emit(f"文件大小: {self._format_size(total_size)}")
+                    if not completed:
+                        return False
                     
-                    # 下载文件
-                    with open(filepath, 'wb') as f:
-                        downloaded = 0
-                        async for chunk in response.content.iter_chunked(1024*1024):  # 1MB chunks
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                        
-                    # 更新进度
-                    if total_size > 0:
-                        progress = int((downloaded / total_size) * 100)
-                        self.progress_updated.emit(min(progress, 99))  # 最大99%，留1%给后续处理
-            
-            # 验证文件是否已下载
-            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                self.log_message.emit(f"下载完成: {filepath}")
-                return True
-            else:
-                self.log_message.emit(f"下载失败: 文件不存在或大小为0")
-                return False
+                    os.replace(part_path, filepath)
+                    self.progress.file_done(job_index, part_path)
+                    self.log_message.emit(f"下载完成: {filepath}")
+                    span.set(bytes=os.path.getsize(filepath), segments=len(segments))
+                    return True
+                except UrlExpiredError as e:
+                    self.log_message.emit(f"下载地址已失效: {str(e)}")
+                    new_url = await refresh_url() if refresh_url else None
+                    refresh_url = None
+                    span.set(url_refreshed=bool(new_url))
+                    if not new_url:
+                        return False
+                    # 换用新地址，已下载的部分继续续传
+                    url = new_url
+                except Exception as e:
+                    # 保留 .part 文件，下次尝试从断点继续
+                    self.log_message.emit(f"下载中断 (尝试 {attempt+1}/{attempts}): {str(e)}")
+                    if isinstance(e, TransientHttpError):
+                        span.set(status=e.status)
+                    if attempt < attempts - 1:
+                        await asyncio.sleep(self._retry_delay(attempt, e))
+            
+            self.log_message.emit(f"下载失败，已保留未完成的文件以便续传: {part_path}")
+            return False
             
         except Exception as e:
             self.log_message.emit(f"下载文件时出错: {str(e)}")
             import traceback
             self.log_message.emit(traceback.format_exc())
-            
-            # 如果文件下载了一部分，删除它
-            if os.path.exists(filepath):
-                try:
-                    os.remove(filepath)
-                    self.log_message.emit(f"已删除不完整的文件: {filepath}")
-                except:
-                    pass
-            
             return False
-
-    def _is_downloaded(self, aweme_id: str) -> bool:
+    
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
         """
-        检查视频是否已下载
-        :param aweme_id: 视频ID
-        :return: 是否已下载
+        下载重试前的等待时间：指数退避加随机抖动，服务器给出Retry-After时按其等待
+        :param attempt: 已失败的尝试序号(从0开始)
+        :param error: 本次失败的异常
+        :return: 等待秒数
         """
-        return aweme_id in self.downloaded_ids
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.RETRY_BACKOFF_MAX)
+        delay = min(self.RETRY_BACKOFF * (2 ** attempt), self.RETRY_BACKOFF_MAX)
+        return delay * random.uniform(0.5, 1.0)
     
-    def _find_downloaded_file(self, aweme_id: str) -> str:
+    @staticmethod
+    def _check_transient(response):
         """
-        查找已下载的视频文件
-        :param aweme_id: 视频ID
-        :return: 文件路径，如果未找到返回空字符串
+        429和5xx是暂时性错误，抛出异常由 _download_to 退避后重试；其他4xx直接放弃
+        :param response: 响应
+        """
+        if response.status == 429 or response.status >= 500:
+            retry_after = response.headers.get("Retry-After", "")
+            raise TransientHttpError(
+                response.status, float(retry_after) if retry_after.strip().isdigit() else None
+            )
+    
+    def _plan_segments(self, size: Optional[int]) -> List[Tuple[int, int]]:
+        """
+        根据文件大小规划分段区间
+        :param size: 文件大小，未知时为None
+        :return: [(起始字节, 结束字节)] 列表，不分段时为空列表
+        """
+        count = int(self.config.download_segments)
+        threshold = int(self.config.segment_threshold_mb) * 1024 * 1024
+        if not size or count <= 1 or size < threshold:
+            return []
+        
+        segment_size = -(-size // count)  # 向上取整
+        return [(start, min(start + segment_size, size) - 1) for start in range(0, size, segment_size)]
+    
+    @staticmethod
+    def _parse_content_range_total(content_range: Optional[str]) -> Optional[int]:
+        """
+        从Content-Range响应头中解析文件总大小
+        :param content_range: 形如 "bytes 0-99/1000" 的响应头
+        :return: 文件总大小，无法解析时为None
+        """
+        if not content_range or "/" not in content_range:
+            return None
+        total = content_range.rsplit("/", 1)[1].strip()
+        return int(total) if total.isdigit() else None
+    
+    async def _download_stream(self, url: str, part_path: str) -> bool:
+        """
+        单连接下载到 .part 文件，已有部分数据时使用Range续传
+        :param url: 文件URL
+        :param part_path: 临时文件路径
+        :return: 是否完成；4xx错误返回False，连接中断、429/5xx或大小不符抛出异常
+        """
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = dict(self.headers)
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            self.log_message.emit(f"从 {self._format_size(offset)} 处继续下载")
+        
+        await self.rate_limiter.acquire(url)
+        session = await self.http.session()
+        async with session.get(url, headers=headers) as response:
+            if response.status == 416 and offset:
+                # 请求的区间超出文件大小：已有数据可能已经完整
+                total_size = self._parse_content_range_total(response.headers.get("Content-Range"))
+                if total_size == offset:
+                    return True
+                os.remove(part_path)
+                raise ConnectionError("续传区间无效，已删除未完成的文件")
+            
+            if response.status == 206 and offset:
+                mode = "ab"
+                total_size = self._parse_content_range_total(response.headers.get("Content-Range"))
+            elif response.status == 200:
+                # 服务器忽略了Range，从头开始
+                offset = 0
+                mode = "wb"
+                total_size = int(response.headers.get("content-length", 0)) or None
+            elif response.status in self.URL_EXPIRED_STATUSES:
+                raise UrlExpiredError(f"HTTP状态码 {response.status}")
+            else:
+                self._check_transient(response)
+                self.log_message.emit(f"下载失败，HTTP状态码: {response.status}")
+                return False
+            
+            # 获取文件大小
+            if total_size:
+                self.log_message.emit(f"文件大小: {self._format_size(total_size)}")
+            
+            # 下载文件，每个数据块都计入进度，由进度统计合并后更新界面
+            job_index = self._progress_job()
+            self.progress.file_size(job_index, part_path, total_size, offset)
+            downloaded = offset
+            with open(part_path, mode) as f:
+                async for chunk in response.content.iter_chunked(1024*1024):  # 1MB chunks
+                    f.write(chunk)
+                    downloaded += len(chunk)
+                    self.progress.add_bytes(job_index, part_path, len(chunk))
+        
+        # 校验文件大小
+        if total_size and downloaded != total_size:
+            raise ConnectionError(f"文件不完整: {downloaded}/{total_size} 字节")
+        if downloaded == 0:
+            raise ConnectionError("下载的文件大小为0")
+        return True
+    
+    async def _download_segmented(self, url: str, part_path: str,
+                                  segments: List[Tuple[int, int]], total_size: int) -> bool:
+        """
+        按区间并发下载，各区间写入独立的临时文件，全部完成后合并为 .part 文件
+        :param url: 文件URL
+        :param part_path: 合并后的临时文件路径
+        :param segments: 区间列表
+        :param total_size: 文件总大小
+        :return: 是否完成；服务器不支持区间请求时返回False
+        """
+        self.log_message.emit(f"分 {len(segments)} 段并发下载，文件大小: {self._format_size(total_size)}")
+        # 各区间续传前已有的数据计入进度
+        existing = sum(
+            min(os.path.getsize(f"{part_path}{i}"), end - start + 1)
+            for i, (start, end) in enumerate(segments) if os.path.exists(f"{part_path}{i}")
+        )
+        self.progress.file_size(self._progress_job(), part_path, total_size, existing)
+        results = await asyncio.gather(
+            *(self._download_segment(url, f"{part_path}{i}", start, end, total_size, part_path)
+              for i, (start, end) in enumerate(segments)),
+            return_exceptions=True
+        )
+        # 等所有区间结束后再抛出异常，已下载的区间下次可以直接续传
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        if not all(results):
+            return False
+        
+        # 合并区间文件
+        with open(part_path, "wb") as merged:
+            for i in range(len(segments)):
+                with open(f"{part_path}{i}", "rb") as segment:
+                    shutil.copyfileobj(segment, merged, 1024*1024)
+        self._remove_segment_parts(part_path, len(segments))
+        
+        merged_size = os.path.getsize(part_path)
+        if merged_size != total_size:
+            os.remove(part_path)
+            raise ConnectionError(f"合并后的文件大小不符: {merged_size}/{total_size} 字节")
+        return True
+    
+    async def _download_segment(self, url: str, segment_path: str, start: int, end: int, total_size: int,
+                                part_path: str = "") -> bool:
+        """
+        下载单个区间，支持续传
+        :param url: 文件URL
+        :param segment_path: 区间临时文件路径
+        :param start: 起始字节
+        :param end: 结束字节(包含)
+        :param total_size: 预期的文件总大小
+        :param part_path: 合并后的临时文件路径，下载进度按整个文件统计
+        :return: 是否完成；服务器不支持区间请求或总大小不符时返回False
         """
-        # 查找对应ID的视频文件
-        for filename in os.listdir(self.download_path):
-            if aweme_id in filename and os.path.isfile(os.path.join(self.download_path, filename)):
-                return os.path.join(self.download_path, filename)
+        length = end - start + 1
+        done = os.path.getsize(segment_path) if os.path.exists(segment_path) else 0
+        if done == length:
+            return True
+        if done > length:
+            os.remove(segment_path)
+            done = 0
         
-        # 查找是否有对应ID的文件夹（图片集合）
-        for dirname in os.listdir(self.download_path):
-            if aweme_id in dirname and os.path.isdir(os.path.join(self.download_path, dirname)):
-                return os.path.join(self.download_path, dirname)
+        headers = dict(self.headers)
+        headers["Range"] = f"bytes={start + done}-{end}"
+        
+        await self.rate_limiter.acquire(url)
+        session = await self.http.session()
+        async with session.get(url, headers=headers) as response:
+            if response.status in self.URL_EXPIRED_STATUSES:
+                raise UrlExpiredError(f"HTTP状态码 {response.status}")
+            self._check_transient(response)
+            if response.status != 206:
+                return False
+            if self._parse_content_range_total(response.headers.get("Content-Range")) != total_size:
+                return False
+            
+            job_index = self._progress_job()
+            with open(segment_path, "ab") as f:
+                async for chunk in response.content.iter_chunked(1024*1024):
+                    f.write(chunk)
+                    done += len(chunk)
+                    self.progress.add_bytes(job_index, part_path or segment_path, len(chunk))
         
-        return ""
+        if done != length:
+            raise ConnectionError(f"区间 {start}-{end} 不完整: {done}/{length} 字节")
+        return True
     
-    def _add_download_record(self, aweme_id: str):
+    def _remove_segment_parts(self, part_path: str, count: int):
         """
-        添加下载记录
+        删除区间临时文件
+        :param part_path: 合并后的临时文件路径
+        :param count: 区间数量
+        """
+        for i in range(count):
+            segment_path = f"{part_path}{i}"
+            if os.path.exists(segment_path):
+                os.remove(segment_path)
+
+    def _find_downloaded_file(self, aweme_id: str, record: Dict, video_data: Dict, filename: str) -> str:
+        """
+        查找已下载的视频文件或图片文件夹
         :param aweme_id: 视频ID
+        :param record: 下载记录
+        :param video_data: 视频数据
+        :param filename: 未处理的文件名(作者-描述)
+        :return: 文件路径，如果未找到返回空字符串
         """
-        # 添加到内存中的集合
-        self.downloaded_ids.add(aweme_id)
+        path = record.get("video_path")
+        if path and os.path.exists(path):
+            size = record.get("video_size")
+            if size and os.path.isfile(path) and os.path.getsize(path) != size:
+                return ""
+            return path
+        if path:
+            return ""
         
-        # 保存到文件
-        try:
-            with open(self.download_records_file, "w", encoding="utf-8") as f:
-                json.dump(list(self.downloaded_ids), f)
-        except Exception as e:
-            self.log_message.emit(f"保存下载记录时出错: {str(e)}")
+        # 旧版记录只有ID，按生成规则推算文件名，找到后补全记录
+        safe_filename = self._generate_safe_filename(filename)
+        if video_data.get("images"):
+            kind, path = "images", os.path.join(self.config.download_path, filename)
+            found = os.path.isdir(path)
+        else:
+            kind, path = "video", os.path.join(self.config.download_path, f"{safe_filename}.mp4")
+            found = os.path.isfile(path)
+        if not found:
+            return ""
+        self._add_download_record(aweme_id, kind=kind, video_path=path,
+                                  video_size=os.path.getsize(path) if kind == "video" else None)
+        return path
     
-    def _load_download_records(self) -> Set[str]:
+    def _add_download_record(self, aweme_id: Optional[str], **fields):
         """
-        加载下载记录
-        :return: 已下载视频ID集合
+        添加或更新下载记录
+        :param aweme_id: 视频ID
+        :param fields: 记录字段(产物路径、大小、阶段)
         """
+        if not aweme_id:
+            return
         try:
-            if os.path.exists(self.download_records_file):
-                with open(self.download_records_file, "r", encoding="utf-8") as f:
-                    return set(json.load(f))
-            return set()
+            self.records.update(aweme_id, **fields)
         except Exception as e:
-            self.log_message.emit(f"加载下载记录时出错: {str(e)}")
-            return set()
+            self.log_message.emit(f"保存下载记录时出错: {str(e)}")
     
     def _generate_safe_filename(self, name: str) -> str:
         """
@@ -1214,12 +1610,135 @@ class VideoDownloader(QObject):
             self.log_message.emit(traceback.format_exc())
             return None
 
-    async def speech_recognition(self, audio_file, video_id):
+    def _text_path_for(self, audio_file: str) -> str:
         """
-        对音频文件进行语音识别
+        音频文件对应的文案文件路径
         :param audio_file: 音频文件路径
+        :return: 文案文件路径
+        """
+        text_filename = f"{os.path.splitext(os.path.basename(audio_file))[0]}_文案.txt"
+        return os.path.join(self.config.text_path, text_filename)
+    
+    async def _decode_audio(self, media_path: str, keep_audio: bool) -> Tuple[Optional[str], Optional[Any]]:
+        """
+        解码音频为16kHz单声道PCM，需要时在同一个ffmpeg进程中同时写出MP3
+        :param media_path: 视频或音频文件路径
+        :param keep_audio: 是否保留MP3音频文件
+        :return: (MP3路径或None, PCM数组或None)
+        """
+        try:
+            # 检查ffmpeg是否可用
+            if not os.path.exists(self.config.ffmpeg_path):
+                self.log_message.emit(f"错误: ffmpeg不存在，无法提取音频: {self.config.ffmpeg_path}")
+                return None, None
+            
+            audio_path = None
+            source_path = media_path
+            cmd = [self.config.ffmpeg_path, "-nostdin"]
+            if keep_audio:
+                audio_filename = f"{os.path.splitext(os.path.basename(media_path))[0]}.mp3"
+                audio_path = os.path.join(self.config.audio_path, audio_filename)
+                if os.path.exists(audio_path):
+                    # MP3已存在，直接从MP3解码
+                    self.log_message.emit(f"音频文件已存在: {audio_path}")
+                    source_path = audio_path
+                    keep_audio = False
+                else:
+                    os.makedirs(os.path.dirname(audio_path), exist_ok=True)
+            
+            cmd += ["-i", source_path, "-vn", "-sn", "-dn"]
+            if keep_audio:
+                cmd += ["-c:a", "libmp3lame", "-q:a", "4", "-y", audio_path]
+            cmd += pcm_output_args()
+            
+            self.log_message.emit(f"解码音频: {source_path}")
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await process.communicate()
+            
+            if process.returncode != 0:
+                error = stderr.decode('utf-8', errors='ignore')
+                self.log_message.emit(f"解码音频失败: {error}")
+                return None, None
+            
+            pcm = pcm_from_bytes(stdout)
+            if not len(pcm):
+                self.log_message.emit("解码音频失败: 没有音频数据")
+                return None, None
+            
+            if keep_audio:
+                self.log_message.emit(f"音频提取成功: {audio_path}")
+            return audio_path, pcm
+            
+        except Exception as e:
+            self.log_message.emit(f"解码音频时出错: {str(e)}")
+            self.log_message.emit(traceback.format_exc())
+            return None, None
+    
+    async def _fingerprint(self, media_path: str) -> Optional[str]:
+        """
+        计算媒体文件的内容指纹(在线程池中执行)
+        :param media_path: 视频或音频文件路径
+        :return: 内容哈希，失败时为None
+        """
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, self.transcript_cache.fingerprint, media_path)
+        except OSError as e:
+            self.log_message.emit(f"计算文件指纹失败: {str(e)}")
+            return None
+    
+    async def _known_no_speech(self, source_path: str) -> bool:
+        """
+        该内容是否已检测到没有人声
+        :param source_path: 原始媒体文件
+        :return: 是否没有人声
+        """
+        digest = await self._fingerprint(source_path)
+        return bool(digest) and self.transcript_cache.is_no_speech(digest)
+    
+    async def _record_no_speech(self, source_path: str):
+        """
+        按内容记录没有人声，再次处理时不再解码识别
+        :param source_path: 原始媒体文件
+        """
+        digest = await self._fingerprint(source_path)
+        if digest:
+            self.transcript_cache.mark_no_speech(digest)
+    
+    async def _reuse_transcript(self, name_source: str, source_path: str) -> bool:
+        """
+        同一内容在当前引擎和模型下已识别过时，直接写出缓存的文案
+        :param name_source: 决定文案文件名的音频/视频路径
+        :param source_path: 用于计算指纹的原始媒体文件
+        :return: 是否命中缓存
+        """
+        digest = await self._fingerprint(source_path)
+        if not digest:
+            return False
+        text_content = self.transcript_cache.get(digest, SpeechRecognizer.model_key(self.config))
+        self.metrics.inc("transcript_cache_total", result="hit" if text_content else "miss")
+        if not text_content:
+            return False
+        
+        text_path = self._text_path_for(name_source)
+        os.makedirs(os.path.dirname(text_path), exist_ok=True)
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(text_content)
+        self.log_message.emit(f"使用已识别的文案: {text_path}")
+        return True
+    
+    async def speech_recognition(self, audio_file, video_id, pcm=None, source_path=None):
+        """
+        对音频文件进行语音识别
+        :param audio_file: 音频文件路径(有PCM时只用于确定文案文件名)
         :param video_id: 视频ID
-        :return: 是否成功
+        :param pcm: 已解码的16kHz PCM数组，提供时直接识别，不再读取音频文件
+        :param source_path: 原始媒体文件，用于识别结果缓存的指纹，默认为audio_file
+        :return: 是否成功，引擎没有识别到人声时为None
         """
         try:
             # 检查音频文件是否存在
@@ -1228,211 +1747,248 @@ class VideoDownloader(QObject):
                 return False
                 
             # 生成文本文件名
-            text_filename = f"{os.path.splitext(os.path.basename(audio_file))[0]}_文案.txt"
-            text_path = os.path.join(self.config.text_path, text_filename)
+            text_path = self._text_path_for(audio_file)
             
-            # 检查是否已存在
-            if os.path.exists(text_path):
-                self.log_message.emit(f"文案文件已存在: {text_path}")
-                with open(text_path, 'r', encoding='utf-8') as f:
-                    text_content = f.read()
-                if text_content.strip():
-                    self.log_message.emit(f"已有文案内容: {text_content[:100]}...")
-                    return True
-                else:
-                    self.log_message.emit("文案文件存在但内容为空，将重新识别")
+            # 同一内容已识别过则直接使用(按内容指纹，而不是文件名)
+            source_path = source_path or audio_file
+            if await self._reuse_transcript(audio_file, source_path):
+                return True
             
             # 创建目录
             os.makedirs(os.path.dirname(text_path), exist_ok=True)
             
-            # 初始化识别器
-            recognizer = SpeechRecognizer(self.config)
-            
             # 执行识别
             self.log_message.emit(f"开始识别音频: {audio_file}")
-            self.progress_updated.emit(10)  # 设置初始进度
-            
-            # 使用run_in_executor在线程池中运行CPU密集型任务
-            loop = asyncio.get_event_loop()
-            text_result = await loop.run_in_executor(
-                None, 
-                recognizer.recognize,
-                audio_file
-            )
             
-            self.progress_updated.emit(90)  # 更新进度
+            with self.metrics.span("recognize", engine=self.config.speech_recognition_engine) as span:
+                if pcm is not None:
+                    span.set(audio_seconds=round(len(pcm) / SAMPLE_RATE, 2))
+                if pcm is not None and self._is_long_audio(pcm):
+                    # 长音频切分后并行识别，按已识别的分段更新进度
+                    span.set(chunked=True)
+                    text_result = await self._recognize_chunked(pcm, os.path.basename(audio_file))
+                else:
+                    text_result = await self._recognize_one(pcm if pcm is not None else audio_file)
+                if text_result == "":
+                    span.set(outcome="no_speech")
+                elif not text_result:
+                    span.set(outcome="failed")
             
             # 检查结果
             if text_result:
-                # 保存到文件
-                with open(text_path, 'w', encoding='utf-8') as f:
-                    f.write(text_result)
-                
-                self.log_message.emit(f"文案识别成功: {text_path}")
-                self.log_message.emit(f"文案内容: {text_result[:100]}...")
-                self.progress_updated.emit(100)  # 完成
+                await self._save_transcript(audio_file, source_path, text_result)
                 return True
+            elif text_result == "":
+                # 引擎没有识别到有效语音(如阿里云的 SUCCESS_WITH_NO_VALID_FRAGMENT)，与语音活动检测一样按没有人声处理
+                self.log_message.emit(f"未识别到人声，没有文案: {os.path.basename(audio_file)}")
+                await self._record_no_speech(source_path)
+                return None
             else:
                 self.log_message.emit("文案识别失败: 未能识别出文字")
-                self.progress_updated.emit(0)  # 重置进度
                 return False
             
         except Exception as e:
             self.log_message.emit(f"语音识别时出错: {str(e)}")
             import traceback
             self.log_message.emit(traceback.format_exc())
-            self.progress_updated.emit(0)  # 重置进度
             return False
 
-    async def process_imported_video(self, video_path: str) -> bool:
+    async def _save_transcript(self, name_source: str, source_path: str, text: str) -> str:
         """
-        处理导入的视频，提取音频并识别文案
-        :param video_path: 视频文件路径
-        :return: 是否成功
+        保存识别结果到文案文件和识别结果缓存
+        :param name_source: 决定文案文件名的音频/视频路径
+        :param source_path: 用于计算指纹的原始媒体文件
+        :param text: 识别文本
+        :return: 文案文件路径
         """
-        try:
-            # 生成视频ID (使用文件名的哈希值)
-            video_id = hashlib.md5(os.path.basename(video_path).encode()).hexdigest()
-            
-            self.log_message.emit(f"开始处理导入的视频: {video_path}")
-            
-            # 检查视频文件是否存在
-            if not os.path.exists(video_path):
-                self.log_message.emit(f"错误: 视频文件不存在: {video_path}")
-                return False
-            
-            # 提取音频
-            audio_file = await self._extract_audio(video_path, video_id)
-            if audio_file:
-                self.log_message.emit(f"音频提取成功: {audio_file}")
-                
-                # 进行语音识别
-                if self.config.extract_text:
-                    success = await self.speech_recognition(audio_file, video_id)
-                    if success:
-                        self.log_message.emit("视频处理完成!")
-                        self.download_finished.emit(True, audio_file)
-                    else:
-                        self.log_message.emit("语音识别失败")
-                        self.download_finished.emit(False, "")
-                        return False
+        text_path = self._text_path_for(name_source)
+        os.makedirs(os.path.dirname(text_path), exist_ok=True)
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        
+        digest = await self._fingerprint(source_path)
+        if digest:
+            self.transcript_cache.put(digest, SpeechRecognizer.model_key(self.config), text)
+        
+        self.log_message.emit(f"文案识别成功: {text_path}")
+        self.log_message.emit(f"文案内容: {text[:100]}...")
+        return text_path
+    
+    async def _recognize_one(self, audio) -> Optional[str]:
+        """
+        识别单个音频：云端引擎直接在事件循环中识别，本地引擎使用识别进程池或线程池
+        :param audio: 音频文件路径或PCM数组
+        :return: 识别结果
+        """
+        spec = resolve_engine(self.config.speech_recognition_engine)
+        if spec.is_network:
+            session = await self.http.session()
+            async with self._engine_limit(spec):
+                return await get_engine(self.config).recognize_async(audio, session)
+        
+        pool = self._get_asr_pool()
+        if pool is not None:
+            # 在识别进程池中运行，多个任务并行识别
+            return await pool.recognize(audio)
+        # 在线程池中运行CPU密集型任务，同时识别数不超过引擎的并发上限
+        recognizer = SpeechRecognizer(self.config)
+        loop = asyncio.get_event_loop()
+        async with self._engine_limit(spec):
+            return await loop.run_in_executor(self._engine_executor(spec), recognizer.recognize, audio)
+    
+    def _is_long_audio(self, pcm) -> bool:
+        """是否需要切分后识别，云端引擎自行处理长音频"""
+        chunk_seconds = self.config.asr_chunk_seconds
+        if not chunk_seconds or resolve_engine(self.config.speech_recognition_engine).is_network:
+            return False
+        return len(pcm) > chunk_seconds * SAMPLE_RATE
+    
+    async def _recognize_chunked(self, pcm, name: str) -> Optional[str]:
+        """
+        长音频在静音处切分为重叠的分段，分配到各识别进程并行识别后按顺序拼接
+        :param pcm: 16kHz PCM
+        :param name: 显示名称
+        :return: 识别结果，任一分段识别失败时为None
+        """
+        loop = asyncio.get_event_loop()
+        chunks = await loop.run_in_executor(None, plan_chunks, pcm, self.config.asr_chunk_seconds)
+        pool = self._get_asr_pool()
+        workers = pool.size if pool else 1
+        # 每个进程一次识别一组分段：组不超过批量大小，且分段够多时每个进程都分到任务
+        group_size = max(1, min(self.config.asr_batch_size, -(-len(chunks) // workers)))
+        groups = [list(range(i, min(i + group_size, len(chunks)))) for i in range(0, len(chunks), group_size)]
+        self.log_message.emit(f"音频时长 {len(pcm) / SAMPLE_RATE:.0f} 秒，切分为 {len(chunks)} 段识别: {name}")
+        
+        texts: List[Optional[str]] = [None] * len(chunks)
+        done = 0
+        job_index = self._progress_job()
+        
+        async def recognize_group(group: List[int]):
+            nonlocal done
+            results = await self._recognize_batch([pcm[chunks[i][0]:chunks[i][1]] for i in group])
+            for i, text in zip(group, results):
+                texts[i] = text
+            done += len(group)
+            self.progress.stage_fraction(job_index, "asr", done / len(chunks))
+        
+        if pool is not None:
+            # 进程池按进程数并行执行，多出的组在进程池中排队
+            await asyncio.gather(*(recognize_group(group) for group in groups))
+        else:
+            for group in groups:
+                await recognize_group(group)
+        
+        if any(text is None for text in texts):
+            self.log_message.emit(f"部分分段识别失败: {name}")
+            return None
+        return stitch_texts(chunks, texts)
+    
+    async def _recognize_batch(self, audios: List) -> List[Optional[str]]:
+        """
+        批量识别：云端引擎直接在事件循环中识别，本地引擎使用识别进程池或线程池
+        :param audios: 音频文件路径或PCM数组
+        :return: 识别结果，与输入顺序一致
+        """
+        spec = resolve_engine(self.config.speech_recognition_engine)
+        if spec.is_network:
+            session = await self.http.session()
+            async with self._engine_limit(spec):
+                return await get_engine(self.config).recognize_batch_async(audios, session)
+        
+        pool = self._get_asr_pool()
+        if pool is not None:
+            return await pool.recognize_batch(audios)
+        recognizer = SpeechRecognizer(self.config)
+        loop = asyncio.get_event_loop()
+        async with self._engine_limit(spec):
+            return await loop.run_in_executor(self._engine_executor(spec), recognizer.recognize_batch, audios)
+    
+    async def import_media(self, items: List[Tuple[str, str]]) -> List[PipelineJob]:
+        """
+        批量导入本地视频/音频，从音频提取阶段进入流水线，
+        ffmpeg和语音识别的并发数受流水线各阶段限制
+        :param items: [(文件路径, "video" 或 "audio")]
+        :return: 任务列表
+        """
+        total = len(items)
+        jobs = []
+        for index, (path, kind) in enumerate(items):
+            job = PipelineJob(index, path)
+            job.video_path = path
+            if kind == "audio":
+                # 导入音频总是识别文案；MP3直接复制到音频目录，其他格式转换为MP3
+                job.extract_text = True
+                if os.path.splitext(path)[1].lower() == ".mp3":
+                    job.video_path = self._copy_imported_mp3(path)
+                    job.keep_audio = False
                 else:
-                    self.log_message.emit("视频处理完成 (未启用文案提取)")
-                    self.download_finished.emit(True, audio_file)
-                    return True
+                    job.keep_audio = True
             else:
-                self.log_message.emit("音频提取失败")
-                self.download_finished.emit(False, "")
-                return False
-                
+                # 导入视频总是保留MP3
+                job.keep_audio = True
+            jobs.append(job)
+        
+        self.log_message.emit(f"开始处理 {total} 个导入文件...")
+        self._start_progress(jobs)
+        
+        def job_finished(job: PipelineJob):
+            if job.status != self.STATUS_FAILED:
+                self.log_message.emit(f"处理完成: {job.text_path or job.audio_path}")
+        
+        try:
+            await self._build_pipeline(job_finished).run(jobs, entry="audio")
         except Exception as e:
-            self.log_message.emit(f"处理导入视频时出错: {str(e)}")
-            import traceback
+            self.log_message.emit(f"处理导入文件时出错: {str(e)}")
             self.log_message.emit(traceback.format_exc())
             self.download_finished.emit(False, "")
-            return False
-            
+            return jobs
+        
+        self.progress.finish()
+        failed = sum(1 for job in jobs if job.status == self.STATUS_FAILED)
+        self.log_message.emit(f"导入文件处理完成: 成功 {total - failed}, 失败 {failed}")
+        return jobs
+    
+    def _copy_imported_mp3(self, audio_path: str) -> str:
+        """
+        把导入的MP3复制到音频目录，已有相同内容的文件时直接使用，
+        同名但内容不同时改用 "名称 (2).mp3" 这样的新文件名，不覆盖已有文件
+        :param audio_path: 音频文件路径
+        :return: 音频目录中的路径，复制失败时为原路径
+        """
+        name, ext = os.path.splitext(os.path.basename(audio_path))
+        target_path = os.path.join(self.config.audio_path, name + ext)
+        if os.path.abspath(audio_path) == os.path.abspath(target_path):
+            return audio_path
+        number = 1
+        while os.path.exists(target_path):
+            if filecmp.cmp(audio_path, target_path, shallow=False):
+                self.log_message.emit(f"音频文件已存在: {target_path}")
+                return target_path
+            number += 1
+            target_path = os.path.join(self.config.audio_path, f"{name} ({number}){ext}")
+        try:
+            os.makedirs(self.config.audio_path, exist_ok=True)
+            shutil.copy2(audio_path, target_path)
+            self.log_message.emit(f"复制音频文件到: {target_path}")
+            return target_path
+        except OSError as e:
+            self.log_message.emit(f"复制音频文件失败，将直接使用原文件: {str(e)}")
+            return audio_path
+    
+    async def process_imported_video(self, video_path: str) -> bool:
+        """
+        处理导入的视频，提取音频并识别文案
+        :param video_path: 视频文件路径
+        :return: 是否成功
+        """
+        jobs = await self.import_media([(video_path, "video")])
+        return bool(jobs) and jobs[0].status != self.STATUS_FAILED
+    
     async def import_audio(self, audio_path: str) -> bool:
         """
         导入音频文件并识别文案
         :param audio_path: 音频文件路径
         :return: 是否成功
         """
-        try:
-            # 生成音频ID (使用文件名的哈希值)
-            audio_id = hashlib.md5(os.path.basename(audio_path).encode()).hexdigest()
-            
-            self.log_message.emit(f"开始处理导入的音频: {audio_path}")
-            
-            # 检查音频文件是否存在
-            if not os.path.exists(audio_path):
-                self.log_message.emit(f"错误: 音频文件不存在: {audio_path}")
-                return False
-                
-            # 检查文件格式，如果不是MP3，尝试转换
-            ext = os.path.splitext(audio_path)[1].lower()
-            target_path = os.path.join(self.config.audio_path, f"{os.path.splitext(os.path.basename(audio_path))[0]}.mp3")
-            
-            if ext != '.mp3':
-                # 使用ffmpeg转换
-                if os.path.exists(self.config.ffmpeg_path):
-                    cmd = [
-                        self.config.ffmpeg_path,
-                        "-i", audio_path,
-                        "-vn",  # 不处理视频
-                        "-c:a", "libmp3lame",  # 使用MP3编码器
-                        "-q:a", "4",  # 音质设置 (0-9, 0最好)
-                        "-y",  # 覆盖已有文件
-                        target_path
-                    ]
-                    
-                    # 执行命令
-                    process = await asyncio.create_subprocess_exec(
-                        *cmd,
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE
-                    )
-                    _, stderr = await process.communicate()
-                    
-                    # 检查结果
-                    if process.returncode != 0:
-                        error = stderr.decode('utf-8', errors='ignore')
-                        self.log_message.emit(f"音频转换失败: {error}")
-                        return False
-                else:
-                    # 如果已经是MP3格式，尝试复制到目标路径
-                    try:
-                        import shutil
-                        self.log_message.emit(f"复制音频文件到: {target_path}")
-                        # 检查源文件和目标文件是否相同
-                        if os.path.abspath(audio_path) != os.path.abspath(target_path):
-                            shutil.copy2(audio_path, target_path)
-                        else:
-                            self.log_message.emit("源文件和目标文件相同，无需复制")
-                    except PermissionError as e:
-                        self.log_message.emit(f"无法访问文件，可能被其他程序占用: {str(e)}")
-                        # 如果是权限错误，且源文件和目标文件名不同，尝试替代方案
-                        if os.path.abspath(audio_path) != os.path.abspath(target_path):
-                            try:
-                                self.log_message.emit("尝试使用替代方法复制文件...")
-                                with open(audio_path, 'rb') as src:
-                                    with open(target_path, 'wb') as dst:
-                                        dst.write(src.read())
-                                self.log_message.emit("文件复制成功")
-                            except Exception as e2:
-                                self.log_message.emit(f"替代复制方法也失败: {str(e2)}")
-                                # 如果替代方法也失败，但文件已存在，则继续处理
-                                if not os.path.exists(target_path):
-                                    return False
-                        else:
-                            self.log_message.emit("源文件和目标文件相同，将直接使用")
-                    except Exception as e:
-                        self.log_message.emit(f"复制文件过程中出错: {str(e)}")
-                        import traceback
-                        self.log_message.emit(traceback.format_exc())
-                        # 如果文件不存在，则返回失败
-                        if not os.path.exists(target_path):
-                            return False
-            
-            # 进行语音识别
-            if os.path.exists(target_path):
-                self.log_message.emit("开始音频文件语音识别...")
-                # 不要在这里提前加载Whisper模型，让speech_recognition方法根据选择的引擎决定
-                success = await self.speech_recognition(target_path, audio_id)
-                if success:
-                    self.log_message.emit("音频处理完成!")
-                    return True
-                else:
-                    self.log_message.emit("语音识别失败")
-                    return False
-            else:
-                self.log_message.emit("错误: 目标音频文件不存在")
-                return False
-            
-        except Exception as e:
-            self.log_message.emit(f"处理导入音频过程中出错: {str(e)}")
-            import traceback
-            self.log_message.emit(traceback.format_exc())
-            return False
-
-    # ... 其他方法保持不变 ... 
\ No newline at end of file
+        jobs = await self.import_media([(audio_path, "audio")])
+        return bool(jobs) and jobs[0].status != self.STATUS_FAILED
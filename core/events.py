@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+import threading
+import traceback
+from typing import Callable, List
+
+
+class Event:
+    """不依赖Qt的事件，接口与 pyqtSignal 的 connect/emit 一致
+
+    回调在调用 emit 的线程中同步执行。界面需要跨线程更新时，
+    由界面层把事件转发到自己的 Qt 信号上。
+    """
+
+    def __init__(self):
+        self._callbacks: List[Callable] = []
+        self._lock = threading.Lock()
+
+    def connect(self, callback: Callable):
+        """
+        注册回调
+        :param callback: 回调函数，参数与 emit 的参数一致
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def disconnect(self, callback: Callable):
+        """
+        移除回调
+        :param callback: 已注册的回调函数
+        """
+        with self._lock:
+            self._callbacks.remove(callback)
+
+    def emit(self, *args):
+        """
+        依次调用所有回调，单个回调出错不影响其他回调和发送方
+        :param args: 事件参数
+        """
+        with self._lock:
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback(*args)
+            except Exception:
+                print(f"事件回调出错:\n{traceback.format_exc()}", file=sys.stderr)
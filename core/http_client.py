@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import asyncio
+from typing import Dict
+
+from core.lazy import lazy_import
+
+# aiohttp导入较慢，第一次发起请求时才加载
+aiohttp = lazy_import("aiohttp")
+
+
+class HttpClient:
+    """长连接HTTP客户端
+
+    在元数据请求和文件下载之间共享同一个连接池，复用keep-alive连接并缓存DNS结果，
+    避免每次请求都重新进行DNS解析和TCP/TLS握手。
+    aiohttp的会话与事件循环绑定，因此按事件循环各保留一个会话，
+    不同线程中的 asyncio.run 互不干扰。
+    """
+
+    DNS_CACHE_TTL = 300        # DNS缓存时间(秒)
+    KEEPALIVE_TIMEOUT = 30     # 空闲连接保持时间(秒)
+
+    def __init__(self, config):
+        """
+        :param config: 配置对象
+        """
+        self.config = config
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    @property
+    def api_timeout(self) -> aiohttp.ClientTimeout:
+        """API请求超时：整个请求不超过 config.api_timeout 秒"""
+        return aiohttp.ClientTimeout(total=self.config.api_timeout)
+
+    @property
+    def download_timeout(self) -> aiohttp.ClientTimeout:
+        """文件下载超时：不限制总时长，只限制连接和读取停顿的时间"""
+        return aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=self.config.api_timeout,
+            sock_read=self.config.api_timeout
+        )
+
+    async def session(self) -> aiohttp.ClientSession:
+        """
+        获取当前事件循环的共享会话，不存在时创建
+        :return: aiohttp会话
+        """
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.http_pool_size,
+                limit_per_host=self.config.http_per_host_limit,
+                use_dns_cache=True,
+                ttl_dns_cache=self.DNS_CACHE_TTL,
+                keepalive_timeout=self.KEEPALIVE_TIMEOUT
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=self.download_timeout)
+            self._sessions[loop] = session
+        return session
+
+    async def close(self):
+        """关闭当前事件循环的会话，并清理已关闭事件循环遗留的会话"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+            # 等待底层SSL连接关闭，避免 "Unclosed connection" 警告
+            await asyncio.sleep(0.25)
+
+        for other_loop in [l for l in self._sessions if l.is_closed()]:
+            self._sessions.pop(other_loop, None)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import importlib
+import sys
+import threading
+from types import ModuleType
+from typing import Callable, Dict, Iterable, Optional
+
+
+class LazyModule(ModuleType):
+    """延迟导入的模块代理，第一次访问属性时才真正导入"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            module = _import(self.__name__)
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+# 模块名 -> 代理
+_registry: Dict[str, LazyModule] = {}
+_lock = threading.Lock()
+
+
+def _import(name: str) -> ModuleType:
+    if name in sys.modules:
+        return sys.modules[name]
+    return importlib.import_module(name)
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    注册延迟导入的重量级模块
+    :param name: 模块名，如 "aiohttp"
+    :return: 模块代理，用法与直接 import 的模块相同
+    """
+    with _lock:
+        proxy = _registry.get(name)
+        if proxy is None:
+            proxy = _registry[name] = LazyModule(name)
+        return proxy
+
+
+def preload(names: Iterable[str], on_done: Optional[Callable[[str, bool], None]] = None) -> threading.Thread:
+    """
+    在后台线程中预先导入模块，界面显示后调用，避免第一次使用时卡顿
+    :param names: 模块名列表
+    :param on_done: 每个模块导入结束后的回调，参数：模块名、是否成功
+    :return: 后台线程
+    """
+    names = list(names)
+
+    def run():
+        for name in names:
+            try:
+                _import(name)
+                ok = True
+            except Exception:
+                ok = False
+            if on_done:
+                on_done(name, ok)
+
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import os
+import re
+import threading
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlparse, parse_qs
+
+from core.http_client import HttpClient
+from core.scheduler import HostRateLimiter
+
+
+def extract_aweme_id(url: str) -> Optional[str]:
+    """
+    不发起网络请求，直接从URL中提取视频ID
+    :param url: 视频URL
+    :return: 视频ID或None
+    """
+    if not url:
+        return None
+
+    # 方法1：直接从路径中提取
+    path_patterns = [
+        r'/video/(\d+)',
+        r'/share/video/(\d+)',
+        r'/note/(\d+)'
+    ]
+    for pattern in path_patterns:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+
+    # 方法2：从查询字符串中提取
+    query_patterns = [
+        r'video_id=(\d+)',
+        r'item_ids=(\d+)'
+    ]
+    for pattern in query_patterns:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+
+    # 方法3：解析URL获取查询参数
+    query_params = parse_qs(urlparse(url).query)
+    for param in ['aweme_id', 'item_ids', 'id']:
+        if param in query_params:
+            return query_params[param][0]
+
+    return None
+
+
+class ShortLinkResolver:
+    """抖音短链接解析器
+
+    通过共享连接池异步跟随重定向，得到视频ID后立即停止；
+    同一短链接的并发请求合并为一次网络请求，解析结果持久化到磁盘，
+    重复粘贴或之前处理过的短链接不再访问网络。
+    """
+
+    MAX_REDIRECTS = 5     # 最多跟随的重定向次数
+    FLUSH_EVERY = 20      # 新增多少条记录后写一次磁盘
+
+    def __init__(self, http: HttpClient, rate_limiter: HostRateLimiter, headers: Dict[str, str],
+                 cache_file: str, log: Optional[Callable[[str], None]] = None):
+        """
+        :param http: 共享HTTP客户端
+        :param rate_limiter: 按主机限速器
+        :param headers: 请求头
+        :param cache_file: 缓存文件路径 (短链接 → 视频ID)
+        :param log: 日志回调
+        """
+        self.http = http
+        self.rate_limiter = rate_limiter
+        self.headers = headers
+        self.cache_file = cache_file
+        self.log = log or (lambda message: None)
+
+        self._cache = self._load_cache()
+        self._unsaved = 0
+        self._save_lock = threading.Lock()
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
+
+    @staticmethod
+    def normalize(url: str) -> str:
+        """
+        规范化短链接作为缓存键，忽略协议、大小写和结尾斜杠
+        :param url: 短链接
+        :return: 缓存键
+        """
+        parsed = urlparse(url.strip())
+        return f"{parsed.netloc.lower()}{parsed.path.rstrip('/')}"
+
+    def cached(self, url: str) -> Optional[str]:
+        """
+        查询缓存中的视频ID
+        :param url: 短链接
+        :return: 视频ID，未缓存时为None
+        """
+        return self._cache.get(self.normalize(url))
+
+    async def resolve(self, url: str) -> Optional[str]:
+        """
+        解析短链接得到视频ID
+        :param url: 短链接
+        :return: 视频ID，解析失败返回None
+        """
+        key = self.normalize(url)
+        aweme_id = self._cache.get(key)
+        if aweme_id:
+            return aweme_id
+
+        # 合并同一事件循环中对同一短链接的并发请求
+        inflight_key = (asyncio.get_running_loop(), key)
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            task = asyncio.ensure_future(self._lookup(url))
+            self._inflight[inflight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+
+        aweme_id = await asyncio.shield(task)
+        if aweme_id and key not in self._cache:
+            self._cache[key] = aweme_id
+            self._unsaved += 1
+            if self._unsaved >= self.FLUSH_EVERY:
+                self.save()
+        return aweme_id
+
+    async def _lookup(self, url: str) -> Optional[str]:
+        """
+        逐跳跟随重定向，一旦Location中能提取到视频ID即返回
+        :param url: 短链接
+        :return: 视频ID或None
+        """
+        try:
+            session = await self.http.session()
+            current = url
+            for _ in range(self.MAX_REDIRECTS):
+                await self.rate_limiter.acquire(current)
+                async with session.head(current, headers=self.headers, allow_redirects=False,
+                                        timeout=self.http.api_timeout) as response:
+                    location = response.headers.get("Location")
+                if not location:
+                    break
+                current = urljoin(current, location)
+                aweme_id = extract_aweme_id(current)
+                if aweme_id:
+                    return aweme_id
+
+            return extract_aweme_id(current)
+        except Exception as e:
+            self.log(f"获取重定向URL时出错: {str(e)}")
+            return None
+
+    def _load_cache(self) -> Dict[str, str]:
+        """加载磁盘缓存"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            self.log(f"加载短链接缓存时出错: {str(e)}")
+        return {}
+
+    def save(self):
+        """将缓存写入磁盘(先写临时文件再替换，避免写到一半损坏)"""
+        with self._save_lock:
+            if not self._unsaved:
+                return
+            try:
+                tmp_file = f"{self.cache_file}.tmp"
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(dict(self._cache), f, ensure_ascii=False)
+                os.replace(tmp_file, self.cache_file)
+                self._unsaved = 0
+            except Exception as e:
+                self.log(f"保存短链接缓存时出错: {str(e)}")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+from typing import Dict, Optional
+
+
+class MetadataCache:
+    """视频元数据缓存
+
+    以 aweme_id 为键保存API响应的精简投影，每个视频一个JSON文件，
+    写入单条记录不需要重写整个缓存。超过TTL的记录视为失效。
+    CDN的签名播放地址有效期远短于TTL，过期时只刷新地址字段，
+    描述、作者等决定文件名的字段保持不变。
+    """
+
+    # 视频对象中保留的字段：这些都是带签名的地址
+    VIDEO_URL_FIELDS = ("play_addr_h264", "play_addr", "download_addr", "cover", "dynamic_cover")
+
+    def __init__(self, cache_dir: str, ttl: float):
+        """
+        :param cache_dir: 缓存目录
+        :param ttl: 有效期(秒)，<=0 表示不使用缓存
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _path(self, aweme_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{aweme_id}.json")
+
+    @classmethod
+    def project(cls, data: Dict) -> Dict:
+        """
+        提取下载流程实际用到的字段
+        :param data: API返回的视频数据
+        :return: 精简后的视频数据
+        """
+        projection = {
+            "aweme_id": data.get("aweme_id"),
+            "desc": data.get("desc", ""),
+            "author": {"nickname": (data.get("author") or {}).get("nickname", "")},
+        }
+
+        if data.get("images"):
+            projection["images"] = [
+                {"url_list": (image or {}).get("url_list", [])} for image in data["images"]
+            ]
+
+        video = data.get("video") or {}
+        if video:
+            projection["video"] = {"duration": video.get("duration")}
+            for field in cls.VIDEO_URL_FIELDS:
+                if video.get(field):
+                    projection["video"][field] = {
+                        "url_list": video[field].get("url_list", []),
+                        "data_size": video[field].get("data_size"),
+                    }
+        return projection
+
+    def get(self, aweme_id: str) -> Optional[Dict]:
+        """
+        读取未过期的缓存
+        :param aweme_id: 视频ID
+        :return: 精简后的视频数据，未命中或已过期时为None
+        """
+        if not self.enabled or not aweme_id:
+            return None
+        try:
+            with open(self._path(aweme_id), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("fetched_at", 0) > self.ttl:
+            return None
+        return entry.get("data")
+
+    def put(self, data: Dict) -> Dict:
+        """
+        写入缓存
+        :param data: API返回的视频数据
+        :return: 精简后的视频数据
+        """
+        projection = self.project(data)
+        self._write(projection)
+        return projection
+
+    def refresh_urls(self, data: Dict) -> Dict:
+        """
+        用新获取的数据只更新地址字段，其余字段沿用缓存
+        :param data: API重新返回的视频数据
+        :return: 更新后的精简视频数据
+        """
+        fresh = self.project(data)
+        cached = self.get(fresh.get("aweme_id"))
+        if not cached:
+            self._write(fresh)
+            return fresh
+
+        if "images" in fresh:
+            cached["images"] = fresh["images"]
+        if "video" in fresh:
+            cached.setdefault("video", {})
+            for field in self.VIDEO_URL_FIELDS:
+                if field in fresh["video"]:
+                    cached["video"][field] = fresh["video"][field]
+        self._write(cached)
+        return cached
+
+    def _write(self, projection: Dict):
+        aweme_id = projection.get("aweme_id")
+        if not self.enabled or not aweme_id:
+            return
+        path = self._path(aweme_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": time.time(), "data": projection}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
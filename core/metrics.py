@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+PREFIX = "douyin_"
+# 耗时直方图的分桶上限(秒)，覆盖从元数据请求到长音频识别的范围
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# 当前协程正在处理的任务，流水线在调用阶段处理函数前设置，区间结束时记录任务ID
+current_jobs: ContextVar[Tuple] = ContextVar("current_jobs", default=())
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Span:
+    """一个计时区间
+
+    结束时记录耗时直方图、次数和字节数，开启跟踪文件时写入一行JSON。
+    处理过程中用 set 补充字节数、结果等属性；区间内抛出异常时结果为 error。
+    """
+
+    __slots__ = ("metrics", "name", "attrs", "start", "wall_start")
+
+    def __init__(self, metrics: "Metrics", name: str, attrs: Dict[str, Any]):
+        self.metrics = metrics
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """
+        补充属性，bytes 计入字节数，outcome 为结果(默认 ok)
+        :param attrs: 属性
+        """
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            if issubclass(exc_type, asyncio.CancelledError):
+                self.attrs["outcome"] = "cancelled"
+            else:
+                self.attrs["outcome"] = "error"
+                self.attrs.setdefault("error", str(exc) or exc_type.__name__)
+        self.metrics._finish(self, duration)
+        return False
+
+
+class _NullSpan:
+    """未开启统计时使用的空区间，不计时也不分配对象"""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    """进程内的运行统计
+
+    计数器、直方图和当前值按 (名称, 标签) 聚合，可以通过本机的HTTP接口以
+    Prometheus 文本格式读取，每个计时区间也可以逐条写入JSONL跟踪文件。
+    两者都没有开启时所有方法直接返回，对处理速度没有影响。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        # 名称 -> 标签 -> [各分桶计数..., 总和, 次数]
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+        self._trace_path = ""
+        self._trace_file = None
+        self._server = None
+        self._port = 0
+
+    def configure(self, port: int = 0, trace_path: str = ""):
+        """
+        更新设置，端口或文件变化时重新打开
+        :param port: 统计接口端口，0 为不开启
+        :param trace_path: JSONL跟踪文件路径，空为不写入
+        """
+        port = int(port or 0)
+        trace_path = trace_path or ""
+        with self._lock:
+            if trace_path != self._trace_path:
+                if self._trace_file is not None:
+                    self._trace_file.close()
+                    self._trace_file = None
+                if trace_path:
+                    # 行缓冲，进程异常退出时已结束的区间也不会丢失
+                    self._trace_file = open(trace_path, "a", encoding="utf-8", buffering=1)
+                self._trace_path = trace_path
+        if port != self._port:
+            self._stop_server()
+            if port:
+                self._start_server(port)
+            self._port = port if self._server is not None else 0
+        self.enabled = bool(self._port or self._trace_path)
+
+    def close(self):
+        """关闭统计接口和跟踪文件"""
+        self.configure(0, "")
+
+    def span(self, name: str, **attrs) -> Span:
+        """
+        计时区间，用法: with metrics.span("download_file") as span: ... span.set(bytes=size)
+        :param name: 区间名
+        :param attrs: 属性
+        :return: 区间(未开启时为空区间)
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attrs)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """
+        计数器增加
+        :param name: 指标名(不含前缀)
+        :param value: 增加量
+        :param labels: 标签
+        """
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def gauge(self, name: str, value: float, **labels):
+        """
+        设置当前值
+        :param name: 指标名(不含前缀)
+        :param value: 当前值
+        :param labels: 标签
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        记录一个耗时样本
+        :param name: 指标名(不含前缀)
+        :param value: 样本值(秒)
+        :param labels: 标签
+        """
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            self._observe(name, key, value)
+
+    def _observe(self, name: str, key: LabelKey, value: float):
+        series = self._histograms.setdefault(name, {})
+        buckets = series.get(key)
+        if buckets is None:
+            buckets = series[key] = [0.0] * (len(DURATION_BUCKETS) + 2)
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                buckets[index] += 1
+        buckets[-2] += value
+        buckets[-1] += 1
+
+    def _finish(self, span: Span, duration: float):
+        """区间结束：更新聚合值并写入跟踪文件"""
+        attrs = span.attrs
+        outcome = str(attrs.get("outcome", "ok"))
+        key = _label_key({"span": span.name, "outcome": outcome})
+        with self._lock:
+            self._observe("span_duration_seconds", key, duration)
+            spans = self._counters.setdefault("span_total", {})
+            spans[key] = spans.get(key, 0) + 1
+            size = attrs.get("bytes")
+            if size:
+                byte_key = _label_key({"span": span.name})
+                totals = self._counters.setdefault("span_bytes_total", {})
+                totals[byte_key] = totals.get(byte_key, 0) + size
+            trace_file = self._trace_file
+
+        if trace_file is not None:
+            jobs = current_jobs.get()
+            record = {
+                "ts": round(span.wall_start, 6),
+                "span": span.name,
+                "duration": round(duration, 6),
+                "outcome": outcome,
+                "jobs": [{"index": job.index, "aweme_id": job.aweme_id} for job in jobs],
+            }
+            record.update((name, value) for name, value in attrs.items() if name != "outcome")
+            line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            with self._lock:
+                if self._trace_file is not None:
+                    self._trace_file.write(line)
+
+    def render(self) -> str:
+        """
+        Prometheus 文本格式的统计数据
+        :return: 文本
+        """
+        def labels_text(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = key + extra
+            if not pairs:
+                return ""
+            escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+            return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+        lines = []
+        with self._lock:
+            for kind, families in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, series in sorted(families.items()):
+                    lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                    for key, value in series.items():
+                        lines.append(f"{PREFIX}{name}{labels_text(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                for key, buckets in series.items():
+                    for bound, count in zip(DURATION_BUCKETS, buckets):
+                        lines.append(f"{PREFIX}{name}_bucket{labels_text(key, (('le', f'{bound:g}'),))} {count:g}")
+                    lines.append(f"{PREFIX}{name}_bucket{labels_text(key, (('le', '+Inf'),))} {buckets[-1]:g}")
+                    lines.append(f"{PREFIX}{name}_sum{labels_text(key)} {buckets[-2]:.6f}")
+                    lines.append(f"{PREFIX}{name}_count{labels_text(key)} {buckets[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+    def _start_server(self, port: int):
+        """在后台线程中启动统计接口，只监听本机"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        except OSError as e:
+            print(f"统计接口启动失败(端口 {port}): {str(e)}")
+            self._server = None
+            return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"统计接口: http://127.0.0.1:{port}/metrics")
+
+    def _stop_server(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """获取进程内唯一的统计对象"""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import gc
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+
+class _ModelEntry:
+    """已加载的模型及其使用情况"""
+
+    def __init__(self, model: Any):
+        self.model = model
+        self.last_used = time.monotonic()
+        self.in_use = 0
+
+
+class ModelService:
+    """进程内共享的语音识别模型服务
+
+    按 (引擎, 模型, 语言) 缓存已加载的模型，多次识别复用同一个模型；
+    空闲超过 idle_timeout 秒的模型由后台线程释放。
+    同一个键的并发加载只会执行一次。
+    """
+
+    def __init__(self, idle_timeout: float = 600):
+        """
+        :param idle_timeout: 模型空闲多久后释放(秒)，<=0 表示不自动释放
+        """
+        self.idle_timeout = idle_timeout
+        self._models: Dict[Hashable, _ModelEntry] = {}
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+        self._janitor: Optional[threading.Thread] = None
+
+    def configure(self, idle_timeout: float):
+        """
+        更新空闲释放时间
+        :param idle_timeout: 模型空闲多久后释放(秒)
+        """
+        self.idle_timeout = idle_timeout
+
+    @contextmanager
+    def use(self, key: Hashable, loader: Callable[[], Any]):
+        """
+        获取模型，使用期间不会被释放
+        :param key: 模型键，如 ("whisper", "small", "zh")
+        :param loader: 模型未加载时调用的加载函数
+        """
+        entry = self._acquire(key, loader)
+        try:
+            yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def _acquire(self, key: Hashable, loader: Callable[[], Any]) -> _ModelEntry:
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                entry.in_use += 1
+                return entry
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # 加载可能耗时数秒，不持有全局锁，只按键串行
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(key)
+                if entry is not None:
+                    entry.in_use += 1
+                    return entry
+
+            print(f"加载模型: {key}")
+            model = loader()
+
+            with self._lock:
+                entry = _ModelEntry(model)
+                entry.in_use += 1
+                self._models[key] = entry
+                self._start_janitor()
+                return entry
+
+    def retain(self, keys: Iterable[Hashable]):
+        """
+        只保留指定的模型，释放其余未在使用中的模型(设置变更后调用)
+        :param keys: 需要保留的模型键
+        """
+        keep = set(keys)
+        self._evict(lambda key, entry: key not in keep)
+
+    def evict_idle(self):
+        """释放空闲超时的模型"""
+        if self.idle_timeout <= 0:
+            return
+        deadline = time.monotonic() - self.idle_timeout
+        self._evict(lambda key, entry: entry.last_used < deadline)
+
+    def _evict(self, predicate: Callable[[Hashable, _ModelEntry], bool]):
+        with self._lock:
+            evicted = [key for key, entry in self._models.items()
+                       if entry.in_use == 0 and predicate(key, entry)]
+            for key in evicted:
+                del self._models[key]
+                print(f"释放模型: {key}")
+
+        if evicted:
+            gc.collect()
+            # 只有已经导入torch时才清理显存，避免为此导入torch
+            torch = sys.modules.get("torch")
+            if torch is not None and torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+    def _start_janitor(self):
+        """启动后台清理线程(只启动一次)"""
+        if self._janitor is not None and self._janitor.is_alive():
+            return
+        self._janitor = threading.Thread(target=self._janitor_loop, name="model-janitor", daemon=True)
+        self._janitor.start()
+
+    def _janitor_loop(self):
+        while True:
+            interval = min(max(self.idle_timeout / 2, 1), 60) if self.idle_timeout > 0 else 60
+            time.sleep(interval)
+            self.evict_idle()
+            with self._lock:
+                if not self._models:
+                    self._janitor = None
+                    return
+
+
+_service: Optional[ModelService] = None
+_service_lock = threading.Lock()
+
+
+def get_model_service() -> ModelService:
+    """获取进程内唯一的模型服务"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ModelService()
+        return _service
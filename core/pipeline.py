@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+import traceback
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from core.metrics import current_jobs, get_metrics
+
+
+class PipelineJob:
+    """流水线中的单个任务，在各阶段之间传递"""
+
+    STATUS_SUCCESS = "success"
+    STATUS_FAILED = "failed"
+    STATUS_SKIPPED = "skipped"
+
+    def __init__(self, index: int, source: str):
+        """
+        :param index: 任务序号
+        :param source: 原始输入(分享链接或导入的文件路径)
+        """
+        self.index = index
+        self.source = source
+        self.aweme_id: Optional[str] = None
+        self.video_path = ""     # 视频文件或图片集合文件夹
+        self.audio_path = ""     # 提取的音频文件
+        self.text_path = ""      # 识别出的文案文件
+        self.pcm = None          # 解码后的16kHz PCM，识别后释放
+        self.keep_audio: Optional[bool] = None    # 是否保留MP3，None时按配置
+        self.extract_text: Optional[bool] = None  # 是否识别文案，None时按配置
+        self.status = self.STATUS_SUCCESS
+        self.error = ""
+        self.timings: Dict[str, float] = {}  # 各阶段耗时(秒)
+
+    @property
+    def output_path(self) -> str:
+        """任务的主要产物路径"""
+        return self.video_path or self.audio_path or self.text_path
+
+    def fail(self, error: str = "") -> bool:
+        """
+        标记任务失败
+        :param error: 错误信息
+        :return: False，便于阶段处理函数直接 return job.fail(...)
+        """
+        self.status = self.STATUS_FAILED
+        self.error = error
+        return False
+
+    def to_dict(self) -> Dict:
+        return {
+            "index": self.index,
+            "source": self.source,
+            "aweme_id": self.aweme_id,
+            "status": self.status,
+            "video_path": self.video_path,
+            "audio_path": self.audio_path,
+            "text_path": self.text_path,
+            "error": self.error,
+            "timings": self.timings,
+        }
+
+
+# 阶段处理函数：返回True时任务进入下一阶段，返回False时任务结束
+StageHandler = Callable[[PipelineJob], Awaitable[bool]]
+# 批处理阶段的处理函数：一次处理多个任务，按顺序返回每个任务是否进入下一阶段
+BatchStageHandler = Callable[[List[PipelineJob]], Awaitable[List[bool]]]
+
+
+class Stage:
+    """流水线阶段：一个有界队列和若干并发工作协程"""
+
+    def __init__(self, name: str, label: str, handler, workers: int, batch_size: int = 1):
+        """
+        :param name: 阶段名
+        :param label: 显示名称
+        :param handler: 处理函数，batch_size>1 时为 BatchStageHandler，否则为 StageHandler
+        :param workers: 工作协程数
+        :param batch_size: 每次从队列中最多取出的任务数，>1 时工作协程取走队列中已有的任务一起处理
+        """
+        self.name = name
+        self.label = label
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.batch_size = max(1, int(batch_size))
+        self.queue: Optional[asyncio.Queue] = None
+        self.active = 0
+        self.blocked = 0   # 因下游队列已满而等待的工作协程数
+        self.done = 0
+
+
+class Pipeline:
+    """分阶段流水线
+
+    各阶段之间用有界队列连接，每个阶段有独立的并发数。
+    下游队列满时上游工作协程会阻塞在 put 上，形成反压，
+    避免下载远远领先于识别而占满磁盘。
+    """
+
+    STATS_INTERVAL = 1.0  # 队列状态上报间隔(秒)
+
+    def __init__(self, stages: List[Stage], queue_size: int,
+                 on_job_finished: Optional[Callable[[PipelineJob], None]] = None,
+                 on_stats: Optional[Callable[[Dict[str, Dict]], None]] = None,
+                 on_stage_finished: Optional[Callable[[Stage, PipelineJob], None]] = None):
+        """
+        :param stages: 按顺序排列的阶段
+        :param queue_size: 每个阶段的队列容量
+        :param on_job_finished: 任务结束回调(无论成功失败，每个任务只调用一次)
+        :param on_stats: 队列状态回调
+        :param on_stage_finished: 任务完成一个阶段的回调
+        """
+        self.stages = stages
+        self.queue_size = max(1, int(queue_size))
+        self.on_job_finished = on_job_finished
+        self.on_stats = on_stats
+        self.on_stage_finished = on_stage_finished
+        self._remaining = 0
+        self._all_done: Optional[asyncio.Event] = None
+        self.metrics = get_metrics()
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        各阶段的队列深度和工作状态
+        :return: {阶段名: {"label", "queued", "active", "blocked", "workers", "done"}}
+        """
+        return {
+            stage.name: {
+                "label": stage.label,
+                "queued": stage.queue.qsize() if stage.queue else 0,
+                "active": stage.active,
+                "blocked": stage.blocked,
+                "workers": stage.workers,
+                "done": stage.done,
+            }
+            for stage in self.stages
+        }
+
+    @staticmethod
+    def format_stats(stats: Dict[str, Dict]) -> str:
+        """
+        格式化队列状态，如 "下载: 排队2 运行1/3 阻塞2 | 音频: 排队0 运行1/2"
+        :param stats: stats() 的返回值
+        :return: 状态文本
+        """
+        return " | ".join(
+            f"{item['label']}: 排队{item['queued']} 运行{item['active']}/{item['workers']}"
+            + (f" 阻塞{item['blocked']}" if item.get("blocked") else "")
+            for item in stats.values()
+        )
+
+    async def run(self, jobs: List[PipelineJob], entry: Optional[str] = None) -> List[PipelineJob]:
+        """
+        运行流水线直到所有任务结束
+        :param jobs: 任务列表
+        :param entry: 任务进入的阶段名，默认为第一个阶段
+        :return: 任务列表(已填充结果)
+        """
+        if not jobs:
+            return jobs
+
+        for stage in self.stages:
+            stage.queue = asyncio.Queue(maxsize=self.queue_size)
+            stage.active = 0
+            stage.blocked = 0
+            stage.done = 0
+        self._remaining = len(jobs)
+        self._all_done = asyncio.Event()
+
+        entry_index = 0
+        if entry is not None:
+            entry_index = [stage.name for stage in self.stages].index(entry)
+
+        workers = [
+            asyncio.ensure_future(self._worker(index))
+            for index, stage in enumerate(self.stages)
+            for _ in range(stage.workers)
+        ]
+        reporter = asyncio.ensure_future(self._report_stats())
+        try:
+            # 入口队列满时在这里等待
+            for job in jobs:
+                await self.stages[entry_index].queue.put(job)
+            await self._all_done.wait()
+        finally:
+            for task in workers + [reporter]:
+                task.cancel()
+            await asyncio.gather(*workers, reporter, return_exceptions=True)
+            if self.on_stats:
+                self.on_stats(self.stats())
+        return jobs
+
+    async def _worker(self, index: int):
+        stage = self.stages[index]
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            batch = [await stage.queue.get()]
+            # 批处理阶段不等待，只取走队列中已经排队的任务
+            while len(batch) < stage.batch_size and not stage.queue.empty():
+                batch.append(stage.queue.get_nowait())
+
+            stage.active += 1
+            start = time.perf_counter()
+            # 阶段内的计时区间都记录为这些任务的区间
+            token = current_jobs.set(tuple(batch))
+            try:
+                with self.metrics.span(f"stage_{stage.name}", batch=len(batch)) as span:
+                    if stage.batch_size > 1:
+                        results = list(await stage.handler(batch))
+                        if len(results) != len(batch):
+                            raise RuntimeError(f"返回了 {len(results)} 个结果，应为 {len(batch)} 个")
+                    else:
+                        results = [await stage.handler(batch[0])]
+                    failed = sum(1 for job in batch if job.status == PipelineJob.STATUS_FAILED)
+                    if failed:
+                        span.set(outcome="failed", failed=failed)
+            except Exception as e:
+                error = f"{stage.label}阶段出错: {str(e)}\n{traceback.format_exc()}"
+                results = [job.fail(error) for job in batch]
+            finally:
+                current_jobs.reset(token)
+                elapsed = time.perf_counter() - start
+                for job in batch:
+                    job.timings[stage.name] = elapsed
+                    stage.queue.task_done()
+                stage.active -= 1
+                stage.done += len(batch)
+                if self.on_stage_finished:
+                    for job in batch:
+                        self._notify(self.on_stage_finished, stage, job)
+
+            for job, proceed in zip(batch, results):
+                if proceed and next_stage is not None:
+                    # 下游队列满时阻塞，形成反压
+                    stage.blocked += 1
+                    try:
+                        await next_stage.queue.put(job)
+                    finally:
+                        stage.blocked -= 1
+                else:
+                    self._finish(job)
+
+    def _finish(self, job: PipelineJob):
+        if self.on_job_finished:
+            self._notify(self.on_job_finished, job)
+        self._remaining -= 1
+        if self._remaining <= 0:
+            self._all_done.set()
+
+    @staticmethod
+    def _notify(callback: Callable, *args):
+        """调用回调，回调出错时只打印错误，工作协程继续处理队列中的任务"""
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"流水线回调出错: {str(e)}\n{traceback.format_exc()}")
+
+    async def _report_stats(self):
+        if not self.on_stats:
+            return
+        while True:
+            self.on_stats(self.stats())
+            await asyncio.sleep(self.STATS_INTERVAL)
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional
+
+
+class _JobProgress:
+    """单个任务的进度：计划经过的阶段、各阶段完成比例和下载文件的字节数"""
+
+    __slots__ = ("stages", "fractions", "files", "file_count", "done")
+
+    def __init__(self, stages: Iterable[str]):
+        self.stages = tuple(stages)
+        self.fractions: Dict[str, float] = {}
+        self.files: Dict[str, list] = {}   # 文件 -> [已下载字节, 总字节(未知为0)]
+        self.file_count = 1
+        self.done = False
+
+
+class ProgressTracker:
+    """批量处理的总体进度
+
+    每个任务按计划经过的阶段加权计算完成比例：下载阶段按已下载字节，
+    分段识别按已识别的分段，其他阶段在阶段结束时计为完成；
+    任务提前结束(跳过、失败、没有人声)时剩余阶段一并计为完成。
+    同时统计传输速率和预计剩余时间。
+
+    大量下载分块的回调只更新计数，按 INTERVAL 合并后才调用 on_update，
+    避免界面事件队列被进度更新占满。
+    任务序号为 None(不在流水线中)时只计入传输的字节数。
+    """
+
+    INTERVAL = 0.2      # 最短更新间隔(秒)
+    RATE_WINDOW = 10.0  # 计算速率和剩余时间的滑动窗口(秒)
+    # 各阶段占单个任务的比重，按任务实际经过的阶段归一化
+    STAGE_WEIGHTS = {"download": 0.5, "audio": 0.15, "asr": 0.35}
+
+    def __init__(self, on_update: Callable[[Dict], None]):
+        """
+        :param on_update: 进度回调，参数为 snapshot() 的返回值
+        """
+        self.on_update = on_update
+        self._lock = threading.Lock()
+        self._jobs: Dict[int, _JobProgress] = {}
+        self._bytes = 0
+        self._start = 0.0
+        self._last_emit = 0.0
+        self._dirty = False
+        self._samples: deque = deque()  # [(时间, 完成比例, 字节数)]
+        self._fraction = 0.0
+
+    def start(self, plans: Dict[int, Iterable[str]]):
+        """
+        开始一批任务
+        :param plans: 任务序号 -> 计划经过的阶段名
+        """
+        with self._lock:
+            self._jobs = {index: _JobProgress(stages) for index, stages in plans.items()}
+            self._bytes = 0
+            self._start = time.monotonic()
+            self._samples.clear()
+            self._fraction = 0.0
+        self._emit(force=True)
+
+    def set_file_count(self, index: int, count: int):
+        """
+        下载阶段需要下载的文件数(图片集合)，默认为1
+        :param index: 任务序号
+        :param count: 文件数
+        """
+        with self._lock:
+            job = self._jobs.get(index)
+            if job is not None:
+                job.file_count = max(1, int(count))
+
+    def file_size(self, index: int, key: str, total: Optional[int], done: int = 0):
+        """
+        开始下载一个文件
+        :param index: 任务序号
+        :param key: 文件标识(临时文件路径)
+        :param total: 文件总大小，未知时为None
+        :param done: 已有的字节数(续传)
+        """
+        with self._lock:
+            job = self._jobs.get(index)
+            if job is not None:
+                job.files[key] = [done, total or 0]
+                self._dirty = True
+        self._emit()
+
+    def add_bytes(self, index: int, key: str, size: int):
+        """
+        收到一个数据块
+        :param index: 任务序号
+        :param key: 文件标识
+        :param size: 字节数
+        """
+        with self._lock:
+            self._bytes += size
+            job = self._jobs.get(index)
+            if job is not None:
+                job.files.setdefault(key, [0, 0])[0] += size
+            self._dirty = True
+        self._emit()
+
+    def file_done(self, index: int, key: str):
+        """
+        文件下载完成(包括文件已存在)
+        :param index: 任务序号
+        :param key: 文件标识
+        """
+        with self._lock:
+            job = self._jobs.get(index)
+            if job is not None:
+                item = job.files.setdefault(key, [0, 0])
+                item[0] = item[1] = max(item[0], item[1], 1)
+                self._dirty = True
+        self._emit()
+
+    def stage_fraction(self, index: int, stage: str, fraction: float):
+        """
+        阶段内的完成比例(如分段识别已完成的分段)，只会增加
+        :param index: 任务序号
+        :param stage: 阶段名
+        :param fraction: 0~1
+        """
+        with self._lock:
+            job = self._jobs.get(index)
+            if job is not None:
+                job.fractions[stage] = max(job.fractions.get(stage, 0.0), min(float(fraction), 1.0))
+                self._dirty = True
+        self._emit()
+
+    def stage_done(self, index: int, stage: str):
+        """
+        阶段结束
+        :param index: 任务序号
+        :param stage: 阶段名
+        """
+        self.stage_fraction(index, stage, 1.0)
+
+    def job_done(self, index: int):
+        """
+        任务结束，未经过的阶段计为完成
+        :param index: 任务序号
+        """
+        with self._lock:
+            job = self._jobs.get(index)
+            if job is not None:
+                job.done = True
+                self._dirty = True
+        self._emit()
+
+    def poll(self):
+        """没有新数据时由定时器调用，刷新速率和剩余时间"""
+        with self._lock:
+            self._dirty = True
+        self._emit()
+
+    def finish(self):
+        """整批结束，立即发送最终进度"""
+        with self._lock:
+            for job in self._jobs.values():
+                job.done = True
+        self._emit(force=True)
+
+    def _job_fraction(self, job: _JobProgress) -> float:
+        if job.done:
+            return 1.0
+        weights = [self.STAGE_WEIGHTS.get(stage, 1.0) for stage in job.stages]
+        total = sum(weights)
+        if not total:
+            return 0.0
+        completed = 0.0
+        for stage, weight in zip(job.stages, weights):
+            fraction = job.fractions.get(stage, 0.0)
+            if stage == "download" and fraction < 1.0 and job.files:
+                # 下载中按字节计算，完成前最多计为99%，留给写入和重命名
+                parts = sum(min(done / size, 1.0) for done, size in job.files.values() if size)
+                fraction = max(fraction, min(parts / max(job.file_count, len(job.files)), 0.99))
+                job.fractions[stage] = fraction
+            completed += weight * fraction
+        return completed / total
+
+    def snapshot(self) -> Dict:
+        """
+        当前进度
+        :return: {"percent", "fraction", "done", "total", "bytes", "rate"(字节/秒), "eta"(秒，未知为None), "elapsed"}
+        """
+        with self._lock:
+            return self._snapshot(time.monotonic())
+
+    def _snapshot(self, now: float) -> Dict:
+        jobs = list(self._jobs.values())
+        finished = sum(1 for job in jobs if job.done)
+        fraction = sum(self._job_fraction(job) for job in jobs) / len(jobs) if jobs else 0.0
+        # 速率和剩余时间按最近一段时间计算，开始阶段没有足够样本时用全程平均
+        self._fraction = max(self._fraction, fraction)
+        self._samples.append((now, self._fraction, self._bytes))
+        while len(self._samples) > 2 and now - self._samples[0][0] > self.RATE_WINDOW:
+            self._samples.popleft()
+        first_time, first_fraction, first_bytes = self._samples[0]
+        span = now - first_time
+        rate = (self._bytes - first_bytes) / span if span > 0 else 0.0
+        progress_rate = (self._fraction - first_fraction) / span if span > 0 else 0.0
+        elapsed = now - self._start
+        eta = None
+        if finished == len(jobs):
+            eta = 0.0
+        elif progress_rate > 0:
+            eta = (1.0 - self._fraction) / progress_rate
+        elif self._fraction > 0 and elapsed > 0:
+            eta = elapsed * (1.0 - self._fraction) / self._fraction
+        percent = int(self._fraction * 100)
+        if finished < len(jobs):
+            percent = min(percent, 99)
+        return {
+            "percent": percent,
+            "fraction": round(self._fraction, 4),
+            "done": finished,
+            "total": len(jobs),
+            "bytes": self._bytes,
+            "rate": rate,
+            "eta": eta,
+            "elapsed": elapsed,
+        }
+
+    def _emit(self, force: bool = False):
+        """合并更新：距上次更新不足 INTERVAL 时只记录有变化"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and (not self._dirty or now - self._last_emit < self.INTERVAL):
+                return
+            self._last_emit = now
+            self._dirty = False
+            snapshot = self._snapshot(now)
+        self.on_update(snapshot)
+
+    @staticmethod
+    def format(snapshot: Dict) -> str:
+        """
+        格式化进度，如 "3/10 个 · 2.5 MB/s · 剩余 1分05秒"
+        :param snapshot: snapshot() 的返回值
+        :return: 文本
+        """
+        parts = [f"{snapshot['done']}/{snapshot['total']} 个"]
+        if snapshot["rate"] >= 1024:
+            parts.append(f"{snapshot['rate'] / (1024 * 1024):.1f} MB/s")
+        eta = snapshot["eta"]
+        if eta is not None and snapshot["done"] < snapshot["total"]:
+            minutes, seconds = divmod(int(eta + 0.5), 60)
+            parts.append(f"剩余 {minutes}分{seconds:02d}秒" if minutes else f"剩余 {seconds}秒")
+        return " · ".join(parts)
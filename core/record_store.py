@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class RecordStore:
+    """下载记录存储
+
+    以 aweme_id 为主键记录各阶段的产物路径、大小和进度，
+    使用 SQLite WAL 模式，多个实例同时运行也不会互相覆盖。
+    写入先在内存中合并，攒够一批或调用 flush() 时一次提交。
+    """
+
+    FIELDS = ("kind", "video_path", "video_size", "audio_path", "text_path", "stage")
+    FLUSH_EVERY = 20  # 累积多少条更新后提交
+
+    def __init__(self, db_path: str, legacy_json: Optional[str] = None):
+        """
+        :param db_path: SQLite数据库路径
+        :param legacy_json: 旧版 downloaded.json，首次打开时导入
+        """
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict] = {}
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                aweme_id TEXT PRIMARY KEY,
+                kind TEXT,
+                video_path TEXT,
+                video_size INTEGER,
+                audio_path TEXT,
+                text_path TEXT,
+                stage TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+        if legacy_json:
+            self._import_legacy(legacy_json)
+
+    def _import_legacy(self, legacy_json: str):
+        """导入旧版下载记录(只导入一次)"""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key='legacy_imported'").fetchone():
+                return
+            ids = []
+            if os.path.exists(legacy_json):
+                try:
+                    with open(legacy_json, "r", encoding="utf-8") as f:
+                        ids = [str(aweme_id) for aweme_id in json.load(f)]
+                except (OSError, ValueError) as e:
+                    print(f"导入旧版下载记录失败: {str(e)}")
+            now = time.time()
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO records (aweme_id, stage, updated_at) VALUES (?, 'download', ?)",
+                    [(aweme_id, now) for aweme_id in ids]
+                )
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', ?)",
+                                   (str(len(ids)),))
+
+    def get(self, aweme_id: str) -> Optional[Dict]:
+        """
+        查询记录
+        :param aweme_id: 视频ID
+        :return: 记录字段，不存在时为None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.FIELDS)} FROM records WHERE aweme_id=?", (aweme_id,)
+            ).fetchone()
+            pending = self._pending.get(aweme_id)
+        if row is None and pending is None:
+            return None
+        record = dict(zip(self.FIELDS, row)) if row else dict.fromkeys(self.FIELDS)
+        record.update(pending or {})
+        return record
+
+    def update(self, aweme_id: str, **fields):
+        """
+        更新记录，只覆盖给出的字段
+        :param aweme_id: 视频ID
+        :param fields: FIELDS 中的字段
+        """
+        unknown = set(fields) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"未知的记录字段: {', '.join(sorted(unknown))}")
+        with self._lock:
+            self._pending.setdefault(aweme_id, {}).update(
+                {key: value for key, value in fields.items() if value is not None}
+            )
+            if len(self._pending) >= self.FLUSH_EVERY:
+                self._flush_locked()
+
+    def flush(self):
+        """提交所有未写入的更新"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        columns = ", ".join(self.FIELDS)
+        placeholders = ", ".join("?" for _ in self.FIELDS)
+        # 未给出的字段为NULL，合并时保留原值
+        assignments = ", ".join(f"{field}=COALESCE(excluded.{field}, {field})" for field in self.FIELDS)
+        now = time.time()
+        rows = [
+            (aweme_id,) + tuple(fields.get(field) for field in self.FIELDS) + (now,)
+            for aweme_id, fields in self._pending.items()
+        ]
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO records (aweme_id, {columns}, updated_at) VALUES (?, {placeholders}, ?) "
+                f"ON CONFLICT(aweme_id) DO UPDATE SET {assignments}, updated_at=excluded.updated_at",
+                rows
+            )
+        self._pending.clear()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """令牌桶限速器
+
+    以固定速率补充令牌，允许不超过容量的突发请求。
+    采用"预约"方式扣减令牌：令牌不足时先记为负数，再按欠额休眠，
+    因此不需要锁，也不依赖创建时的事件循环。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        :param rate: 每秒补充的令牌数，<=0 表示不限速
+        :param capacity: 桶容量(允许的突发数)，默认等于速率且至少为1
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        预约令牌
+        :param tokens: 需要的令牌数
+        :return: 需要等待的秒数
+        """
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        self.tokens -= tokens
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，不足时异步等待
+        :param tokens: 需要的令牌数
+        :return: 实际等待的秒数
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class HostRateLimiter:
+    """按主机划分的限速器
+
+    API服务器使用单独的速率，其余主机(视频/图片CDN)各自使用一个CDN速率的令牌桶。
+    """
+
+    def __init__(self, api_host: str, api_rate: float, cdn_rate: float):
+        """
+        :param api_host: API服务器主机名(含端口)
+        :param api_rate: API服务器每秒请求数
+        :param cdn_rate: 每个CDN主机每秒请求数
+        """
+        self.api_host = api_host
+        self.api_rate = api_rate
+        self.cdn_rate = cdn_rate
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        """
+        获取URL所属主机的令牌桶
+        :param url: 请求URL
+        :return: 令牌桶
+        """
+        host = urlparse(url).netloc or url
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            rate = self.api_rate if host == self.api_host else self.cdn_rate
+            bucket = TokenBucket(rate)
+            self.buckets[host] = bucket
+        return bucket
+
+    async def acquire(self, url: str) -> float:
+        """
+        在请求URL前获取令牌
+        :param url: 请求URL
+        :return: 实际等待的秒数
+        """
+        return await self.bucket_for(url).acquire()
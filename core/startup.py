@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+# 子进程显示窗口后输出的标记行
+READY_MARKER = "STARTUP_READY"
+
+
+def parse_importtime(text: str) -> List[Dict]:
+    """
+    解析 python -X importtime 的输出
+    :param text: 标准错误输出
+    :return: [{"module", "self_us", "cumulative_us", "depth"}]，按导入完成顺序
+    """
+    modules = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        modules.append({
+            "module": stripped,
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            "depth": (len(name) - len(stripped) - 1) // 2,
+        })
+    return modules
+
+
+def profile_startup(script: str, importtime: bool = True, timeout: float = 120,
+                    env: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    在子进程中冷启动程序，测量从启动到窗口显示的时间
+    :param script: main.py 路径
+    :param importtime: 是否同时记录各模块导入耗时(会略微拖慢启动)
+    :param timeout: 超时时间(秒)
+    :param env: 子进程环境变量
+    :return: {"window_seconds", "returncode", "modules"}，未显示窗口时 window_seconds 为None
+    """
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += [script, "--startup-exit"]
+
+    # importtime 输出很多，写到临时文件，避免管道写满阻塞子进程
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8", errors="replace") as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, env=env,
+                                   text=True, encoding="utf-8", errors="replace")
+        window_seconds = None
+        try:
+            for line in process.stdout:
+                if line.startswith(READY_MARKER) and window_seconds is None:
+                    window_seconds = time.perf_counter() - start
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        stderr.seek(0)
+        modules = parse_importtime(stderr.read()) if importtime else []
+
+    return {
+        "window_seconds": window_seconds,
+        "returncode": process.returncode,
+        "modules": modules,
+    }
+
+
+def format_profile(profile: Dict, top: int = 25) -> str:
+    """
+    格式化启动分析结果
+    :param profile: profile_startup 的返回值
+    :param top: 显示耗时最多的模块数
+    :return: 报告文本
+    """
+    lines = []
+    if profile["window_seconds"] is None:
+        lines.append(f"窗口未能显示 (退出码 {profile['returncode']})")
+    else:
+        lines.append(f"启动到窗口显示: {profile['window_seconds']:.3f} 秒")
+
+    modules = profile["modules"]
+    if modules:
+        total_us = sum(item["cumulative_us"] for item in modules if item["depth"] == 0)
+        lines.append(f"导入模块 {len(modules)} 个，导入总耗时 {total_us / 1e6:.3f} 秒")
+        lines.append("")
+        lines.append(f"{'自身(ms)':>10} {'累计(ms)':>10}  模块")
+        for item in sorted(modules, key=lambda item: item["cumulative_us"], reverse=True)[:top]:
+            lines.append(f"{item['self_us'] / 1000:>10.1f} {item['cumulative_us'] / 1000:>10.1f}  "
+                         f"{'  ' * item['depth']}{item['module']}")
+    return "\n".join(lines)
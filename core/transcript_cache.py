@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+
+class TranscriptCache:
+    """按内容指纹缓存识别结果
+
+    媒体文件的指纹先按 (大小, 修改时间, inode) 快速查找，
+    重命名的文件无需重新计算；未命中时流式计算内容哈希。
+    识别结果以 (内容哈希, 引擎, 模型, 语言) 为键，
+    相同的音频在同一设置下只识别一次，同名的不同文件也不会互相复用。
+    人声检测没有找到语音的内容也按内容哈希记录，再次处理时不再解码。
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, db_path: str):
+        """
+        :param db_path: SQLite数据库路径
+        """
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                device INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (device, inode, size, mtime_ns)
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS transcripts (
+                digest TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                model TEXT NOT NULL,
+                language TEXT NOT NULL,
+                text TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (digest, engine, model, language)
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS no_speech (
+                digest TEXT PRIMARY KEY,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def fingerprint(self, path: str) -> str:
+        """
+        计算媒体文件的内容指纹(耗时操作，应在线程池中调用)
+        :param path: 文件路径
+        :return: 内容哈希(十六进制)
+        """
+        st = os.stat(path)
+        stat_key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM fingerprints WHERE device=? AND inode=? AND size=? AND mtime_ns=?",
+                stat_key
+            ).fetchone()
+        if row:
+            return row[0]
+
+        digest = self._hash_file(path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (device, inode, size, mtime_ns, digest) VALUES (?, ?, ?, ?, ?)",
+                stat_key + (digest,)
+            )
+            self._conn.commit()
+        return digest
+
+    def _hash_file(self, path: str) -> str:
+        h = hashlib.blake2b(digest_size=20)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def get(self, digest: str, model_key: Tuple[str, str, str]) -> Optional[str]:
+        """
+        查询识别结果
+        :param digest: 内容哈希
+        :param model_key: (引擎, 模型, 语言)
+        :return: 识别文本，未命中时为None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM transcripts WHERE digest=? AND engine=? AND model=? AND language=?",
+                (digest,) + tuple(model_key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, digest: str, model_key: Tuple[str, str, str], text: str):
+        """
+        保存识别结果
+        :param digest: 内容哈希
+        :param model_key: (引擎, 模型, 语言)
+        :param text: 识别文本
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (digest, engine, model, language, text, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (digest,) + tuple(model_key) + (text, time.time())
+            )
+            self._conn.commit()
+
+    def is_no_speech(self, digest: str) -> bool:
+        """
+        该内容是否已检测到没有人声
+        :param digest: 内容哈希
+        :return: 是否没有人声
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM no_speech WHERE digest=?", (digest,)).fetchone()
+        return row is not None
+
+    def mark_no_speech(self, digest: str):
+        """
+        记录该内容没有人声
+        :param digest: 内容哈希
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO no_speech (digest, created_at) VALUES (?, ?)", (digest, time.time())
+            )
+            self._conn.commit()
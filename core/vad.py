@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import List, Tuple
+
+from core.audio import SAMPLE_RATE
+
+FRAME_SIZE = 320          # 20ms 一帧
+FFT_SIZE = 512
+FEATURE_BLOCK = 3000      # 每次计算频谱的帧数(60秒)
+SPEECH_BAND = (300, 3400)  # 语音主要能量所在频段(Hz)
+
+MIN_ENERGY_DB = -50       # 低于该能量的帧视为静音(dBFS)
+NOISE_MARGIN_DB = 10      # 高于背景噪声多少dB才可能是语音
+MAX_THRESHOLD_DB = -40    # 能量阈值上限，持续的人声(如配乐下的解说)不会因背景噪声估计偏高而被丢弃
+MIN_BAND_RATIO = 0.2      # 语音频段能量占比下限(男声基频低于300Hz，不能设得太高)
+MAX_FLATNESS = 0.45       # 频谱平坦度上限，白噪声约为0.56，浊音远低于此
+MIN_SPEECH = 0.25         # 短于该时长(秒)的语音段丢弃
+MIN_SILENCE = 0.4         # 短于该时长(秒)的静音不切分
+PADDING = 0.3             # 语音段前后各保留的时长(秒)
+JOIN_GAP = 0.2            # 拼接语音段时插入的静音(秒)
+SMOOTH_FRAMES = 5         # 频谱特征的平滑窗口(帧)，减少单帧估计的抖动
+
+
+class VoicedAudio:
+    """去掉非语音部分后的音频
+
+    识别结果只有文本，不需要把拼接后的时间换算回原始音频。
+    """
+
+    def __init__(self, pcm, regions: List[Tuple[int, int]], total_samples: int):
+        """
+        :param pcm: 拼接后的PCM
+        :param regions: 原始音频中的语音区间(采样点)
+        :param total_samples: 原始音频长度(采样点)
+        """
+        self.pcm = pcm
+        self.regions = regions
+        self.total_samples = total_samples
+
+    @property
+    def has_speech(self) -> bool:
+        return bool(self.regions)
+
+    @property
+    def speech_seconds(self) -> float:
+        return sum(end - start for start, end in self.regions) / SAMPLE_RATE
+
+    @property
+    def total_seconds(self) -> float:
+        return self.total_samples / SAMPLE_RATE
+
+
+def _frame_features(pcm):
+    """每帧的能量(dB)、语音频段能量占比和频谱平坦度"""
+    import numpy as np
+
+    count = len(pcm) // FRAME_SIZE
+    frames = pcm[:count * FRAME_SIZE].reshape(count, FRAME_SIZE)
+    window = np.hanning(FRAME_SIZE).astype(np.float32)
+    freqs = np.fft.rfftfreq(FFT_SIZE, 1 / SAMPLE_RATE)
+    band = (freqs >= SPEECH_BAND[0]) & (freqs <= SPEECH_BAND[1])
+
+    energy_db = np.empty(count)
+    band_ratio = np.empty(count)
+    flatness = np.empty(count)
+    # 分块计算频谱，长音频不会一次占用大量内存
+    for start in range(0, count, FEATURE_BLOCK):
+        block = frames[start:start + FEATURE_BLOCK].astype(np.float32)
+        end = start + len(block)
+        energy_db[start:end] = 10 * np.log10(np.mean(block ** 2, axis=1) + 1e-10)
+        power = np.abs(np.fft.rfft(block * window, n=FFT_SIZE, axis=1)) ** 2 + 1e-12
+        band_power = power[:, band]
+        band_ratio[start:end] = band_power.sum(axis=1) / power.sum(axis=1)
+        flatness[start:end] = np.exp(np.mean(np.log(band_power), axis=1)) / np.mean(band_power, axis=1)
+    return energy_db, band_ratio, flatness
+
+
+def energy_threshold(energy_db) -> float:
+    """
+    区分语音和背景噪声的能量阈值
+    :param energy_db: 每帧能量(dB)
+    :return: 阈值(dBFS)
+    """
+    import numpy as np
+
+    # 背景噪声取能量较低的10%帧
+    noise_floor = np.percentile(energy_db, 10)
+    return max(MIN_ENERGY_DB, min(noise_floor + NOISE_MARGIN_DB, MAX_THRESHOLD_DB))
+
+
+def _runs(mask) -> List[Tuple[int, int]]:
+    """布尔序列中连续为True的区间 [start, end)"""
+    import numpy as np
+
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def detect_speech(pcm) -> List[Tuple[int, int]]:
+    """
+    检测语音区间
+    :param pcm: 16kHz 单声道 float32 PCM
+    :return: 语音区间列表 [(起始采样点, 结束采样点)]
+    """
+    import numpy as np
+
+    if len(pcm) < FRAME_SIZE:
+        return []
+    energy_db, band_ratio, flatness = _frame_features(pcm)
+    kernel = np.ones(SMOOTH_FRAMES) / SMOOTH_FRAMES
+    band_ratio = np.convolve(band_ratio, kernel, mode="same")
+    flatness = np.convolve(flatness, kernel, mode="same")
+
+    mask = (energy_db > energy_threshold(energy_db)) & (band_ratio > MIN_BAND_RATIO) & (flatness < MAX_FLATNESS)
+
+    frame_seconds = FRAME_SIZE / SAMPLE_RATE
+    runs = _runs(mask)
+
+    # 合并间隔过短的语音段
+    merged: List[List[int]] = []
+    for start, end in runs:
+        if merged and (start - merged[-1][1]) * frame_seconds < MIN_SILENCE:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    # 丢弃过短的语音段，前后补齐
+    padding = int(PADDING / frame_seconds)
+    count = len(energy_db)
+    regions: List[Tuple[int, int]] = []
+    for start, end in merged:
+        if (end - start) * frame_seconds < MIN_SPEECH:
+            continue
+        start, end = max(0, start - padding), min(count, end + padding)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return [(int(start) * FRAME_SIZE, min(len(pcm), int(end) * FRAME_SIZE)) for start, end in regions]
+
+
+def trim_to_speech(pcm) -> VoicedAudio:
+    """
+    只保留语音部分，语音段之间插入短暂静音后拼接
+    :param pcm: 16kHz 单声道 float32 PCM
+    :return: 拼接后的音频
+    """
+    import numpy as np
+
+    regions = detect_speech(pcm)
+    if not regions:
+        return VoicedAudio(pcm[:0], [], len(pcm))
+
+    gap = np.zeros(int(JOIN_GAP * SAMPLE_RATE), dtype=pcm.dtype)
+    parts = []
+    for start, end in regions:
+        if parts:
+            parts.append(gap)
+        parts.append(pcm[start:end])
+    return VoicedAudio(np.concatenate(parts), regions, len(pcm))
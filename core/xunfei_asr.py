@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+from email.utils import formatdate
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+from core.audio import SAMPLE_RATE
+from core.chunking import plan_chunks, stitch_texts
+from core.lazy import lazy_import
+
+aiohttp = lazy_import("aiohttp")
+
+
+class XunfeiError(Exception):
+    """讯飞接口返回错误"""
+
+
+class XunfeiAsr:
+    """讯飞语音听写(流式版) WebSocket 客户端
+
+    音频以 16kHz 16bit PCM 按 40ms 一帧(1280字节)实时发送，边发送边接收结果，
+    开启动态修正(wpgs)后按返回的替换范围组装最终文本。
+    单次会话最长60秒，长音频在静音处切分为多个会话，在同一个事件循环中并发识别。
+    同一事件循环中的所有识别共用 max_sessions 个会话名额。
+    """
+
+    HOST = "iat-api.xfyun.cn"
+    PATH = "/v2/iat"
+    FRAME_BYTES = 1280         # 每帧字节数(40ms)
+    FRAME_INTERVAL = 0.04      # 帧间隔(秒)
+    MAX_SESSION_SECONDS = 55   # 每个会话的最大音频时长(接口限制60秒)
+    VAD_EOS = 10000            # 后端点静音检测时长(毫秒)，接口允许的最大值
+    RECEIVE_TIMEOUT = 30       # 等待服务器消息的超时(秒)
+
+    def __init__(self, app_id: str, api_key: str, api_secret: str, language: str = "zh_cn",
+                 accent: str = "mandarin", max_sessions: int = 4):
+        """
+        :param app_id: 应用ID
+        :param api_key: APIKey
+        :param api_secret: APISecret
+        :param language: 语种
+        :param accent: 方言
+        :param max_sessions: 同时进行的会话数
+        """
+        self.app_id = app_id
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.language = language
+        self.accent = accent
+        self.max_sessions = max(1, int(max_sessions))
+        self.url = f"wss://{self.HOST}{self.PATH}"
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """
+        会话数限制，同一事件循环中所有识别共用
+        :return: 信号量
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            # 清理已关闭事件循环遗留的信号量
+            for other_loop in [l for l in self._semaphores if l.is_closed()]:
+                self._semaphores.pop(other_loop, None)
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_sessions)
+        return semaphore
+
+    def auth_url(self) -> str:
+        """
+        带鉴权参数的连接地址，签名中包含当前时间，每次连接前重新生成
+        :return: URL
+        """
+        date = formatdate(timeval=time.time(), usegmt=True)
+        signature_origin = f"host: {self.HOST}\ndate: {date}\nGET {self.PATH} HTTP/1.1"
+        signature = base64.b64encode(
+            hmac.new(self.api_secret.encode("utf-8"), signature_origin.encode("utf-8"), hashlib.sha256).digest()
+        ).decode("utf-8")
+        authorization_origin = (
+            f'api_key="{self.api_key}", algorithm="hmac-sha256", '
+            f'headers="host date request-line", signature="{signature}"'
+        )
+        authorization = base64.b64encode(authorization_origin.encode("utf-8")).decode("utf-8")
+        return self.url + "?" + urlencode({"authorization": authorization, "date": date, "host": self.HOST})
+
+    async def recognize(self, pcm, session: Optional[aiohttp.ClientSession] = None) -> str:
+        """
+        识别一段音频，超过单次会话时长时切分后并发识别
+        :param pcm: 16kHz 单声道 float32 PCM
+        :param session: aiohttp会话，不提供时临时创建
+        :return: 识别文本
+        """
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self.recognize(pcm, own_session)
+
+        chunks = plan_chunks(pcm, self.MAX_SESSION_SECONDS)
+        semaphore = self._semaphore()
+
+        async def run(start: int, end: int) -> str:
+            async with semaphore:
+                return await self._session(session, pcm[start:end])
+
+        texts = await asyncio.gather(*(run(start, end) for start, end in chunks))
+        return stitch_texts(chunks, texts)
+
+    def _frames(self, pcm):
+        """把 float32 PCM 逐帧转换为 16bit 字节，不一次性转换整段音频"""
+        import numpy as np
+
+        samples = self.FRAME_BYTES // 2
+        for start in range(0, len(pcm), samples):
+            frame = np.clip(pcm[start:start + samples], -1.0, 1.0)
+            yield (frame * 32767).astype("<i2").tobytes()
+
+    def _frame_message(self, status: int, audio: bytes) -> str:
+        """
+        构造一帧数据，第一帧附带公共参数和业务参数
+        :param status: 0 第一帧，1 中间帧，2 最后一帧
+        :param audio: 音频数据
+        :return: JSON文本
+        """
+        message: Dict = {
+            "data": {
+                "status": status,
+                "format": f"audio/L16;rate={SAMPLE_RATE}",
+                "encoding": "raw",
+                "audio": base64.b64encode(audio).decode("utf-8"),
+            }
+        }
+        if status == 0:
+            message["common"] = {"app_id": self.app_id}
+            message["business"] = {
+                "language": self.language,
+                "domain": "iat",
+                "accent": self.accent,
+                "dwa": "wpgs",
+                "vad_eos": self.VAD_EOS,
+            }
+        return json.dumps(message)
+
+    async def _send_audio(self, ws, pcm):
+        """按实时速率发送音频帧，最后发送结束帧"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        status = 0
+        for index, frame in enumerate(self._frames(pcm)):
+            # 按绝对时间排期，发送耗时不会累积成延迟
+            delay = start + index * self.FRAME_INTERVAL - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await ws.send_str(self._frame_message(status, frame))
+            status = 1
+        if status == 0:
+            # 空音频也需要第一帧携带参数
+            await ws.send_str(self._frame_message(0, b""))
+        await ws.send_str(self._frame_message(2, b""))
+
+    async def _session(self, session: aiohttp.ClientSession, pcm) -> str:
+        """
+        一次识别会话
+        :param session: aiohttp会话
+        :param pcm: 不超过单次会话时长的PCM
+        :return: 识别文本
+        """
+        results = WpgsResult()
+        async with session.ws_connect(self.auth_url(), receive_timeout=self.RECEIVE_TIMEOUT) as ws:
+            sender = asyncio.ensure_future(self._send_audio(ws, pcm))
+            try:
+                async for msg in ws:
+                    if msg.type == aiohttp.WSMsgType.ERROR:
+                        raise XunfeiError(f"连接出错: {ws.exception()}")
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        continue
+                    data = json.loads(msg.data)
+                    if data.get("code") != 0:
+                        raise XunfeiError(f"错误码: {data.get('code')}, 错误信息: {data.get('message')}")
+                    body = data.get("data") or {}
+                    if body.get("result"):
+                        results.update(body["result"])
+                    if body.get("status") == 2:
+                        break
+                else:
+                    # 没有收到最后的结果连接就关闭了，发送出错时报告发送的错误
+                    if sender.done() and not sender.cancelled() and sender.exception():
+                        raise sender.exception()
+                    raise XunfeiError(f"连接意外关闭: {ws.close_code}")
+            finally:
+                sender.cancel()
+        return results.text
+
+
+class WpgsResult:
+    """动态修正结果的组装
+
+    每条结果带序号 sn；pgs 为 rpl 时，用本条结果替换 rg 范围内之前的结果。
+    """
+
+    def __init__(self):
+        self._pieces: Dict[int, str] = {}
+
+    def update(self, result: Dict):
+        """
+        :param result: 返回消息中的 data.result
+        """
+        if result.get("pgs") == "rpl":
+            first, last = result.get("rg", [0, -1])
+            for sn in range(first, last + 1):
+                self._pieces.pop(sn, None)
+        words: List[str] = [cw.get("w", "") for ws in result.get("ws", []) for cw in ws.get("cw", [])[:1]]
+        self._pieces[result.get("sn", len(self._pieces) + 1)] = "".join(words)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._pieces[sn] for sn in sorted(self._pieces))
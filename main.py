@@ -1,8 +1,20 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import multiprocessing
 import sys
 import os
+import time
+
+_start_time = time.perf_counter()
+
+if "--profile-startup" in sys.argv:
+    # 在子进程中冷启动并统计各模块导入耗时，不启动界面
+    from core.startup import format_profile, profile_startup
+    print(format_profile(profile_startup(os.path.abspath(__file__))))
+    sys.exit(0)
+
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QIcon
 from controllers.main_controller import MainController
@@ -14,6 +26,9 @@ def resource_path(relative_path):
     return os.path.join(os.path.abspath("."), relative_path)
 
 if __name__ == "__main__":
+    # 打包后的程序启动识别进程时需要
+    multiprocessing.freeze_support()
+    
     # 确保必要的目录存在
     for directory in ["video", "audio", "text"]:
         os.makedirs(directory, exist_ok=True)
@@ -29,4 +44,14 @@ if __name__ == "__main__":
     
     # 创建主控制器并运行
     controller = MainController()
-    sys.exit(controller.run()) 
\ No newline at end of file
+    
+    if "--startup-exit" in sys.argv:
+        # 启动分析：窗口显示后输出耗时并退出
+        from core.startup import READY_MARKER
+        
+        def report_ready():
+            print(f"{READY_MARKER} {time.perf_counter() - _start_time:.3f}", flush=True)
+            app.exit(0)  # quit() 会触发关闭确认对话框
+        QTimer.singleShot(0, report_ready)
+    
+    sys.exit(controller.run(preload_engine="--startup-exit" not in sys.argv))
\ No newline at end of file
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import pytest
+
+# 测试直接导入仓库根目录下的模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    """手动推进的 time.monotonic"""
+
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(request, monkeypatch):
+    """
+    替换被测模块使用的 time.monotonic，
+    测试模块用 CLOCK_TARGET 指定替换的位置，如 "core.scheduler.time.monotonic"
+    """
+    fake = FakeClock()
+    monkeypatch.setattr(request.module.CLOCK_TARGET, fake)
+    return fake
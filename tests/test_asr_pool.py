@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from types import SimpleNamespace
+
+import pytest
+
+from core.asr_engines import WhisperEngine
+from core.asr_pool import DEFAULT_MODEL_MEMORY_MB, AsrPool, model_memory_mb
+
+CLOCK_TARGET = "core.asr_pool.time.monotonic"
+
+
+def key(options):
+    return "whisper", WhisperEngine.model_id(options), "zh"
+
+
+@pytest.mark.parametrize("options, expected", [
+    ({"model": "tiny"}, 1000),
+    ({"model": "large-v3"}, 10000),
+    # CPU方案加载完整模型后再量化
+    ({"model": "base", "cpu_profile": True}, 1000),
+    ({"model": "small", "backend": "faster-whisper", "compute_type": "int8"}, 800),
+    ({"model": "large-v3", "backend": "faster-whisper", "compute_type": "int8_float16"}, 3500),
+    ({"model": "medium", "backend": "faster-whisper", "compute_type": "float16"}, 5000),
+    ({"backend": "faster-whisper", "model_dir": "C:\\models\\faster-whisper-tiny", "compute_type": "int8"}, 300),
+    ({"backend": "faster-whisper", "model_dir": "/models/custom/", "compute_type": "int8"}, DEFAULT_MODEL_MEMORY_MB),
+])
+def test_whisper_model_ids_map_to_size(options, expected):
+    assert model_memory_mb(key(options)) == expected
+
+
+def test_other_engines_use_table():
+    assert model_memory_mb(("paddlespeech", "conformer_wenetspeech", "zh")) == 2000
+    assert model_memory_mb(("xunfei", "iat", "zh")) == DEFAULT_MODEL_MEMORY_MB
+
+
+def test_pool_closes_workers_after_idle_timeout(clock):
+    pool = AsrPool(SimpleNamespace(model_idle_timeout=10), 2, "key")
+    try:
+        executor = pool._acquire()
+        clock.now += 60
+        # 识别中不关闭
+        assert not pool.close_idle()
+        pool._release()
+        clock.now += 5
+        assert not pool.close_idle()
+        clock.now += 5
+        assert pool.close_idle()
+        # 下次识别时重新创建
+        assert pool._acquire() is not executor
+        pool._release()
+    finally:
+        pool.shutdown()
+
+
+def test_pool_idle_close_disabled(clock):
+    pool = AsrPool(SimpleNamespace(model_idle_timeout=0), 2, "key")
+    try:
+        pool._acquire()
+        pool._release()
+        clock.now += 10000
+        assert not pool.close_idle()
+    finally:
+        pool.shutdown()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from core.audio import SAMPLE_RATE
+from core.chunking import plan_chunks, stitch_texts
+
+
+def tone(seconds: float):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds: float):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_short_audio_is_one_chunk():
+    pcm = tone(10)
+    assert plan_chunks(pcm, 30) == [(0, len(pcm))]
+
+
+def test_cuts_at_silence_without_overlap():
+    pcm = np.concatenate([tone(20), silence(2), tone(20)])
+    chunks = plan_chunks(pcm, 30)
+    assert len(chunks) == 2
+    (start0, cut), (start1, end1) = chunks
+    assert start0 == 0 and start1 == cut and end1 == len(pcm)
+    # 切分点落在静音里
+    assert 20 * SAMPLE_RATE < cut < 22 * SAMPLE_RATE
+
+
+def test_hard_cut_overlaps_when_no_silence():
+    pcm = tone(70)
+    chunks = plan_chunks(pcm, 30, overlap=2.0)
+    assert chunks[0] == (0, 30 * SAMPLE_RATE)
+    assert chunks[1][0] == 28 * SAMPLE_RATE
+    assert chunks[-1][1] == len(pcm)
+    assert all(end - start <= 30 * SAMPLE_RATE for start, end in chunks)
+    assert all(b[0] < a[1] for a, b in zip(chunks, chunks[1:]))
+
+
+def test_stitch_without_overlap_joins_texts():
+    chunks = [(0, 100), (100, 200)]
+    assert stitch_texts(chunks, ["今天天气很好", "我们去公园"]) == "今天天气很好我们去公园"
+    assert stitch_texts(chunks, ["hello world", "again"]) == "hello world again"
+
+
+def test_stitch_removes_duplicated_overlap():
+    chunks = [(0, 100), (90, 200)]
+    text = stitch_texts(chunks, ["今天我们来讲一下如何做红烧肉", "如何做红烧肉首先准备五花肉"])
+    assert text == "今天我们来讲一下如何做红烧肉首先准备五花肉"
+
+
+def test_stitch_tolerates_misrecognized_edge():
+    chunks = [(0, 100), (90, 200)]
+    # 切分处的字常被识别错：前一段结尾多出一个字，后一段开头少了半句
+    text = stitch_texts(chunks, ["先把五花肉切成小块再焯", "切成小块再焯水去掉血沫"])
+    assert text == "先把五花肉切成小块再焯水去掉血沫"
+
+
+def test_stitch_keeps_repeats_far_from_edges():
+    chunks = [(0, 100), (90, 200)]
+    left = "好的好的这是开头的一段很长的内容" + "甲" * 30
+    right = "乙" * 20 + "好的好的"
+    # 相同字句不在切分处，不当作重叠
+    assert stitch_texts(chunks, [left, right]) == left + right
+
+
+def test_stitch_skips_empty_chunk():
+    chunks = [(0, 100), (90, 200), (190, 300)]
+    assert stitch_texts(chunks, ["第一段", None, "第三段"]) == "第一段第三段"
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+
+import pytest
+
+from config import Config
+from core.downloader import SpeechRecognizer, VideoDownloader
+from core.pipeline import PipelineJob
+
+
+@pytest.fixture
+def downloader(tmp_path, monkeypatch):
+    # 配置中的目录都是相对路径
+    monkeypatch.chdir(tmp_path)
+    config = Config(str(tmp_path / "config.json"))
+    config.extract_text = False
+    config.download_audio = False
+    downloader = VideoDownloader(config)
+    yield downloader
+    downloader.shutdown()
+
+
+def test_overlapping_download_and_import_keep_separate_progress(downloader):
+    download_started = threading.Event()
+    import_finished = threading.Event()
+    snapshots = {"download": [], "import": []}
+
+    def record(snapshot):
+        snapshots[threading.current_thread().name].append(snapshot)
+
+    downloader.progress_detail.connect(record)
+
+    async def stage_download(job):
+        index = downloader._progress_job()
+        downloader.progress.file_size(index, f"part-{job.index}", 1000)
+        downloader.progress.add_bytes(index, f"part-{job.index}", 500)
+        if job.index == 0:
+            # 下载到一半时另一个线程完成一批导入
+            download_started.set()
+            import_finished.wait(5)
+        downloader.progress.add_bytes(index, f"part-{job.index}", 500)
+        return True
+
+    async def stage_audio(job):
+        return True
+
+    downloader._stage_download = stage_download
+    downloader._stage_audio = stage_audio
+
+    def run_download():
+        asyncio.run(downloader.download_videos(["a", "b"]))
+
+    def run_import():
+        download_started.wait(5)
+        asyncio.run(downloader.import_media([("1.mp4", "video"), ("2.mp4", "video"), ("3.mp4", "video")]))
+        import_finished.set()
+
+    threads = [threading.Thread(target=run_download, name="download"),
+               threading.Thread(target=run_import, name="import")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+        assert not thread.is_alive()
+
+    download, imported = snapshots["download"], snapshots["import"]
+    assert download and imported
+    assert all(snapshot["total"] == 2 for snapshot in download)
+    assert all(snapshot["total"] == 3 for snapshot in imported)
+    # 下载的字节只计入下载批次
+    assert download[-1]["bytes"] == 2000 and imported[-1]["bytes"] == 0
+    assert download[-1]["percent"] == 100 and imported[-1]["percent"] == 100
+
+
+def test_local_engine_limit_spans_event_loops(downloader, monkeypatch):
+    downloader.config.asr_processes = 1
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def recognize(self, audio):
+        with lock:
+            running.append(audio)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(audio)
+        return f"text-{audio}"
+
+    monkeypatch.setattr(SpeechRecognizer, "recognize", recognize)
+
+    results = {}
+
+    def run(name):
+        async def main():
+            return await asyncio.gather(*(downloader._recognize_one(f"{name}-{i}") for i in range(3)))
+        results[name] = asyncio.run(main())
+
+    # 下载线程和导入线程各自的事件循环同时识别
+    threads = [threading.Thread(target=run, args=(name,)) for name in ("download", "import")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert results["download"] == [f"text-download-{i}" for i in range(3)]
+    assert results["import"] == [f"text-import-{i}" for i in range(3)]
+    # whisper 的并发上限为1
+    assert max(peak) == 1
+
+
+def test_engine_no_speech_is_not_a_failure(downloader, tmp_path):
+    media = tmp_path / "silent.mp4"
+    media.write_bytes(b"\0" * 4096)
+    calls = []
+
+    async def recognize(audio):
+        calls.append(audio)
+        return ""
+
+    downloader._recognize_one = recognize
+    job = PipelineJob(0, str(media))
+    job.video_path = str(media)
+
+    async def main():
+        await downloader._stage_asr(job)
+        return await downloader._known_no_speech(str(media))
+
+    # 引擎没有识别到人声：导入任务不算失败，按内容记录为没有人声
+    assert asyncio.run(main())
+    assert calls == [str(media)]
+    assert job.status == PipelineJob.STATUS_SUCCESS
+    assert not job.text_path
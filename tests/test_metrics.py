@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from core.metrics import DURATION_BUCKETS, NULL_SPAN, PREFIX, Metrics
+
+
+@pytest.fixture
+def metrics():
+    m = Metrics()
+    m.enabled = True
+    return m
+
+
+def test_disabled_is_noop():
+    m = Metrics()
+    m.inc("requests")
+    m.gauge("queue", 3)
+    m.observe("latency", 0.2)
+    assert m.span("download") is NULL_SPAN
+    with m.span("download") as span:
+        span.set(bytes=10)
+    assert m.render() == "\n"
+
+
+def test_counter_and_gauge(metrics):
+    metrics.inc("requests", host="a")
+    metrics.inc("requests", 2, host="a")
+    metrics.gauge("queue", 5)
+    lines = metrics.render().splitlines()
+    assert f"# TYPE {PREFIX}requests counter" in lines
+    assert f'{PREFIX}requests{{host="a"}} 3' in lines
+    assert f"# TYPE {PREFIX}queue gauge" in lines
+    assert f"{PREFIX}queue 5" in lines
+
+
+def test_histogram_buckets(metrics):
+    metrics.observe("latency", 0.3, stage="asr")
+    metrics.observe("latency", 1000, stage="asr")
+    lines = metrics.render().splitlines()
+    name = f"{PREFIX}latency"
+    assert f"# TYPE {name} histogram" in lines
+    buckets = [line for line in lines if line.startswith(name + "_bucket")]
+    # 每个分桶一行，再加 +Inf
+    assert len(buckets) == len(DURATION_BUCKETS) + 1
+    assert f'{name}_bucket{{stage="asr",le="0.25"}} 0' in lines
+    assert f'{name}_bucket{{stage="asr",le="0.5"}} 1' in lines
+    assert f'{name}_bucket{{stage="asr",le="600"}} 1' in lines
+    assert f'{name}_bucket{{stage="asr",le="+Inf"}} 2' in lines
+    assert f'{name}_sum{{stage="asr"}} 1000.300000' in lines
+    assert f'{name}_count{{stage="asr"}} 2' in lines
+
+
+def test_label_escaping(metrics):
+    metrics.inc("errors", reason='say "hi"\\\nbye')
+    assert f'{PREFIX}errors{{reason="say \\"hi\\"\\\\\\nbye"}} 1' in metrics.render().splitlines()
+
+
+def test_span_records_and_traces(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    m = Metrics()
+    m.configure(trace_path=str(path))
+    try:
+        assert m.enabled
+        with m.span("download_file", url="x") as span:
+            span.set(bytes=100)
+        with pytest.raises(ValueError):
+            with m.span("download_file"):
+                raise ValueError("bad")
+        text = m.render()
+    finally:
+        m.close()
+    assert not m.enabled
+    assert f'{PREFIX}span_total{{outcome="ok",span="download_file"}} 1' in text
+    assert f'{PREFIX}span_total{{outcome="error",span="download_file"}} 1' in text
+    assert f'{PREFIX}span_bytes_total{{span="download_file"}} 100' in text
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [record["outcome"] for record in records] == ["ok", "error"]
+    assert records[0]["bytes"] == 100 and records[0]["url"] == "x"
+    assert records[1]["error"] == "bad"
+    assert records[0]["jobs"] == []
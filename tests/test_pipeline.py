@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+from core.pipeline import Pipeline, PipelineJob, Stage
+
+
+def make_jobs(count: int):
+    return [PipelineJob(index, f"job-{index}") for index in range(count)]
+
+
+def run(pipeline: Pipeline, jobs, **kwargs):
+    return asyncio.run(asyncio.wait_for(pipeline.run(jobs, **kwargs), timeout=5))
+
+
+def test_jobs_pass_through_stages():
+    seen = []
+
+    async def first(job):
+        seen.append(("first", job.index))
+        return job.index != 1
+
+    async def second(job):
+        seen.append(("second", job.index))
+        return True
+
+    finished = []
+    pipeline = Pipeline([Stage("first", "一", first, 2), Stage("second", "二", second, 1)], queue_size=1,
+                        on_job_finished=finished.append)
+    jobs = run(pipeline, make_jobs(4))
+    assert sorted(job.index for job in finished) == [0, 1, 2, 3]
+    # 返回False的任务不进入下一阶段
+    assert ("second", 1) not in seen
+    assert sorted(index for name, index in seen if name == "second") == [0, 2, 3]
+    assert all("first" in job.timings for job in jobs)
+    stats = pipeline.stats()
+    assert stats["first"]["done"] == 4 and stats["second"]["done"] == 3
+
+
+def test_entry_stage():
+    async def skip(job):
+        raise AssertionError("不应经过入口之前的阶段")
+
+    async def handle(job):
+        return True
+
+    pipeline = Pipeline([Stage("first", "一", skip, 1), Stage("second", "二", handle, 1)], queue_size=2)
+    jobs = run(pipeline, make_jobs(2), entry="second")
+    assert all(job.status == PipelineJob.STATUS_SUCCESS for job in jobs)
+
+
+def test_handler_error_fails_job():
+    async def handle(job):
+        if job.index == 0:
+            raise ValueError("坏文件")
+        return True
+
+    jobs = run(Pipeline([Stage("only", "唯一", handle, 1)], queue_size=1), make_jobs(3))
+    assert jobs[0].status == PipelineJob.STATUS_FAILED and "坏文件" in jobs[0].error
+    assert [job.status for job in jobs[1:]] == [PipelineJob.STATUS_SUCCESS] * 2
+
+
+def test_batch_stage_takes_queued_jobs():
+    batches = []
+
+    async def handle(batch):
+        batches.append([job.index for job in batch])
+        return [True] * len(batch)
+
+    run(Pipeline([Stage("batch", "批量", handle, 1, batch_size=3)], queue_size=10), make_jobs(5))
+    assert sum(batches, []) == [0, 1, 2, 3, 4]
+    assert max(len(batch) for batch in batches) <= 3
+
+
+def test_callback_error_does_not_stop_workers(capsys):
+    async def handle(job):
+        return True
+
+    finished = []
+
+    def on_job_finished(job):
+        finished.append(job.index)
+        raise RuntimeError("回调出错")
+
+    def on_stage_finished(stage, job):
+        raise RuntimeError("阶段回调出错")
+
+    pipeline = Pipeline([Stage("only", "唯一", handle, 1)], queue_size=1,
+                        on_job_finished=on_job_finished, on_stage_finished=on_stage_finished)
+    jobs = run(pipeline, make_jobs(5))
+    # 回调出错时其余任务仍然处理完，run() 正常返回
+    assert sorted(finished) == [0, 1, 2, 3, 4]
+    assert all(job.status == PipelineJob.STATUS_SUCCESS for job in jobs)
+    assert "流水线回调出错" in capsys.readouterr().out
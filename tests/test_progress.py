@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from core.progress import ProgressTracker
+
+CLOCK_TARGET = "core.progress.time.monotonic"
+
+
+@pytest.fixture
+def tracker(clock):
+    updates = []
+    tracker = ProgressTracker(updates.append)
+    tracker.updates = updates
+    return tracker
+
+
+def test_stage_weighting(tracker):
+    tracker.start({0: ["download", "audio", "asr"]})
+    tracker.stage_done(0, "download")
+    assert tracker.snapshot()["fraction"] == pytest.approx(0.5)
+    tracker.stage_done(0, "audio")
+    assert tracker.snapshot()["fraction"] == pytest.approx(0.65)
+    tracker.stage_fraction(0, "asr", 0.5)
+    assert tracker.snapshot()["fraction"] == pytest.approx(0.825)
+
+
+def test_weights_normalized_to_planned_stages(tracker):
+    tracker.start({0: ["download"], 1: ["audio", "asr"]})
+    tracker.stage_done(1, "audio")
+    # 任务1只经过 audio 和 asr，audio 占 0.15 / 0.5
+    assert tracker.snapshot()["fraction"] == pytest.approx(0.3 / 2)
+
+
+def test_stage_fraction_only_increases(tracker):
+    tracker.start({0: ["asr"]})
+    tracker.stage_fraction(0, "asr", 0.6)
+    tracker.stage_fraction(0, "asr", 0.2)
+    assert tracker.snapshot()["fraction"] == pytest.approx(0.6)
+
+
+def test_download_bytes_capped(tracker):
+    tracker.start({0: ["download"]})
+    tracker.file_size(0, "a", 1000)
+    tracker.add_bytes(0, "a", 250)
+    assert tracker.snapshot()["fraction"] == pytest.approx(0.25)
+    tracker.add_bytes(0, "a", 750)
+    # 字节已经下载完，阶段结束前最多计为99%
+    snapshot = tracker.snapshot()
+    assert snapshot["fraction"] == pytest.approx(0.99)
+    assert snapshot["bytes"] == 1000
+    tracker.file_done(0, "a")
+    tracker.stage_done(0, "download")
+    assert tracker.snapshot()["fraction"] == pytest.approx(1.0)
+
+
+def test_download_divided_by_file_count(tracker):
+    tracker.start({0: ["download"]})
+    tracker.set_file_count(0, 4)
+    tracker.file_size(0, "a", 100)
+    tracker.file_done(0, "a")
+    assert tracker.snapshot()["fraction"] == pytest.approx(0.25)
+
+
+def test_job_done_completes_remaining_stages(tracker):
+    tracker.start({0: ["download", "audio", "asr"], 1: ["download", "audio", "asr"]})
+    tracker.stage_done(0, "download")
+    tracker.job_done(0)
+    snapshot = tracker.snapshot()
+    assert snapshot["done"] == 1 and snapshot["total"] == 2
+    assert snapshot["fraction"] == pytest.approx(0.5)
+
+
+def test_percent_capped_until_finish(tracker):
+    tracker.start({0: ["asr"]})
+    tracker.stage_done(0, "asr")
+    assert tracker.snapshot()["percent"] == 99
+    tracker.finish()
+    snapshot = tracker.updates[-1]
+    assert snapshot["percent"] == 100
+    assert snapshot["eta"] == 0.0
+
+
+def test_updates_coalesced_within_interval(tracker, clock):
+    tracker.start({0: ["download"]})
+    assert len(tracker.updates) == 1
+    tracker.file_size(0, "a", 1000)
+    for _ in range(10):
+        tracker.add_bytes(0, "a", 10)
+        clock.now += 0.01
+    assert len(tracker.updates) == 1
+
+    clock.now += ProgressTracker.INTERVAL
+    tracker.add_bytes(0, "a", 10)
+    assert len(tracker.updates) == 2
+    assert tracker.updates[-1]["bytes"] == 110
+
+    # 没有变化时定时器之外的调用不会更新
+    clock.now += ProgressTracker.INTERVAL
+    tracker._emit()
+    assert len(tracker.updates) == 2
+
+    # 开始和结束不受间隔限制
+    tracker.finish()
+    assert len(tracker.updates) == 3
+
+
+def test_rate_and_eta(tracker, clock):
+    tracker.start({0: ["download"], 1: ["download"]})
+    tracker.file_size(0, "a", 2000)
+    clock.now += 1.0
+    tracker.add_bytes(0, "a", 1000)
+    snapshot = tracker.snapshot()
+    assert snapshot["rate"] == pytest.approx(1000.0)
+    # 1秒完成25%，剩余75%约需3秒
+    assert snapshot["eta"] == pytest.approx(3.0)
+
+
+def test_format():
+    text = ProgressTracker.format({"done": 3, "total": 10, "rate": 2.5 * 1024 * 1024, "eta": 65})
+    assert text == "3/10 个 · 2.5 MB/s · 剩余 1分05秒"
+    assert ProgressTracker.format({"done": 1, "total": 2, "rate": 0, "eta": 9.6}) == "1/2 个 · 剩余 10秒"
+    assert ProgressTracker.format({"done": 2, "total": 2, "rate": 0, "eta": 0.0}) == "2/2 个"
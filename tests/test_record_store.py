@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from core.record_store import RecordStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache" / "records.db")
+
+
+def test_missing_record_is_none(db_path):
+    assert RecordStore(db_path).get("1") is None
+
+
+def test_update_merges_fields_before_and_after_flush(db_path):
+    store = RecordStore(db_path)
+    store.update("1", kind="video", video_path="/v/1.mp4", video_size=10, stage="download")
+    # 未提交的更新也能查到
+    assert store.get("1")["video_path"] == "/v/1.mp4"
+    store.flush()
+    store.update("1", audio_path="/a/1.mp3", stage="audio")
+    store.flush()
+    record = RecordStore(db_path).get("1")
+    assert record == {
+        "kind": "video",
+        "video_path": "/v/1.mp4",
+        "video_size": 10,
+        "audio_path": "/a/1.mp3",
+        "text_path": None,
+        "stage": "audio",
+    }
+
+
+def test_none_does_not_clear_existing_value(db_path):
+    store = RecordStore(db_path)
+    store.update("1", audio_path="/a/1.mp3")
+    store.flush()
+    store.update("1", audio_path=None, text_path="/t/1.txt")
+    store.flush()
+    record = store.get("1")
+    assert record["audio_path"] == "/a/1.mp3"
+    assert record["text_path"] == "/t/1.txt"
+
+
+def test_flushes_automatically_after_batch(db_path):
+    store = RecordStore(db_path)
+    for i in range(RecordStore.FLUSH_EVERY):
+        store.update(str(i), stage="download")
+    assert store._pending == {}
+    assert RecordStore(db_path).get("0")["stage"] == "download"
+
+
+def test_unknown_field_rejected(db_path):
+    with pytest.raises(ValueError):
+        RecordStore(db_path).update("1", colour="red")
+
+
+def test_legacy_json_imported_once(db_path, tmp_path):
+    legacy = tmp_path / "downloaded.json"
+    legacy.write_text(json.dumps(["111", 222]), encoding="utf-8")
+    store = RecordStore(db_path, legacy_json=str(legacy))
+    assert store.get("111")["stage"] == "download"
+    assert store.get("222") is not None
+
+    legacy.write_text(json.dumps(["333"]), encoding="utf-8")
+    assert RecordStore(db_path, legacy_json=str(legacy)).get("333") is None
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+from core import scheduler
+from core.scheduler import HostRateLimiter, TokenBucket
+
+CLOCK_TARGET = "core.scheduler.time.monotonic"
+
+
+def test_burst_up_to_capacity_then_wait(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # 令牌用完后按欠额计算等待时间，连续预约依次排队
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_refill_over_time_is_capped(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.reserve()
+    clock.now += 1.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+
+    clock.now += 100.0
+    for _ in range(3):
+        assert bucket.reserve() == 0.0
+    assert bucket.reserve() > 0
+
+
+def test_non_positive_rate_is_unlimited(clock):
+    bucket = TokenBucket(rate=0)
+    assert all(bucket.reserve() == 0.0 for _ in range(100))
+
+
+def test_default_capacity_at_least_one(clock):
+    assert TokenBucket(rate=0.5).capacity == 1.0
+    assert TokenBucket(rate=5).capacity == 5.0
+
+
+def test_acquire_sleeps_for_reserved_delay(clock, monkeypatch):
+    slept = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+
+    monkeypatch.setattr(scheduler.asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket(rate=4, capacity=1)
+
+    async def run():
+        return [await bucket.acquire() for _ in range(3)]
+
+    assert asyncio.run(run()) == pytest.approx([0.0, 0.25, 0.5])
+    assert slept == pytest.approx([0.25, 0.5])
+
+
+def test_host_limiter_separates_api_and_cdn(clock):
+    limiter = HostRateLimiter("api.example.com:1001", api_rate=1, cdn_rate=10)
+    api = limiter.bucket_for("http://api.example.com:1001/api/hybrid/video_data")
+    cdn_a = limiter.bucket_for("https://cdn-a.example.com/video.mp4")
+    cdn_b = limiter.bucket_for("https://cdn-b.example.com/video.mp4")
+    assert api.rate == 1
+    assert cdn_a.rate == cdn_b.rate == 10
+    assert cdn_a is not cdn_b
+    assert limiter.bucket_for("https://cdn-a.example.com/other.jpg") is cdn_a
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from core.transcript_cache import TranscriptCache
+
+MODEL = ("whisper", "base", "zh")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TranscriptCache(str(tmp_path / "cache" / "transcripts.db"))
+
+
+@pytest.fixture
+def hash_calls(cache, monkeypatch):
+    calls = []
+    original = cache._hash_file
+
+    def counting(path):
+        calls.append(path)
+        return original(path)
+
+    monkeypatch.setattr(cache, "_hash_file", counting)
+    return calls
+
+
+def write(path, data: bytes, mtime_ns: int):
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_fingerprint_fast_path_skips_rehash(cache, hash_calls, tmp_path):
+    media = tmp_path / "a.mp4"
+    write(media, b"video-data", 1_000_000_000)
+    first = cache.fingerprint(str(media))
+    assert cache.fingerprint(str(media)) == first
+    assert len(hash_calls) == 1
+
+
+def test_renamed_file_keeps_fingerprint(cache, hash_calls, tmp_path):
+    media = tmp_path / "a.mp4"
+    write(media, b"video-data", 1_000_000_000)
+    digest = cache.fingerprint(str(media))
+    renamed = tmp_path / "renamed.mp4"
+    os.rename(media, renamed)
+    assert cache.fingerprint(str(renamed)) == digest
+    assert len(hash_calls) == 1
+
+
+def test_changed_content_invalidates_digest(cache, hash_calls, tmp_path):
+    media = tmp_path / "a.mp4"
+    write(media, b"video-data", 1_000_000_000)
+    old = cache.fingerprint(str(media))
+    cache.put(old, MODEL, "旧文案")
+
+    write(media, b"other-video-data", 2_000_000_000)
+    new = cache.fingerprint(str(media))
+    assert new != old
+    assert len(hash_calls) == 2
+    assert cache.get(new, MODEL) is None
+    assert cache.get(old, MODEL) == "旧文案"
+
+
+def test_same_content_shares_digest(cache, tmp_path):
+    a = tmp_path / "a.mp4"
+    b = tmp_path / "b.mp4"
+    write(a, b"same", 1_000_000_000)
+    write(b, b"same", 2_000_000_000)
+    assert cache.fingerprint(str(a)) == cache.fingerprint(str(b))
+
+
+def test_transcripts_keyed_by_model(cache):
+    cache.put("digest", MODEL, "文案")
+    assert cache.get("digest", MODEL) == "文案"
+    assert cache.get("digest", ("whisper", "small", "zh")) is None
+    cache.put("digest", MODEL, "新文案")
+    assert cache.get("digest", MODEL) == "新文案"
+
+
+def test_no_speech_marker(cache, tmp_path):
+    assert not cache.is_no_speech("digest")
+    cache.mark_no_speech("digest")
+    assert cache.is_no_speech("digest")
+    # 重新打开后仍然有效
+    reopened = TranscriptCache(str(tmp_path / "cache" / "transcripts.db"))
+    assert reopened.is_no_speech("digest")
+    assert not reopened.is_no_speech("other")
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from core.audio import SAMPLE_RATE
+from core.vad import JOIN_GAP, detect_speech, trim_to_speech
+
+
+def voice(seconds: float, pitch: float = 150.0):
+    """谐波丰富、音高起伏的合成浊音"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    phase = 2 * np.pi * pitch * (t + 0.05 * np.sin(2 * np.pi * 0.7 * t))
+    signal = sum(np.sin(k * phase) / k for k in range(1, 20))
+    return (0.2 * signal / np.max(np.abs(signal))).astype(np.float32)
+
+
+def test_silence_has_no_speech():
+    pcm = np.zeros(5 * SAMPLE_RATE, dtype=np.float32)
+    assert detect_speech(pcm) == []
+    assert not trim_to_speech(pcm).has_speech
+
+
+def test_white_noise_has_no_speech():
+    rng = np.random.default_rng(0)
+    pcm = (0.1 * rng.standard_normal(5 * SAMPLE_RATE)).astype(np.float32)
+    assert detect_speech(pcm) == []
+
+
+def test_too_short_input():
+    assert detect_speech(np.zeros(100, dtype=np.float32)) == []
+
+
+def test_voice_between_silences_is_detected():
+    silence = np.zeros(2 * SAMPLE_RATE, dtype=np.float32)
+    pcm = np.concatenate([silence, voice(2.0), silence])
+    regions = detect_speech(pcm)
+    assert len(regions) == 1
+    start, end = regions[0]
+    # 前后各补齐 PADDING 秒
+    assert 1.5 * SAMPLE_RATE <= start <= 2.0 * SAMPLE_RATE
+    assert 4.0 * SAMPLE_RATE <= end <= 4.5 * SAMPLE_RATE
+
+
+def test_trim_keeps_only_speech():
+    silence = np.zeros(3 * SAMPLE_RATE, dtype=np.float32)
+    pcm = np.concatenate([silence, voice(1.5), silence, voice(1.5), silence])
+    voiced = trim_to_speech(pcm)
+    assert len(voiced.regions) == 2
+    assert voiced.speech_seconds < voiced.total_seconds / 2
+    # 语音段之间插入 JOIN_GAP 秒静音
+    gap = int(JOIN_GAP * SAMPLE_RATE)
+    assert len(voiced.pcm) == sum(end - start for start, end in voiced.regions) + gap
+    first_start, first_end = voiced.regions[0]
+    assert np.array_equal(voiced.pcm[:first_end - first_start], pcm[first_start:first_end])
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+from core.xunfei_asr import WpgsResult, XunfeiAsr
+
+
+def result(sn, words, pgs="apd", rg=None):
+    data = {"sn": sn, "pgs": pgs, "ws": [{"cw": [{"w": w}, {"w": "候选"}]} for w in words]}
+    if rg is not None:
+        data["rg"] = rg
+    return data
+
+
+def test_appends_in_sn_order():
+    wpgs = WpgsResult()
+    wpgs.update(result(2, ["世界"]))
+    wpgs.update(result(1, ["你好", "，"]))
+    # 每个词只取第一个候选
+    assert wpgs.text == "你好，世界"
+
+
+def test_replace_drops_rg_range():
+    wpgs = WpgsResult()
+    wpgs.update(result(1, ["今天"]))
+    wpgs.update(result(2, ["天其"]))
+    wpgs.update(result(3, ["不错"]))
+    wpgs.update(result(4, ["天气", "不错"], pgs="rpl", rg=[2, 3]))
+    assert wpgs.text == "今天天气不错"
+
+
+def test_missing_sn_appends():
+    wpgs = WpgsResult()
+    wpgs.update({"ws": [{"cw": [{"w": "一"}]}]})
+    wpgs.update({"ws": [{"cw": [{"w": "二"}]}]})
+    assert wpgs.text == "一二"
+
+
+def test_empty_result():
+    wpgs = WpgsResult()
+    wpgs.update({"sn": 1, "ws": []})
+    assert wpgs.text == ""
+
+
+def test_sessions_share_one_semaphore_per_loop():
+    client = XunfeiAsr("app", "key", "secret", max_sessions=2)
+
+    async def get():
+        return client._semaphore()
+
+    async def both():
+        return await get(), await get()
+
+    first, second = asyncio.run(both())
+    assert first is second
+    assert asyncio.run(get()) is not first
@@ -7,6 +7,10 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QFileDialog, QDialog, QLabel, QLineEdit, QCheckBox,
                              QGroupBox, QComboBox)
 
+from core.asr_engines import ENGINES, resolve_engine
+from core.pipeline import Pipeline
+from core.progress import ProgressTracker
+
 
 class SettingsDialog(QDialog):
     def __init__(self, config, parent=None):
@@ -108,23 +112,14 @@ class SettingsDialog(QDialog):
         engine_layout = QHBoxLayout()
         engine_layout.addWidget(QLabel('识别引擎:'))
         self.speech_engine = QComboBox()
-        self.speech_engine.addItems([
-            "Whisper (OpenAI)", 
-            "PaddleSpeech"
-        ])
-        
-        # 设置当前选择的引擎
-        engines = {
-            "whisper": 0,
-            "Whisper (OpenAI)": 0,
-            "paddlespeech": 1,
-            "PaddleSpeech": 1
-        }
+        # 选项来自已注册的引擎，保存引擎名
+        for spec in ENGINES.values():
+            self.speech_engine.addItem(spec.label, spec.name)
         
         # 从配置中获取当前引擎，并设置对应的索引
-        current_engine = self.config.speech_recognition_engine
+        current_engine = resolve_engine(self.config.speech_recognition_engine).name
         self.speech_engine.setCurrentIndex(
-            engines.get(current_engine, 0)
+            max(0, self.speech_engine.findData(current_engine))
         )
         
         # 添加引擎选择的事件处理
@@ -148,6 +143,20 @@ class SettingsDialog(QDialog):
         self.whisper_model_layout.addWidget(self.whisper_model)
         speech_layout.addLayout(self.whisper_model_layout)
         
+        # 云端引擎的账号设置，只显示当前引擎的
+        self.credential_rows = {}
+        for spec in ENGINES.values():
+            for key, label in spec.credentials:
+                row = QHBoxLayout()
+                row_label = QLabel(f'{label}:')
+                edit = QLineEdit(str(self.config.speech_recognition_config.get(spec.name, {}).get(key, '')))
+                if 'secret' in key:
+                    edit.setEchoMode(QLineEdit.EchoMode.Password)
+                row.addWidget(row_label)
+                row.addWidget(edit)
+                speech_layout.addLayout(row)
+                self.credential_rows[(spec.name, key)] = (row_label, edit)
+        
         # 初始时根据当前引擎设置可见性
         self.toggle_whisper_model()
         
@@ -251,26 +260,35 @@ class SettingsDialog(QDialog):
             'download_cover': self.download_cover_checkbox.isChecked(),
             'extract_text': self.extract_text_checkbox.isChecked(),
             'douyin_cookie': self.cookie_text.toPlainText().strip(),
-            'speech_recognition_engine': self.speech_engine.currentText(),
+            'speech_recognition_engine': self.speech_engine.currentData(),
             'speech_recognition_config': self.config.speech_recognition_config,
         }
         
         # 更新Whisper模型配置
         settings['speech_recognition_config']['whisper']['model'] = self.whisper_model.currentText()
         
+        # 更新云端引擎的账号设置
+        for (engine, key), (_, edit) in self.credential_rows.items():
+            settings['speech_recognition_config'].setdefault(engine, {})[key] = edit.text().strip()
+        
         return settings
 
     def toggle_whisper_model(self):
-        """切换Whisper模型选择的可见性"""
-        is_whisper = self.speech_engine.currentText() == "Whisper (OpenAI)"
+        """切换Whisper模型选择和云端引擎账号设置的可见性"""
+        engine = self.speech_engine.currentData()
+        is_whisper = engine == "whisper"
         self.whisper_model_label.setVisible(is_whisper)
         self.whisper_model.setVisible(is_whisper)
+        for (name, _), widgets in self.credential_rows.items():
+            for widget in widgets:
+                widget.setVisible(name == engine)
 
 class MainWindow(QMainWindow):
     # 定义信号
     start_processing = pyqtSignal(list)  # 开始处理信号
-    process_imported_video = pyqtSignal(str)  # 处理导入的视频信号
-    process_imported_audio = pyqtSignal(str)  # 处理导入的音频信号
+    process_imported_video = pyqtSignal(list)  # 处理导入的视频信号，参数：文件列表
+    process_imported_audio = pyqtSignal(list)  # 处理导入的音频信号，参数：文件列表
+    settings_changed = pyqtSignal()  # 设置已保存信号
     
     def __init__(self):
         super().__init__()
@@ -355,6 +373,10 @@ class MainWindow(QMainWindow):
         self.progress_bar.setFormat("%p%")
         layout.addWidget(self.progress_bar)
         
+        # 流水线状态(各阶段队列深度)
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        
         # 日志显示框
         self.log_output = QTextEdit()
         self.log_output.setReadOnly(True)
@@ -420,6 +442,14 @@ class MainWindow(QMainWindow):
         """更新进度条"""
         self.progress_bar.setValue(value)
         
+    def update_progress_detail(self, snapshot):
+        """在进度条上显示完成数、传输速率和剩余时间"""
+        self.progress_bar.setFormat(f"%p%  {ProgressTracker.format(snapshot)}")
+        
+    def update_stage_stats(self, stats):
+        """更新流水线各阶段的队列状态"""
+        self.status_label.setText(Pipeline.format_stats(stats))
+        
     def processing_finished(self):
         """处理完成"""
         self.start_button.setEnabled(True)
@@ -441,6 +471,7 @@ class MainWindow(QMainWindow):
                 setattr(self.config, key, value)
                 
             self.config.save_config()
+            self.settings_changed.emit()
             self.log("设置已保存")
 
     def import_videos(self):
@@ -453,9 +484,9 @@ class MainWindow(QMainWindow):
         )
         if files:
             for file in files:
-                # 发送处理信号
-                self.process_imported_video.emit(file)
                 self.log(f"导入视频: {os.path.basename(file)}")
+            # 一次发送所有文件，由后台队列按并发限制处理
+            self.process_imported_video.emit(files)
                 
     def import_audio(self):
         """导入音频文件直接进行文案提取"""
@@ -467,9 +498,9 @@ class MainWindow(QMainWindow):
         )
         if files:
             for file in files:
-                # 发送处理音频信号
-                self.process_imported_audio.emit(file)
                 self.log(f"导入音频: {os.path.basename(file)}")
+            # 一次发送所有文件，由后台队列按并发限制处理
+            self.process_imported_audio.emit(files)
                 
     def closeEvent(self, event):
         """窗口关闭事件"""